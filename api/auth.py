@@ -24,8 +24,8 @@ async def get_current_user(request: Request):
 
 
 @router.post("/logout")
-async def logout(response: Response):
-    return await logout_user(response)
+async def logout(request: Request, response: Response):
+    return await logout_user(response, request)
 
 
 @router.post("/refresh_token")
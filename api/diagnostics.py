@@ -0,0 +1,35 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from core.config import settings
+from core.jwt_handler import verified_tokens
+from core.query_stats import query_stats
+from services.auth_service import get_current_user_from_token, require_admin
+
+router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
+
+
+@router.get("/queries")
+async def get_query_stats(
+    top: int = Query(20, ge=1, le=500),
+    sort: Literal["total_ms", "count", "max_ms", "avg_ms", "rows"] = "total_ms",
+):
+    # Top-N statement fingerprints (literals stripped, no parameter values) plus per-table totals.
+    return {
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+        "fingerprints": query_stats.top(top, by=sort),
+        "tables": query_stats.tables(),
+    }
+
+
+@router.delete("/queries", dependencies=[Depends(require_admin)])
+async def reset_query_stats():
+    query_stats.reset()
+    return {"message": "Query stats reset"}
+
+
+@router.get("/token_cache")
+async def get_token_cache_stats():
+    # Verified-token cache effectiveness: hits skip JWT signature verification.
+    return verified_tokens.stats()
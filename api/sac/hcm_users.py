@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, Query, Request
+
+from core.config import settings
 from core.models.hcm_users import HCMUserUpsert
+from core.models.list_query import ListQuery
+from core.query_budget import query_budget
+from core.read_consistency import read_consistency
 from services.auth_service import get_current_user_from_token
 from services.sac.hcm_users_service import get_hcm_users as get_hcm_users_service
 from services.sac.hcm_users_service import upsert_hcm_users as upsert_hcm_users_service
@@ -8,9 +14,20 @@ from services.sac.hcm_users_service import upsert_hcm_users as upsert_hcm_users_
 router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
 
 
-@router.get("/")
-async def get_hcm_users(request: Request):
-    return await get_hcm_users_service(dict(request.query_params))
+@router.get(
+    "/",
+    dependencies=[
+        query_budget(settings.DB_QUERY_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_LIST_READ_ISOLATION),
+    ],
+)
+async def get_hcm_users(
+    request: Request,
+    listing: Annotated[ListQuery, Query()],
+):
+    return await get_hcm_users_service(
+        listing.filters_from(request.query_params), **listing.model_dump()
+    )
 
 
 @router.post("/upsert")
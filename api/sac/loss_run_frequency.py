@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, Query, Request
+
+from core.config import settings
+from core.models.list_query import ListQuery
 from core.models.loss_run_frequency import LossRunFrequencyEntry
+from core.query_budget import query_budget
+from core.read_consistency import read_consistency
 from services.auth_service import get_current_user_from_token
 from services.sac.loss_run_frequency_service import (
     get_frequency as get_frequency_service,
@@ -12,9 +18,20 @@ from services.sac.loss_run_frequency_service import (
 router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
 
 
-@router.get("/")
-async def get_frequency(request: Request):
-    return await get_frequency_service(dict(request.query_params))
+@router.get(
+    "/",
+    dependencies=[
+        query_budget(settings.DB_QUERY_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_LIST_READ_ISOLATION),
+    ],
+)
+async def get_frequency(
+    request: Request,
+    listing: Annotated[ListQuery, Query()],
+):
+    return await get_frequency_service(
+        listing.filters_from(request.query_params), **listing.model_dump()
+    )
 
 
 @router.post("/upsert")
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, Query, Request
+
+from core.config import settings
+from core.models.list_query import ListQuery
 from core.models.sac_affiliates import SacAffiliateUpsert
+from core.query_budget import query_budget
+from core.read_consistency import read_consistency
 from services.auth_service import get_current_user_from_token
 from services.sac.sac_affiliates_service import get_affiliates as get_affiliates_service
 from services.sac.sac_affiliates_service import (
@@ -10,9 +16,20 @@ from services.sac.sac_affiliates_service import (
 router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
 
 
-@router.get("/")
-async def get_affiliates(request: Request):
-    return await get_affiliates_service(dict(request.query_params))
+@router.get(
+    "/",
+    dependencies=[
+        query_budget(settings.DB_QUERY_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_LIST_READ_ISOLATION),
+    ],
+)
+async def get_affiliates(
+    request: Request,
+    listing: Annotated[ListQuery, Query()],
+):
+    return await get_affiliates_service(
+        listing.filters_from(request.query_params), **listing.model_dump()
+    )
 
 
 @router.post("/upsert")
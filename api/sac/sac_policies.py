@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, Query, Request
+
+from core.config import settings
+from core.models.list_query import ListQuery
 from core.models.sac_policies import SacPolicyBulkFieldUpdate, SacPolicyUpsert
+from core.query_budget import query_budget
+from core.read_consistency import read_consistency
 from services.auth_service import get_current_user_from_token
 from services.sac.sac_policies_service import get_premium as get_premium_service
 from services.sac.sac_policies_service import (
@@ -16,9 +22,20 @@ from services.sac.sac_policies_service import (
 router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
 
 
-@router.get("/")
-async def get_sac_policies(request: Request):
-    return await get_sac_policies_service(dict(request.query_params))
+@router.get(
+    "/",
+    dependencies=[
+        query_budget(settings.DB_QUERY_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_LIST_READ_ISOLATION),
+    ],
+)
+async def get_sac_policies(
+    request: Request,
+    listing: Annotated[ListQuery, Query()],
+):
+    return await get_sac_policies_service(
+        listing.filters_from(request.query_params), **listing.model_dump()
+    )
 
 
 @router.post("/upsert")
@@ -31,6 +48,12 @@ async def update_field_for_all_policies(payload: SacPolicyBulkFieldUpdate):
     return await update_field_for_all_policies_service(payload.model_dump())
 
 
-@router.get("/get_premium")
+@router.get(
+    "/get_premium",
+    dependencies=[
+        query_budget(settings.DB_QUERY_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_LIST_READ_ISOLATION),
+    ],
+)
 async def get_premium(request: Request):
     return await get_premium_service(dict(request.query_params))
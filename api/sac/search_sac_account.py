@@ -1,5 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 
+from core.config import settings
+from core.query_budget import query_budget
+from core.read_consistency import read_consistency
+from core.streaming import wants_ndjson
 from services.auth_service import get_current_user_from_token
 from services.sac.search_sac_account_service import (
     search_sac_account_records as get_sac_account_records_service,
@@ -8,6 +12,24 @@ from services.sac.search_sac_account_service import (
 router = APIRouter(dependencies=[Depends(get_current_user_from_token)])
 
 
-@router.get("/")
-async def get_sac_account_records(search_by: str = Query(..., alias="search_by")):
-    return await get_sac_account_records_service(search_by)
+@router.get(
+    "/",
+    dependencies=[
+        query_budget(settings.DB_SEARCH_TIMEOUT_SECONDS),
+        read_consistency(settings.DB_SEARCH_READ_ISOLATION),
+    ],
+)
+async def get_sac_account_records(
+    request: Request,
+    search_by: str = Query(..., alias="search_by"),
+    limit: int | None = Query(None, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    include_total: bool = Query(False),
+):
+    return await get_sac_account_records_service(
+        search_by,
+        limit=limit,
+        after=after,
+        include_total=include_total,
+        ndjson=wants_ndjson(request.headers.get("accept")),
+    )
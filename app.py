@@ -1,7 +1,11 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from api.auth import router as auth_router
+from api.diagnostics import router as diagnostics_router
 from api.dropdowns import router as dropdowns_router
 from api.sac.claim_review_distribution import router as claim_review_distribution_router
 from api.sac.claim_review_frequency import router as claim_review_frequency_router
@@ -15,7 +19,13 @@ from api.sac.sac_affiliates import router as sac_affiliates_router
 from api.sac.sac_policies import router as sac_policies_router
 from api.sac.search_sac_account import router as search_sac_account_router
 from core.config import settings
+from core.db_executor import get_db_executor
+from core.encrypt import get_password_workers, start_password_workers
+from core.lifecycle import managed_lifecycle, readiness
 from core.logging_config import configure_logging
+from core.token_revocation import start_revocation_refresh
+from db import QueryInterruptedError, get_pool
+from services.dropdowns_service import prime_dropdown_cache
 
 """from api.affinity.affinity_program import router as affinity_program_router
 from api.affinity.affinity_agents import router as affinity_agents_router
@@ -29,7 +39,20 @@ from api.affinity.claim_review_frequency import router as claim_review_frequency
 
 configure_logging()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the pools and reference-data caches; drain and close DB resources on shutdown.
+    primers = {
+        "dropdowns": prime_dropdown_cache,
+        "password_workers": start_password_workers,
+        "revocations": start_revocation_refresh,
+    }
+    async with managed_lifecycle(primers):
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +63,12 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(QueryInterruptedError)
+async def query_interrupted_handler(request: Request, exc: QueryInterruptedError):
+    # A statement ran past its query budget (or its request went away): 504 for every route.
+    return JSONResponse({"detail": {"error": str(exc)}}, status_code=504)
+
+
 @app.get("/", tags=["home page"])
 async def home():
     return {"message":"Welcome to SAC"}
@@ -50,8 +79,25 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/ready", tags=["health"])
+async def readiness_check():
+    # 503 until startup warm-up has finished, and again once shutdown starts draining.
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/health/db", tags=["health"])
+async def db_health():
+    # Pool and DB executor gauges, for sizing DB_POOL_MAX_SIZE and the executor lanes together.
+    return {
+        "pool": get_pool().stats(),
+        "executor": get_db_executor().stats(),
+        "password_workers": get_password_workers().stats(),
+    }
+
+
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(dropdowns_router, prefix="/dropdowns", tags=["dropdowns"])
+app.include_router(diagnostics_router, prefix="/diagnostics", tags=["diagnostics"])
 
 # sac
 app.include_router(sac_account_router, prefix="/sac_account", tags=["sac_account"])
@@ -22,6 +22,104 @@ class Settings:
     DB_DRIVER: str = os.getenv("DB_DRIVER", "{ODBC Driver 17 for SQL Server}")
     DB_AUTH: str | None = os.getenv("DB_AUTH")
 
+    # Connection backend (db.py): "mssql" (pyodbc) or "sqlite", a seeded local stand-in
+    # (core/sqlite_backend.py) for load tests and benchmarks without the Azure database.
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mssql").strip().lower()
+    DB_SQLITE_PATH: str = os.getenv("DB_SQLITE_PATH", "sac_local.sqlite3")
+    DB_SQLITE_SEED_ACCOUNTS: int = int(os.getenv("DB_SQLITE_SEED_ACCOUNTS", "1000"))
+
+    # Azure AD access token for the database (core/db_token.py). With DB_ACCESS_TOKEN the
+    # service acquires the token itself (client credentials with the AZURE_* app below),
+    # caches it and refreshes it in the background, instead of DB_AUTH signing in inside
+    # the driver on every new connection. DB_TOKEN_PROVIDER=static is a local stand-in.
+    DB_ACCESS_TOKEN: bool = _as_bool(os.getenv("DB_ACCESS_TOKEN"))
+    DB_TOKEN_PROVIDER: str = os.getenv("DB_TOKEN_PROVIDER", "client_secret").strip().lower()
+    DB_TOKEN_SCOPE: str = os.getenv("DB_TOKEN_SCOPE", "https://database.windows.net/.default")
+    DB_TOKEN_REFRESH_MARGIN_SECONDS: float = float(
+        os.getenv("DB_TOKEN_REFRESH_MARGIN_SECONDS", "300")
+    )
+    DB_STATIC_TOKEN: str | None = os.getenv("DB_STATIC_TOKEN")
+
+    # Read-intent routing (db.py): GET helpers use a read-only target when either is set.
+    # DB_READ_SERVER names a separate readable server; DB_READ_INTENT adds
+    # ApplicationIntent=ReadOnly so an availability-group listener picks a secondary.
+    DB_READ_SERVER: str | None = os.getenv("DB_READ_SERVER")
+    DB_READ_INTENT: bool = _as_bool(os.getenv("DB_READ_INTENT"))
+
+    # Connection pool (db.py). A timeout of 0 fails fast when the pool is exhausted.
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "0"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = _as_bool(os.getenv("DB_POOL_PRE_PING"), default=True)
+    # Pre-ping only connections idle at least this long; 0 pings on every checkout.
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "30"))
+    # Streamed reads (stream_raw_query_async) hold a connection for the whole response,
+    # outside the executor lanes. At most this many are open at once, and each pool keeps
+    # this many connections on top of DB_POOL_MAX_SIZE for them.
+    DB_MAX_OPEN_STREAMS: int = int(os.getenv("DB_MAX_OPEN_STREAMS", "2"))
+
+    # Startup warm-up and shutdown (core/lifecycle.py): connections opened per pool before
+    # /health/ready reports ready, delay between warm-up attempts, and how long shutdown
+    # waits for running DB work before closing the pool.
+    DB_WARMUP_CONNECTIONS: int = int(
+        os.getenv("DB_WARMUP_CONNECTIONS", str(max(DB_POOL_MIN_SIZE, 1)))
+    )
+    DB_WARMUP_RETRY_SECONDS: float = float(os.getenv("DB_WARMUP_RETRY_SECONDS", "10"))
+    DB_SHUTDOWN_GRACE_SECONDS: float = float(os.getenv("DB_SHUTDOWN_GRACE_SECONDS", "30"))
+
+    # Result materialization (core/db_helpers.py)
+    DB_FETCH_BATCH_SIZE: int = int(os.getenv("DB_FETCH_BATCH_SIZE", "500"))
+    DB_READ_WITH_PANDAS: bool = _as_bool(os.getenv("DB_READ_WITH_PANDAS"))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+    # Dedicated DB worker threads (core/db_executor.py), one lane per operation class.
+    # By default the lanes add up to DB_POOL_MAX_SIZE, so every worker can hold a connection.
+    DB_EXECUTOR_BULK_WORKERS: int = int(os.getenv("DB_EXECUTOR_BULK_WORKERS", "1"))
+    DB_EXECUTOR_WRITE_WORKERS: int = int(
+        os.getenv("DB_EXECUTOR_WRITE_WORKERS", str(max(1, DB_POOL_MAX_SIZE // 4)))
+    )
+    DB_EXECUTOR_READ_WORKERS: int = int(
+        os.getenv(
+            "DB_EXECUTOR_READ_WORKERS",
+            str(max(1, DB_POOL_MAX_SIZE - DB_EXECUTOR_WRITE_WORKERS - DB_EXECUTOR_BULK_WORKERS)),
+        )
+    )
+    # Writes touching more rows than this run in the bulk lane.
+    DB_BULK_ROW_THRESHOLD: int = int(os.getenv("DB_BULK_ROW_THRESHOLD", "100"))
+
+    # Declare parameter types from INFORMATION_SCHEMA (core/table_metadata.py) so repeated
+    # statements bind identical types/sizes and reuse one cached plan.
+    DB_TYPED_PARAMETERS: bool = _as_bool(os.getenv("DB_TYPED_PARAMETERS"), default=True)
+    DB_SCHEMA_CACHE_TTL_SECONDS: float = float(os.getenv("DB_SCHEMA_CACHE_TTL_SECONDS", "600"))
+    # Payload keys that are not columns of the target table on merge/insert:
+    # "drop" (with a warning), "reject" (ValueError) or "allow" (no metadata check).
+    DB_UNKNOWN_COLUMNS: str = os.getenv("DB_UNKNOWN_COLUMNS", "drop").strip().lower()
+
+    # Read isolation (db.read_isolation): "read_committed" or "snapshot" (needs
+    # ALLOW_SNAPSHOT_ISOLATION ON). The route settings default to DB_READ_ISOLATION.
+    DB_READ_ISOLATION: str = os.getenv("DB_READ_ISOLATION", "read_committed").strip().lower()
+    DB_LIST_READ_ISOLATION: str = (
+        os.getenv("DB_LIST_READ_ISOLATION", DB_READ_ISOLATION).strip().lower()
+    )
+    DB_SEARCH_READ_ISOLATION: str = (
+        os.getenv("DB_SEARCH_READ_ISOLATION", DB_READ_ISOLATION).strip().lower()
+    )
+
+    # Query instrumentation (core/query_stats.py); slow-query log threshold 0 disables it.
+    DB_QUERY_STATS_ENABLED: bool = _as_bool(os.getenv("DB_QUERY_STATS_ENABLED"), default=True)
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "1000"))
+    DB_QUERY_STATS_MAX_FINGERPRINTS: int = int(
+        os.getenv("DB_QUERY_STATS_MAX_FINGERPRINTS", "500")
+    )
+
+    # Per-route DB time budgets in seconds (core/query_budget.py); 0 disables the deadline.
+    DB_QUERY_TIMEOUT_SECONDS: float = float(os.getenv("DB_QUERY_TIMEOUT_SECONDS", "30"))
+    DB_SEARCH_TIMEOUT_SECONDS: float = float(os.getenv("DB_SEARCH_TIMEOUT_SECONDS", "60"))
+
+    # Largest page a list endpoint serves when called with ?limit=
+    API_MAX_PAGE_SIZE: int = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
     # Azure AD app credentials (used with SSO login)
     AZURE_TENANT_ID: str | None = os.getenv("AZURE_TENANT_ID")
     AZURE_CLIENT_ID: str | None = os.getenv("AZURE_CLIENT_ID")
@@ -31,6 +129,34 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ACCESS_TOKEN_VALIDITY: int = int(os.getenv("ACCESS_TOKEN_VALIDITY"))
 
+    # Verified-token LRU (core/jwt_handler.py): decoded claims of recently verified session
+    # tokens, served until their exp. 0 disables it.
+    JWT_VERIFIED_CACHE_SIZE: int = int(os.getenv("JWT_VERIFIED_CACHE_SIZE", "4096"))
+
+    # Authenticated-user cache (core/principal_cache.py): how long a validated session's
+    # user record is reused before tblUsers is read again. A TTL of 0 disables it.
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "60")
+    )
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000")
+    )
+
+    # Self-contained session tokens (core/token_revocation.py): tokens carry the safe profile
+    # fields so protected routes skip tblUsers. Revoked token ids, per-user token versions
+    # and deactivated users are reloaded every AUTH_REVOCATION_REFRESH_SECONDS.
+    AUTH_SELF_CONTAINED_TOKENS: bool = _as_bool(os.getenv("AUTH_SELF_CONTAINED_TOKENS"))
+    AUTH_REVOCATION_REFRESH_SECONDS: float = float(
+        os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "30")
+    )
+
+    # Password hashing (core/encrypt.py): bcrypt on worker threads ("thread") or on a pool
+    # of PASSWORD_HASH_WORKERS processes ("process") so login bursts use every core. Past
+    # PASSWORD_HASH_MAX_PENDING queued hashes/checks, logins fail fast with 503.
+    PASSWORD_HASH_BACKEND: str = os.getenv("PASSWORD_HASH_BACKEND", "thread").strip().lower()
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
     # CORS settings
     ALLOWED_ORIGINS: list = [os.getenv("FRONTEND_URL")]
 
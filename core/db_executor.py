@@ -0,0 +1,167 @@
+# core/db_executor.py
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from core.config import settings
+
+T = TypeVar("T")
+
+READ = "read"
+WRITE = "write"
+BULK = "bulk"
+OPERATION_CLASSES = (READ, WRITE, BULK)
+
+
+class _LaneMetrics:
+    __slots__ = ("queued", "running", "completed", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class DBExecutor:
+    """
+    Dedicated worker threads for blocking DB calls, separate from anyio's shared threadpool.
+
+    Each operation class (read / write / bulk) gets its own bounded lane, so a burst of slow
+    reads cannot starve writes and one large bulk job cannot hold every worker. Per-lane
+    metrics report queue depth (submitted, not yet started) and time spent waiting for a worker.
+    """
+
+    def __init__(self, limits: dict[str, int]):
+        unknown = set(limits) - set(OPERATION_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown DB operation class(es): {', '.join(sorted(unknown))}")
+        for op, workers in limits.items():
+            if workers < 1:
+                raise ValueError(f"DB executor lane '{op}' needs at least one worker")
+
+        self._limits = dict(limits)
+        self._lanes = {
+            op: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"db-{op}")
+            for op, workers in limits.items()
+        }
+        self._metrics = {op: _LaneMetrics() for op in limits}
+        self._lock = threading.Lock()
+
+    def _started(self, op: str, submitted_at: float) -> None:
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            metrics = self._metrics[op]
+            metrics.queued -= 1
+            metrics.running += 1
+            metrics.wait_total += waited
+            metrics.wait_max = max(metrics.wait_max, waited)
+
+    def _finished(self, op: str) -> None:
+        with self._lock:
+            metrics = self._metrics[op]
+            metrics.running -= 1
+            metrics.completed += 1
+
+    def _dropped(self, op: str, future: Future) -> None:
+        # Cancelled before a worker picked it up (caller went away while queued).
+        if future.cancelled():
+            with self._lock:
+                self._metrics[op].queued -= 1
+
+    def submit(self, op: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        lane = self._lanes.get(op)
+        if lane is None:
+            raise ValueError(f"Unknown DB operation class: {op}")
+
+        submitted_at = time.monotonic()
+        context = contextvars.copy_context()
+
+        def _call() -> T:
+            self._started(op, submitted_at)
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                self._finished(op)
+
+        with self._lock:
+            self._metrics[op].queued += 1
+        try:
+            future = lane.submit(_call)
+        except BaseException:
+            with self._lock:
+                self._metrics[op].queued -= 1
+            raise
+        future.add_done_callback(lambda done: self._dropped(op, done))
+        return future
+
+    async def run(self, op: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run func(*args, **kwargs) on the `op` lane and await its result."""
+        return await asyncio.wrap_future(self.submit(op, func, *args, **kwargs))
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                op: {
+                    "workers": self._limits[op],
+                    "queued": metrics.queued,
+                    "running": metrics.running,
+                    "completed": metrics.completed,
+                    "wait_avg_ms": (
+                        round(1000 * metrics.wait_total / metrics.completed, 3)
+                        if metrics.completed
+                        else 0.0
+                    ),
+                    "wait_max_ms": round(1000 * metrics.wait_max, 3),
+                }
+                for op, metrics in self._metrics.items()
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for lane in self._lanes.values():
+            lane.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: DBExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DBExecutor:
+    """Return the process-wide DB executor, sized from settings on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DBExecutor(
+                    {
+                        READ: settings.DB_EXECUTOR_READ_WORKERS,
+                        WRITE: settings.DB_EXECUTOR_WRITE_WORKERS,
+                        BULK: settings.DB_EXECUTOR_BULK_WORKERS,
+                    }
+                )
+    return _executor
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    """Stop the DB executor's workers; the next use recreates it."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_db(op: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a blocking DB call on the dedicated executor lane for `op`."""
+    return await get_db_executor().run(op, func, *args, **kwargs)
+
+
+def write_class(row_count: int) -> str:
+    """Lane for a write touching `row_count` rows."""
+    return BULK if row_count > settings.DB_BULK_ROW_THRESHOLD else WRITE
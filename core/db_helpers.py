@@ -1,26 +1,114 @@
 # core/db_helpers.py
 
+import base64
+import json
 import logging
 import re
-from collections.abc import Iterable
-from functools import partial
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache, partial
 from typing import Any
 
-import pandas as pd
-from fastapi.concurrency import run_in_threadpool
+import anyio
 
-from db import db_connection
+from core.config import settings
+from core.db_executor import READ, WRITE, run_db, write_class
+from core.query_stats import measure_query
+from core.table_metadata import (
+    bind_parameter_types,
+    cached_table_columns,
+    get_table_columns,
+    prepare_records,
+)
+from db import db_connection, isolated_reads, scoped_cursor
 
 logger = logging.getLogger(__name__)
 
 _IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
+# SQL Server accepts at most 2100 parameters per statement; keep some headroom.
+MAX_SQL_PARAMETERS = 2000
+# Upper bound on rows in one VALUES row constructor.
+MAX_VALUES_ROWS = 1000
+# Source-only column carrying each row's input position through MERGE ... OUTPUT.
+_ROW_ORDINAL_COLUMN = "_RowOrdinal"
+# Source-only MERGE column: 1 marks a filler row that neither matches nor inserts.
+_PADDING_COLUMN = "_IsPadding"
+# A MERGE batch is padded up to the first of these row counts that fits under the
+# per-statement parameter cap, so each table/column set yields a handful of statement
+# texts, and cached plans, instead of one per batch size. Batches past the largest bucket
+# that fits are sent unpadded rather than filled up to the cap.
+MERGE_ROW_BUCKETS = (1, 10, 50)
+# Generated MERGE/INSERT/DELETE text is memoized per (table, columns, keys, flags, rows).
+STATEMENT_CACHE_SIZE = settings.DB_STATEMENT_CACHE_SIZE
+
+
+class StreamsBusyError(RuntimeError):
+    """Raised when settings.DB_MAX_OPEN_STREAMS streamed reads are already open."""
+
 
 def _ensure_safe_identifier(identifier: str) -> None:
     if not identifier or not _IDENTIFIER_PATTERN.match(identifier):
         raise ValueError(f"Invalid column or table name: {identifier}")
 
 
+# Connection of the enclosing unit_of_work(), if any. Executor jobs inherit it.
+_active_transaction: ContextVar[Any | None] = ContextVar("db_transaction", default=None)
+# Streamed reads currently holding a connection (only touched on the event loop).
+_open_streams = 0
+
+
+@contextmanager
+def _stream_slot():
+    global _open_streams
+    if _open_streams >= settings.DB_MAX_OPEN_STREAMS:
+        raise StreamsBusyError(f"{_open_streams} streamed reads already open; try again shortly")
+    _open_streams += 1
+    try:
+        yield
+    finally:
+        _open_streams -= 1
+
+
+@contextmanager
+def _read_connection(read_only: bool = True):
+    conn = _active_transaction.get()
+    if conn is not None:
+        # Inside a unit of work: read through its transaction so its own writes are visible.
+        yield conn
+        return
+    with db_connection(read_only=read_only) as conn, isolated_reads(conn):
+        yield conn
+
+
+@contextmanager
+def _write_transaction(operation: str):
+    """
+    Connection for one write helper call. Standalone calls commit (or roll back) here;
+    inside unit_of_work() the unit of work owns commit/rollback.
+    """
+    conn = _active_transaction.get()
+    if conn is not None:
+        yield conn
+        return
+
+    with db_connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            # Roll back while we still own the connection (before it returns to the pool)
+            try:
+                conn.rollback()
+            except Exception:
+                # If rollback itself fails, just log and move on
+                logger.error(f"Rollback failed after error in {operation}", exc_info=True)
+            raise
+
+
 def sanitize_filters(
     query_params: dict[str, Any] | None,
     allowed_fields: Iterable[str] | None = None,
@@ -49,17 +137,74 @@ def sanitize_filters(
     return sanitized
 
 
+def sanitize_fields(
+    fields: str | Iterable[str] | None,
+    allowed_fields: Iterable[str] | None = None,
+) -> list[str] | None:
+    """
+    Validate a column projection (e.g. the `fields=` query parameter) against an
+    allow-list and identifier rules. Accepts a comma-separated string or an iterable.
+    Returns None when no projection was requested (SELECT *).
+    """
+    if fields is None:
+        return None
+
+    raw = fields.split(",") if isinstance(fields, str) else list(fields)
+    columns: list[str] = []
+    for field in raw:
+        name = field.strip()
+        if name and name not in columns:
+            columns.append(name)
+
+    if not columns:
+        return None
+
+    if allowed_fields is not None:
+        allowed = set(allowed_fields)
+        disallowed = [column for column in columns if column not in allowed]
+        if disallowed:
+            raise ValueError(f"Invalid field(s): {', '.join(sorted(disallowed))}")
+
+    for column in columns:
+        _ensure_safe_identifier(column)
+
+    return columns
+
+
+def table_fields(table: str) -> set[str]:
+    """Declared column names of `table`, from the cached metadata (empty if unavailable)."""
+    columns = cached_table_columns(table)
+    if columns is None:
+        with _read_connection() as conn:
+            columns = get_table_columns(conn, table)
+    return {info.name for info in columns.values()}
+
+
+def select_list(columns: Iterable[str] | None = None) -> str:
+    """
+    Render the SELECT column list: "*" when no projection is given.
+    """
+    if not columns:
+        return "*"
+
+    columns = list(columns)
+    for column in columns:
+        _ensure_safe_identifier(column)
+    return ", ".join(columns)
+
+
 def build_select_query(
     table: str,
     filters: dict[str, Any] | None = None,
     order_by: str | None = None,
+    columns: Iterable[str] | None = None,
 ) -> tuple[str, list[Any]]:
     """
     Build a parametrized SELECT query like:
-    SELECT * FROM <table> WHERE col1 = ? AND col2 = ? ORDER BY <order_by>
+    SELECT <columns or *> FROM <table> WHERE col1 = ? AND col2 = ? ORDER BY <order_by>
     """
     _ensure_safe_identifier(table)
-    base_query = f"SELECT * FROM {table}"
+    base_query = f"SELECT {select_list(columns)} FROM {table}"
     params: list[Any] = []
 
     if filters:
@@ -79,34 +224,493 @@ def build_select_query(
     return base_query, params
 
 
+def iter_row_batches(cursor: Any, batch_size: int | None = None) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield an executed cursor's rows as list[dict] batches of up to batch_size rows.
+    """
+    if cursor.description is None:
+        return
+
+    columns = [column[0] for column in cursor.description]
+    size = batch_size or settings.DB_FETCH_BATCH_SIZE
+
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+        yield [dict(zip(columns, row, strict=True)) for row in rows]
+
+
+def rows_to_dicts(cursor: Any, batch_size: int | None = None) -> list[dict[str, Any]]:
+    """
+    Drain an executed cursor into list[dict] using fetchmany batches.
+    Values are returned as the driver produced them (None, Decimal, datetime, ...).
+    """
+    records: list[dict[str, Any]] = []
+    for batch in iter_row_batches(cursor, batch_size):
+        records.extend(batch)
+    return records
+
+
+def _read_with_pandas(conn: Any, query: str, params: list[Any]) -> list[dict[str, Any]]:
+    # Legacy DataFrame path, kept behind settings.DB_READ_WITH_PANDAS.
+    import pandas as pd
+
+    with measure_query(query, len(params)) as measured:
+        df = pd.read_sql(query, conn, params=params)
+        measured.rows = len(df)
+
+    # Replace NaN with None for JSON
+    df = df.astype(object).where(pd.notna(df), None)
+    return df.to_dict(orient="records")
+
+
+def _execute_read(
+    conn: Any,
+    query: str,
+    params: list[Any],
+    table: str | None = None,
+    param_columns: list[str | None] | None = None,
+) -> list[dict[str, Any]]:
+    # table/param_columns: which column of `table` each parameter binds to, for typing.
+    if settings.DB_READ_WITH_PANDAS:
+        return _read_with_pandas(conn, query, params)
+
+    with measure_query(query, len(params)) as measured, scoped_cursor(conn) as cursor:
+        if table and param_columns:
+            bind_parameter_types(conn, cursor, table, param_columns, [params])
+        cursor.execute(query, params)
+        rows = rows_to_dicts(cursor)
+        measured.rows = len(rows)
+        return rows
+
+
+def _read_query(
+    query: str,
+    params: list[Any],
+    read_only: bool = True,
+    table: str | None = None,
+    param_columns: list[str | None] | None = None,
+) -> list[dict[str, Any]]:
+    with _read_connection(read_only) as conn:
+        return _execute_read(conn, query, params, table, param_columns)
+
+
+def stream_raw_query(
+    query: str,
+    params: list[Any] | None = None,
+    batch_size: int | None = None,
+    read_only: bool = True,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Run a SELECT and yield its rows in fetchmany batches instead of materialising them.
+    The pooled connection is held until the generator is exhausted or closed, and the
+    recorded query time covers the whole stream.
+    """
+    params = params or []
+    with (
+        measure_query(query, len(params)) as measured,
+        db_connection(read_only=read_only) as conn,
+        isolated_reads(conn),
+        scoped_cursor(conn) as cursor,
+    ):
+        cursor.execute(query, params)
+        for batch in iter_row_batches(cursor, batch_size):
+            measured.rows += len(batch)
+            yield batch
+
+
 def fetch_records(
     table: str,
     filters: dict[str, Any] | None = None,
     order_by: str | None = None,
+    columns: Iterable[str] | None = None,
+    read_only: bool = True,
 ) -> list[dict[str, Any]]:
     """
     Run a SELECT on <table> using filters and optional ORDER BY,
-    return rows as list[dict].
+    return rows as list[dict]. `columns` limits the projection (default: all columns).
+    Reads go to the read-intent target when configured; pass read_only=False for
+    reads that must see this process's own writes.
     """
-    query, params = build_select_query(table, filters, order_by)
+    query, params = build_select_query(table, filters, order_by, columns)
+    return _read_query(query, params, read_only, table, list(filters or {}))
 
-    with db_connection() as conn:
-        df = pd.read_sql(query, conn, params=params)
 
-    # Replace NaN with None for JSON
-    df = df.astype(object).where(pd.notna(df), None)
-    return df.to_dict(orient="records")
+def run_raw_query(
+    query: str, params: list[Any] | None = None, read_only: bool = True
+) -> list[dict[str, Any]]:
+    """
+    Generic helper to run any SELECT query (used later e.g. for search queries).
+    """
+    return _read_query(query, params or [], read_only)
+
+
+# -------------------------
+# KEYSET PAGINATION
+# -------------------------
+
+_SORT_COLUMN_PATTERN = re.compile(r"^(\[[^\[\]]+\]|[A-Za-z_][A-Za-z0-9_]*)$")
+
+
+def _ensure_safe_sort_column(column: str) -> None:
+    # Plain identifiers, or bracketed aliases such as [Customer Name] for raw queries.
+    if not column or not _SORT_COLUMN_PATTERN.match(column):
+        raise ValueError(f"Invalid sort column: {column}")
+
+
+def _result_key(column: str) -> str:
+    return column[1:-1] if column.startswith("[") else column
+
+
+def _encode_token_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_token_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+        raise ValueError("Invalid page token")
+    return value
 
 
-def run_raw_query(query: str, params: list[Any] | None = None) -> list[dict[str, Any]]:
+def encode_page_token(values: Iterable[Any]) -> str:
     """
-    Generic helper to run any SELECT query (used later e.g. for search queries).
+    Opaque continuation token carrying the sort-key values of the last row served.
     """
-    with db_connection() as conn:
-        df = pd.read_sql(query, conn, params=params or [])
+    payload = json.dumps([_encode_token_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str, expected_length: int) -> list[Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(values, list) and len(values) == expected_length:
+            return [_decode_token_value(value) for value in values]
+    except Exception as exc:
+        raise ValueError("Invalid page token") from exc
+    raise ValueError("Invalid page token")
+
+
+def build_keyset_clause(
+    key_columns: list[str],
+    after_values: list[Any],
+) -> tuple[str, list[Any]]:
+    """
+    Seek predicate for "rows after <after_values>" in ascending key order:
+    (k1 > ?) OR (k1 = ? AND k2 > ?) OR ...
+    NULL-aware for SQL Server, where NULLs sort first in ascending order.
+    """
+    clause, params, _param_columns = _keyset_predicate(key_columns, after_values)
+    return clause, params
+
+
+def _keyset_predicate(
+    key_columns: list[str],
+    after_values: list[Any],
+) -> tuple[str, list[Any], list[str]]:
+    # build_keyset_clause plus the key column each parameter is compared with.
+    branches: list[str] = []
+    params: list[Any] = []
+    param_columns: list[str] = []
+
+    for index, column in enumerate(key_columns):
+        parts: list[str] = []
+        for prior_column, prior_value in zip(key_columns[:index], after_values, strict=False):
+            if prior_value is None:
+                parts.append(f"{prior_column} IS NULL")
+            else:
+                parts.append(f"{prior_column} = ?")
+                params.append(prior_value)
+                param_columns.append(prior_column)
+
+        value = after_values[index]
+        if value is None:
+            parts.append(f"{column} IS NOT NULL")
+        else:
+            parts.append(f"{column} > ?")
+            params.append(value)
+            param_columns.append(column)
+
+        branches.append("(" + " AND ".join(parts) + ")")
+
+    return "(" + " OR ".join(branches) + ")", params, param_columns
+
+
+def build_page_query(
+    base_query: str,
+    base_params: list[Any],
+    key_columns: list[str],
+    limit: int,
+    after_values: list[Any] | None = None,
+) -> tuple[str, list[Any]]:
+    """
+    Wrap a SELECT (without ORDER BY) so it returns limit + 1 rows after the given keys:
+    SELECT TOP (?) * FROM (<base_query>) AS page_source WHERE <keyset> ORDER BY <keys>
+    The extra row only tells the caller whether another page exists.
+    """
+    for column in key_columns:
+        _ensure_safe_sort_column(column)
+
+    query = f"SELECT TOP (?) * FROM (\n{base_query.strip().rstrip(';')}\n) AS page_source"
+    params: list[Any] = [limit + 1, *base_params]
+
+    if after_values is not None:
+        keyset_clause, keyset_params = build_keyset_clause(key_columns, after_values)
+        query += f" WHERE {keyset_clause}"
+        params.extend(keyset_params)
+
+    query += f" ORDER BY {', '.join(key_columns)}"
+    return query, params
+
+
+def run_raw_query_page(
+    query: str,
+    params: list[Any] | None = None,
+    *,
+    key_columns: list[str],
+    limit: int,
+    after: str | None = None,
+    include_total: bool = False,
+    hidden_columns: Iterable[str] = (),
+    read_only: bool = True,
+) -> dict[str, Any]:
+    """
+    Keyset-paginate any SELECT (without ORDER BY). key_columns must identify a row uniquely
+    and be selected by the query. Returns {"items", "next"} plus "total" when requested;
+    pass "next" back as `after` to continue. hidden_columns are dropped from items.
+    """
+    return _run_page(
+        query,
+        params,
+        key_columns=key_columns,
+        limit=limit,
+        after=after,
+        include_total=include_total,
+        hidden_columns=hidden_columns,
+        read_only=read_only,
+    )
+
+
+def _run_page(
+    query: str,
+    params: list[Any] | None,
+    *,
+    key_columns: list[str],
+    limit: int,
+    after: str | None,
+    include_total: bool,
+    hidden_columns: Iterable[str],
+    read_only: bool,
+    table: str | None = None,
+    param_columns: list[str | None] | None = None,
+) -> dict[str, Any]:
+    # run_raw_query_page; with `table`, param_columns maps `params` to columns for typing.
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+
+    base_params = list(params or [])
+    after_values = decode_page_token(after, len(key_columns)) if after else None
+    page_query, page_params = build_page_query(query, base_params, key_columns, limit, after_values)
+    page_columns: list[str | None] | None = None
+    if table and param_columns is not None:
+        keyset_columns = (
+            _keyset_predicate(key_columns, after_values)[2] if after_values is not None else []
+        )
+        page_columns = [None, *param_columns, *keyset_columns]
+
+    with _read_connection(read_only) as conn:
+        rows = _execute_read(conn, page_query, page_params, table, page_columns)
+        total = None
+        if include_total:
+            count_query = (
+                f"SELECT COUNT(*) AS total FROM (\n{query.strip().rstrip(';')}\n) AS page_source"
+            )
+            total = _execute_read(conn, count_query, base_params, table, param_columns)[0]["total"]
+
+    items = rows[:limit]
+    next_token = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_token = encode_page_token(last.get(_result_key(column)) for column in key_columns)
+
+    hidden = set(hidden_columns)
+    if hidden:
+        items = [{k: v for k, v in item.items() if k not in hidden} for item in items]
+
+    page: dict[str, Any] = {"items": items, "next": next_token}
+    if include_total:
+        page["total"] = total
+    return page
+
+
+def fetch_page(
+    table: str,
+    filters: dict[str, Any] | None = None,
+    *,
+    key_columns: list[str],
+    limit: int,
+    after: str | None = None,
+    columns: Iterable[str] | None = None,
+    include_total: bool = False,
+    read_only: bool = True,
+) -> dict[str, Any]:
+    """
+    Keyset-paginated fetch_records: rows of <table> ordered by key_columns (which must be
+    unique together), `limit` at a time. Key columns missing from `columns` are selected
+    for the cursor and dropped from the returned items.
+    """
+    for column in key_columns:
+        _ensure_safe_identifier(column)
+
+    projection = list(columns) if columns else None
+    hidden: list[str] = []
+    if projection is not None:
+        hidden = [column for column in key_columns if column not in projection]
+        projection.extend(hidden)
+
+    query, params = build_select_query(table, filters, columns=projection)
+    return _run_page(
+        query,
+        params,
+        key_columns=key_columns,
+        limit=limit,
+        after=after,
+        include_total=include_total,
+        hidden_columns=hidden,
+        read_only=read_only,
+        table=table,
+        param_columns=list(filters or {}),
+    )
 
-    df = df.astype(object).where(pd.notna(df), None)
-    return df.to_dict(orient="records")
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_merge_query(
+    table: str,
+    columns: tuple[str, ...],
+    key_columns: tuple[str, ...],
+    row_count: int,
+    exclude_key_columns_from_insert: bool = False,
+) -> str:
+    """
+    Build a MERGE whose USING source is a parameterized VALUES list of row_count rows:
+    MERGE INTO <table> AS target USING (VALUES (?, ?, ?), ...) AS source (col1, col2,
+    _IsPadding) ON ... Each row ends with its _IsPadding flag; rows flagged 1 only fill the
+    statement up to row_count (see MERGE_ROW_BUCKETS) and are never matched or inserted.
+    Cached: identifiers are validated only when a statement shape is first seen.
+    """
+    for column in columns:
+        _ensure_safe_identifier(column)
+    for key in key_columns:
+        _ensure_safe_identifier(key)
+
+    row_placeholder = "(" + ", ".join(["?"] * (len(columns) + 1)) + ")"
+    values_clause = ",\n        ".join([row_placeholder] * row_count)
+
+    on_clause = " AND ".join(
+        [f"source.{_PADDING_COLUMN} = 0"] + [f"target.{key} = source.{key}" for key in key_columns]
+    )
+
+    update_cols = [col for col in columns if col not in key_columns]
+    update_section = ""
+    if update_cols:
+        update_set = ", ".join([f"{col} = source.{col}" for col in update_cols])
+        update_section = f"""
+WHEN MATCHED THEN
+    UPDATE SET {update_set}
+"""
+
+    insert_columns = update_cols if exclude_key_columns_from_insert else columns
+    if not insert_columns:
+        raise ValueError("No columns available for insert operation")
+
+    return f"""
+MERGE INTO {table} AS target
+USING (VALUES
+        {values_clause}
+) AS source ({", ".join(columns)}, {_PADDING_COLUMN})
+ON {on_clause}
+{update_section}WHEN NOT MATCHED AND source.{_PADDING_COLUMN} = 0 THEN
+    INSERT ({", ".join(insert_columns)})
+    VALUES ({", ".join(["source." + col for col in insert_columns])});
+"""
+
+
+def _rows_per_statement(column_count: int) -> int:
+    return max(1, min(MAX_VALUES_ROWS, MAX_SQL_PARAMETERS // max(column_count, 1)))
+
+
+def _merge_row_bucket(row_count: int, column_count: int) -> int:
+    """Row count a MERGE batch of row_count rows is padded to (see MERGE_ROW_BUCKETS)."""
+    cap = _rows_per_statement(column_count + 1)
+    for bucket in MERGE_ROW_BUCKETS:
+        if row_count <= bucket <= cap:
+            return bucket
+    return row_count
+
+
+def _merge_batches(
+    data_list: list[dict[str, Any]],
+    key_columns: list[str],
+) -> list[tuple[list[str], list[dict[str, Any]]]]:
+    """
+    Split rows into (columns, rows) batches for set-based MERGE.
+
+    Rows sharing a column set go into one batch, capped by the SQL Server parameter limit.
+    A single MERGE cannot touch the same target row twice, so when a key repeats in the
+    payload rows are batched in their original order and a batch is cut at each repeat;
+    the outcome then matches running the rows one by one.
+    """
+    keys = [tuple(data.get(key) for key in key_columns) for data in data_list]
+    non_null_keys = [key for key in keys if None not in key]
+    batches: list[tuple[list[str], list[dict[str, Any]]]] = []
+
+    if len(non_null_keys) == len(set(non_null_keys)):
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for data in data_list:
+            groups.setdefault(tuple(data.keys()), []).append(data)
+
+        for columns, rows in groups.items():
+            step = _rows_per_statement(len(columns) + 1)  # + the padding flag
+            for start in range(0, len(rows), step):
+                batches.append((list(columns), rows[start : start + step]))
+        return batches
+
+    current_columns: tuple[str, ...] = ()
+    current_rows: list[dict[str, Any]] = []
+    seen_keys: set[tuple[Any, ...]] = set()
+
+    for data, key in zip(data_list, keys, strict=True):
+        columns = tuple(data.keys())
+        if (
+            columns != current_columns
+            or len(current_rows) >= _rows_per_statement(len(columns) + 1)
+            or key in seen_keys
+        ):
+            if current_rows:
+                batches.append((list(current_columns), current_rows))
+            current_columns, current_rows, seen_keys = columns, [], set()
+
+        current_rows.append(data)
+        if None not in key:
+            seen_keys.add(key)
+
+    if current_rows:
+        batches.append((list(current_columns), current_rows))
+
+    return batches
 
 
 def merge_upsert_records(
@@ -115,6 +719,7 @@ def merge_upsert_records(
     key_columns: list[str],
     *,
     exclude_key_columns_from_insert: bool = False,
+    batched: bool = True,
 ) -> dict[str, Any]:
     """
     Generic MERGE-based upsert helper.
@@ -122,128 +727,213 @@ def merge_upsert_records(
     - table: target table name
     - data_list: list of rows (dicts) to upsert
     - key_columns: columns used to match existing rows (ON clause)
+    - batched: send rows sharing a column set as one multi-row MERGE (False = one per row)
+
+    Keys that are not columns of <table> are dropped or rejected first (DB_UNKNOWN_COLUMNS).
+    All statements run in a single transaction on one connection.
     """
     if not data_list:
         return {"message": "No data provided", "count": 0}
 
     _ensure_safe_identifier(table)
 
-    from db import db_connection as _db_connection  # avoid circular import confusion
-
     try:
-        with _db_connection() as conn:
+        with _write_transaction("merge_upsert_records") as conn:
+            rows_to_write = prepare_records(conn, table, data_list, key_columns)
+            if batched:
+                batches = _merge_batches(rows_to_write, key_columns)
+            else:
+                batches = [(list(data.keys()), [data]) for data in rows_to_write]
+
             cursor = conn.cursor()
 
-            for data in data_list:
-                columns = list(data.keys())
-                for column in columns:
-                    _ensure_safe_identifier(column)
+            for columns, rows in batches:
+                row_count = _merge_row_bucket(len(rows), len(columns))
+                merge_query = _build_merge_query(
+                    table,
+                    tuple(columns),
+                    tuple(key_columns),
+                    row_count,
+                    exclude_key_columns_from_insert,
+                )
+                values = [value for row in rows for value in [*(row[col] for col in columns), 0]]
+                values += ([None] * len(columns) + [1]) * (row_count - len(rows))
+                bind_parameter_types(conn, cursor, table, [*columns, None] * row_count, [values])
+                with measure_query(merge_query, len(values)) as measured:
+                    cursor.execute(merge_query, values)
+                    measured.rows = len(rows)
+    except Exception as e:
+        logger.error(f"Error during merge_upsert_records on {table}: {e}", exc_info=True)
+        # Let the caller (service) decide how to surface this (HTTPException, etc.)
+        raise
 
-                using_cols = ", ".join([f"? AS {col}" for col in columns])
+    return {"message": "Transaction successful", "count": len(data_list)}
 
-                on_clauses = [f"target.{key} = source.{key}" for key in key_columns]
-                on_clause = " AND ".join(on_clauses)
-                for key in key_columns:
-                    _ensure_safe_identifier(key)
 
-                update_cols = [col for col in columns if col not in key_columns]
-                update_set = (
-                    ", ".join([f"{col} = source.{col}" for col in update_cols])
-                    if update_cols
-                    else ""
-                )
-                update_section = ""
-                if update_set:
-                    update_section = f"""
-WHEN MATCHED THEN
-    UPDATE SET {update_set}
-"""
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_insert_query(table: str, columns: tuple[str, ...]) -> str:
+    for column in columns:
+        _ensure_safe_identifier(column)
 
-                insert_columns = (
-                    [col for col in columns if col not in key_columns]
-                    if exclude_key_columns_from_insert
-                    else columns
-                )
-                if not insert_columns:
-                    raise ValueError("No columns available for insert operation")
+    placeholders = ", ".join(["?"] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
 
-                merge_query = f"""
-MERGE INTO {table} AS target
-USING (SELECT {using_cols}) AS source
-ON {on_clause}
-{update_section}WHEN NOT MATCHED THEN
-    INSERT ({", ".join(insert_columns)})
-    VALUES ({", ".join(["source." + col for col in insert_columns])});
-"""
-                values = list(data.values())
-                cursor.execute(merge_query, values)
 
-            conn.commit()
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_insert_output_query(
+    table: str,
+    columns: tuple[str, ...],
+    identity_column: str,
+    row_count: int,
+) -> str:
+    """
+    Multi-row insert that reports each row's generated identity.
 
-    except Exception as e:
-        # Try to rollback if connection is still open
-        try:
-            conn.rollback()
-        except Exception:
-            # If rollback itself fails, just log and move on
-            logger.error("Rollback failed after error in merge_upsert_records", exc_info=True)
+    A MERGE that never matches inserts every source row and, unlike INSERT ... OUTPUT,
+    may reference source columns in OUTPUT, so identities map back to input positions.
+    OUTPUT goes INTO a table variable (a bare OUTPUT clause is rejected on tables with
+    enabled triggers), which the final SELECT returns as the statement's result set.
+    The identity is read back as bigint.
+    """
+    for column in columns:
+        _ensure_safe_identifier(column)
+    _ensure_safe_identifier(identity_column)
 
-        logger.error(f"Error during merge_upsert_records on {table}: {e}", exc_info=True)
-        # Let the caller (service) decide how to surface this (HTTPException, etc.)
-        raise
+    row_placeholder = "(" + ", ".join(["?"] * (len(columns) + 1)) + ")"
+    values_clause = ",\n        ".join([row_placeholder] * row_count)
 
-    return {"message": "Transaction successful", "count": len(data_list)}
+    output_columns = f"{_ROW_ORDINAL_COLUMN}, {identity_column}"
+    return f"""
+DECLARE @ids TABLE ({_ROW_ORDINAL_COLUMN} int NOT NULL, {identity_column} bigint);
+MERGE INTO {table} AS target
+USING (VALUES
+        {values_clause}
+) AS source ({_ROW_ORDINAL_COLUMN}, {", ".join(columns)})
+ON 1 = 0
+WHEN NOT MATCHED THEN
+    INSERT ({", ".join(columns)})
+    VALUES ({", ".join(["source." + col for col in columns])})
+OUTPUT source.{_ROW_ORDINAL_COLUMN}, INSERTED.{identity_column} INTO @ids ({output_columns});
+SELECT {output_columns} FROM @ids;
+"""
 
 
 def insert_records(
     table: str,
     records: list[dict[str, Any]],
+    *,
+    return_identity: str | None = None,
+    fast_executemany: bool = True,
 ) -> dict[str, Any]:
     """
     Insert multiple records into a table. Useful when identity columns are generated by the DB.
+
+    - keys that are not columns of <table> are dropped or rejected first (DB_UNKNOWN_COLUMNS)
+    - records with the same columns are sent together (executemany, fast_executemany by default)
+    - return_identity: identity column to read back; the result then carries
+      "identities", the generated values in input order (None for skipped empty records)
     """
     if not records:
         return {"message": "No data provided for insertion", "count": 0}
 
     _ensure_safe_identifier(table)
 
-    from db import db_connection as _db_connection
+    identities: list[Any] = [None] * len(records)
 
     try:
-        with _db_connection() as conn:
+        with _write_transaction("insert_records") as conn:
+            groups: dict[tuple[str, ...], list[tuple[int, dict[str, Any]]]] = {}
+            for index, record in enumerate(prepare_records(conn, table, records)):
+                if record:
+                    groups.setdefault(tuple(record.keys()), []).append((index, record))
+
             cursor = conn.cursor()
 
-            for record in records:
-                if not record:
+            for column_key, indexed_rows in groups.items():
+                columns = list(column_key)
+
+                if return_identity:
+                    step = _rows_per_statement(len(columns) + 1)
+                    for start in range(0, len(indexed_rows), step):
+                        chunk = indexed_rows[start : start + step]
+                        query = _build_insert_output_query(
+                            table, column_key, return_identity, len(chunk)
+                        )
+                        params = [
+                            value
+                            for index, record in chunk
+                            for value in (index, *[record[col] for col in columns])
+                        ]
+                        bind_parameter_types(
+                            conn, cursor, table, [None, *columns] * len(chunk), [params]
+                        )
+                        with measure_query(query, len(params)) as measured:
+                            cursor.execute(query, params)
+                            # Skip the MERGE's row count to the SELECT FROM @ids result.
+                            while cursor.description is None and cursor.nextset():
+                                pass
+                            for ordinal, identity in cursor.fetchall():
+                                identities[ordinal] = identity
+                            measured.rows = len(chunk)
                     continue
 
-                columns = list(record.keys())
-                for column in columns:
-                    _ensure_safe_identifier(column)
-
-                placeholders = ", ".join(["?"] * len(columns))
-                column_clause = ", ".join(columns)
-                query = f"INSERT INTO {table} ({column_clause}) VALUES ({placeholders})"
-                values = [record[col] for col in columns]
-                cursor.execute(query, values)
-
-            conn.commit()
+                query = _build_insert_query(table, column_key)
+                values = [[record[col] for col in columns] for _, record in indexed_rows]
+                bind_parameter_types(conn, cursor, table, columns, values)
+                with measure_query(query, len(values) * len(columns)) as measured:
+                    if len(values) == 1:
+                        cursor.execute(query, values[0])
+                    else:
+                        cursor.fast_executemany = fast_executemany
+                        cursor.executemany(query, values)
+                    measured.rows = len(values)
     except Exception:
         logger.error(f"Error inserting records into {table}", exc_info=True)
         raise
 
-    return {"message": "Insertion successful", "count": len(records)}
+    result: dict[str, Any] = {"message": "Insertion successful", "count": len(records)}
+    if return_identity:
+        result["identities"] = identities
+    return result
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _build_delete_query(table: str, key_columns: tuple[str, ...], row_count: int) -> str:
+    """
+    Build a single-row DELETE, or for row_count > 1 a join against a VALUES source:
+    DELETE target FROM <table> AS target INNER JOIN (VALUES (?, ?), ...) AS source (k1, k2) ON ...
+    """
+    for key in key_columns:
+        _ensure_safe_identifier(key)
+
+    if row_count == 1:
+        where_clause = " AND ".join([f"{key} = ?" for key in key_columns])
+        return f"DELETE FROM {table} WHERE {where_clause}"
+
+    row_placeholder = "(" + ", ".join(["?"] * len(key_columns)) + ")"
+    values_clause = ", ".join([row_placeholder] * row_count)
+    on_clause = " AND ".join([f"target.{key} = source.{key}" for key in key_columns])
+    return (
+        f"DELETE target FROM {table} AS target "
+        f"INNER JOIN (VALUES {values_clause}) AS source ({', '.join(key_columns)}) "
+        f"ON {on_clause}"
+    )
 
 
 def delete_records(
     table: str,
     data_list: list[dict[str, Any]],
     key_columns: list[str],
+    *,
+    bulk: bool = True,
 ) -> dict[str, Any]:
     """
     Generic delete helper.
     Deletes rows matching key_columns from data_list.
 
+    With bulk (default) all keys are deleted in one statement per parameter-limit chunk;
+    bulk=False issues one DELETE per entry. "count" is the number of rows actually deleted.
+
     Example:
         key_columns = ["CustomerNum", "EMailAddress"]
     """
@@ -252,59 +942,237 @@ def delete_records(
 
     _ensure_safe_identifier(table)
 
-    from db import db_connection as _db_connection
+    # Validate keys exist
+    for data in data_list:
+        for key in key_columns:
+            if key not in data:
+                raise ValueError(f"{key} is required for deletion")
+
+    step = _rows_per_statement(len(key_columns)) if bulk else 1
+    deleted = 0
 
-    conn = None
     try:
-        with _db_connection() as conn:
+        with _write_transaction("delete_records") as conn:
             cursor = conn.cursor()
 
-            for data in data_list:
-                # Validate keys exist
-                for key in key_columns:
-                    if key not in data:
-                        raise ValueError(f"{key} is required for deletion")
+            for start in range(0, len(data_list), step):
+                chunk = data_list[start : start + step]
+                delete_query = _build_delete_query(table, tuple(key_columns), len(chunk))
+                values = [data[key] for data in chunk for key in key_columns]
+                bind_parameter_types(conn, cursor, table, key_columns * len(chunk), [values])
+                with measure_query(delete_query, len(values)) as measured:
+                    cursor.execute(delete_query, values)
+                    if cursor.rowcount and cursor.rowcount > 0:
+                        deleted += cursor.rowcount
+                        measured.rows = cursor.rowcount
+    except Exception as e:
+        logger.error(f"Error deleting records from {table}: {e}", exc_info=True)
+        raise
 
-                where_clause_parts = []
-                for key in key_columns:
-                    _ensure_safe_identifier(key)
-                    where_clause_parts.append(f"{key} = ?")
+    return {"message": "Deletion successful", "count": deleted}
 
-                where_clause = " AND ".join(where_clause_parts)
-                delete_query = f"DELETE FROM {table} WHERE {where_clause}"
 
-                values = [data[key] for key in key_columns]
-                cursor.execute(delete_query, values)
+_STATEMENT_BUILDERS = {
+    "merge": _build_merge_query,
+    "insert": _build_insert_query,
+    "insert_output": _build_insert_output_query,
+    "delete": _build_delete_query,
+}
 
-            conn.commit()
 
-    except Exception as e:
-        if conn:
+def statement_cache_info() -> dict[str, dict[str, int | None]]:
+    """
+    Hit/miss counters for the generated-statement caches, per operation plus a total.
+    """
+    info: dict[str, dict[str, int | None]] = {}
+    total = {"hits": 0, "misses": 0, "size": 0}
+    for operation, builder in _STATEMENT_BUILDERS.items():
+        stats = builder.cache_info()
+        info[operation] = {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "size": stats.currsize,
+            "maxsize": stats.maxsize,
+        }
+        total["hits"] += stats.hits
+        total["misses"] += stats.misses
+        total["size"] += stats.currsize
+    info["total"] = {**total, "maxsize": None}
+    return info
+
+
+def clear_statement_cache() -> None:
+    for builder in _STATEMENT_BUILDERS.values():
+        builder.cache_clear()
+
+
+@asynccontextmanager
+async def unit_of_work():
+    """
+    Run several helper calls on one pooled connection in one transaction.
+
+    Usage:
+        async with unit_of_work():
+            await merge_upsert_records_async(...)
+            await insert_records_async(...)
+
+    Write helpers inside the block skip their own commit and reads see the pending writes;
+    everything commits once on exit and rolls back if the block raises. Nested blocks join
+    the outer unit of work.
+    """
+    if _active_transaction.get() is not None:
+        yield
+        return
+
+    connection_cm = db_connection()
+    conn = await run_db(WRITE, connection_cm.__enter__)
+    token = _active_transaction.set(conn)
+    try:
+        yield
+        await run_db(WRITE, conn.commit)
+    except BaseException as exc:
+        with anyio.CancelScope(shield=True):
             try:
-                conn.rollback()
+                await run_db(WRITE, conn.rollback)
             except Exception:
-                logger.error("Rollback failed in delete_records", exc_info=True)
-        logger.error(f"Error deleting records from {table}: {e}", exc_info=True)
+                logger.error("Rollback failed in unit_of_work", exc_info=True)
+            # Lets the pool discard the connection after driver errors, as db_connection() does.
+            await run_db(WRITE, connection_cm.__exit__, type(exc), exc, exc.__traceback__)
         raise
+    else:
+        await run_db(WRITE, connection_cm.__exit__, None, None, None)
+    finally:
+        _active_transaction.reset(token)
 
-    return {"message": "Deletion successful", "count": len(data_list)}
+
+async def sanitize_table_fields_async(
+    table: str,
+    fields: str | Iterable[str] | None,
+    aliases: Iterable[str] = (),
+) -> list[str] | None:
+    """
+    sanitize_fields() against the columns of `table` plus `aliases` (API names the caller
+    remaps), so a mistyped field is a ValueError (400) rather than a failed SELECT (500).
+    Only the identifier rules apply while the table's metadata is unavailable.
+    """
+    if sanitize_fields(fields) is None:
+        return None
+    columns = cached_table_columns(table)
+    if columns is None:
+        allowed = await run_db(READ, table_fields, table)
+    else:
+        allowed = {info.name for info in columns.values()}
+    return sanitize_fields(fields, allowed | set(aliases) if allowed else None)
 
 
 async def fetch_records_async(
     table: str,
     filters: dict[str, Any] | None = None,
     order_by: str | None = None,
+    columns: Iterable[str] | None = None,
+    read_only: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Runs fetch_records on the DB read lane to keep blocking calls off the event loop.
+    """
+    return await run_db(
+        READ,
+        partial(
+            fetch_records,
+            table=table,
+            filters=filters,
+            order_by=order_by,
+            columns=columns,
+            read_only=read_only,
+        ),
+    )
+
+
+async def run_raw_query_async(
+    query: str, params: list[Any] | None = None, read_only: bool = True
 ) -> list[dict[str, Any]]:
+    return await run_db(
+        READ, partial(run_raw_query, query=query, params=params or [], read_only=read_only)
+    )
+
+
+async def stream_raw_query_async(
+    query: str,
+    params: list[Any] | None = None,
+    batch_size: int | None = None,
+    read_only: bool = True,
+) -> AsyncIterator[list[dict[str, Any]]]:
     """
-    Threadpool wrapper around fetch_records to keep blocking DB calls off the event loop.
+    Async view of stream_raw_query: each fetchmany batch is read on the DB read lane.
+    Closing the iterator early (e.g. client disconnect) releases the connection.
+    The connection comes from the pool's stream headroom; with DB_MAX_OPEN_STREAMS
+    streams already open, the first iteration raises StreamsBusyError.
     """
-    return await run_in_threadpool(
-        partial(fetch_records, table=table, filters=filters, order_by=order_by)
+    with _stream_slot():
+        batches = stream_raw_query(query, params, batch_size, read_only)
+        try:
+            while True:
+                batch = await run_db(READ, next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            with anyio.CancelScope(shield=True):
+                await run_db(READ, batches.close)
+
+
+async def fetch_page_async(
+    table: str,
+    filters: dict[str, Any] | None = None,
+    *,
+    key_columns: list[str],
+    limit: int,
+    after: str | None = None,
+    columns: Iterable[str] | None = None,
+    include_total: bool = False,
+    read_only: bool = True,
+) -> dict[str, Any]:
+    return await run_db(
+        READ,
+        partial(
+            fetch_page,
+            table=table,
+            filters=filters,
+            key_columns=key_columns,
+            limit=limit,
+            after=after,
+            columns=columns,
+            include_total=include_total,
+            read_only=read_only,
+        ),
     )
 
 
-async def run_raw_query_async(query: str, params: list[Any] | None = None) -> list[dict[str, Any]]:
-    return await run_in_threadpool(partial(run_raw_query, query=query, params=params or []))
+async def run_raw_query_page_async(
+    query: str,
+    params: list[Any] | None = None,
+    *,
+    key_columns: list[str],
+    limit: int,
+    after: str | None = None,
+    include_total: bool = False,
+    hidden_columns: Iterable[str] = (),
+    read_only: bool = True,
+) -> dict[str, Any]:
+    return await run_db(
+        READ,
+        partial(
+            run_raw_query_page,
+            query=query,
+            params=params or [],
+            key_columns=key_columns,
+            limit=limit,
+            after=after,
+            include_total=include_total,
+            hidden_columns=hidden_columns,
+            read_only=read_only,
+        ),
+    )
 
 
 async def merge_upsert_records_async(
@@ -313,30 +1181,54 @@ async def merge_upsert_records_async(
     key_columns: list[str],
     *,
     exclude_key_columns_from_insert: bool = False,
+    batched: bool = True,
 ) -> dict[str, Any]:
-    return await run_in_threadpool(
+    return await run_db(
+        write_class(len(data_list)),
         partial(
             merge_upsert_records,
             table=table,
             data_list=data_list,
             key_columns=key_columns,
             exclude_key_columns_from_insert=exclude_key_columns_from_insert,
-        )
+            batched=batched,
+        ),
     )
 
 
 async def insert_records_async(
     table: str,
     records: list[dict[str, Any]],
+    *,
+    return_identity: str | None = None,
+    fast_executemany: bool = True,
 ) -> dict[str, Any]:
-    return await run_in_threadpool(partial(insert_records, table=table, records=records))
+    return await run_db(
+        write_class(len(records)),
+        partial(
+            insert_records,
+            table=table,
+            records=records,
+            return_identity=return_identity,
+            fast_executemany=fast_executemany,
+        ),
+    )
 
 
 async def delete_records_async(
     table: str,
     data_list: list[dict[str, Any]],
     key_columns: list[str],
+    *,
+    bulk: bool = True,
 ) -> dict[str, Any]:
-    return await run_in_threadpool(
-        partial(delete_records, table=table, data_list=data_list, key_columns=key_columns)
+    return await run_db(
+        write_class(len(data_list)),
+        partial(
+            delete_records,
+            table=table,
+            data_list=data_list,
+            key_columns=key_columns,
+            bulk=bulk,
+        ),
     )
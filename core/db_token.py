@@ -0,0 +1,238 @@
+# core/db_token.py
+
+import json
+import logging
+import struct
+import threading
+import time
+from collections.abc import Callable
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# msodbcsql pre-connect attribute carrying an Azure AD access token (not exported by pyodbc).
+SQL_COPT_SS_ACCESS_TOKEN = 1256
+
+_AUTHORITY_URL = "https://login.microsoftonline.com/{tenant}/oauth2/v2.0/token"
+# Shortest wait between background refreshes, so a token issued with less lifetime than
+# the refresh margin does not turn the refresher into a busy loop.
+_MIN_REFRESH_INTERVAL = 1.0
+
+
+class TokenAcquisitionError(RuntimeError):
+    """Raised when the identity provider does not hand out a database access token."""
+
+
+class AccessToken:
+    __slots__ = ("token", "expires_at")
+
+    def __init__(self, token: str, expires_at: float):
+        self.token = token
+        self.expires_at = expires_at  # epoch seconds
+
+
+class ClientSecretTokenProvider:
+    """Client-credentials flow against Azure AD for the app registration in AZURE_*."""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        scope: str,
+        timeout: float = 10.0,
+    ):
+        self.url = _AUTHORITY_URL.format(tenant=tenant_id)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.timeout = timeout
+
+    def __call__(self) -> AccessToken:
+        body = urlencode(
+            {
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scope": self.scope,
+            }
+        ).encode()
+        request = Request(
+            self.url, data=body, headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+            return AccessToken(payload["access_token"], time.time() + int(payload["expires_in"]))
+        except (OSError, ValueError, KeyError) as e:  # URLError/HTTPError are OSErrors
+            raise TokenAcquisitionError(f"Could not acquire database access token: {e}") from e
+
+
+class StaticTokenProvider:
+    """
+    Local stand-in provider: hands out `token` with a fixed lifetime and counts the calls.
+    For tests and local runs without an Azure AD tenant.
+    """
+
+    def __init__(self, token: str = "local-access-token", lifetime: float = 3600.0):
+        self.token = token
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def __call__(self) -> AccessToken:
+        self.calls += 1
+        return AccessToken(self.token, time.time() + self.lifetime)
+
+
+TokenProvider = Callable[[], AccessToken]
+
+
+class TokenCache:
+    """
+    Cached access token, refreshed `refresh_margin` seconds before it expires.
+
+    get() only calls the provider when the cached token is missing or inside the margin;
+    with start(), a background thread does that refresh ahead of time so connection
+    checkouts never wait on the identity provider. If a refresh fails while the cached
+    token is still valid, that token keeps being served (and the refresh is retried).
+    """
+
+    def __init__(
+        self,
+        provider: TokenProvider,
+        *,
+        refresh_margin: float = 300.0,
+        retry_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._provider = provider
+        self.refresh_margin = refresh_margin
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._token: AccessToken | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _is_fresh(self, token: AccessToken | None) -> bool:
+        return token is not None and token.expires_at - self._clock() > self.refresh_margin
+
+    def refresh(self) -> AccessToken:
+        with self._lock:
+            token = self._provider()
+            self._token = token
+            return token
+
+    def get(self) -> AccessToken:
+        token = self._token
+        if self._is_fresh(token):
+            return token
+
+        with self._lock:
+            token = self._token
+            if self._is_fresh(token):
+                return token
+            try:
+                token = self._provider()
+            except Exception:
+                if token is None or token.expires_at <= self._clock():
+                    raise
+                logger.warning("Database access token refresh failed; using the cached token")
+                return token
+            self._token = token
+            return token
+
+    def _refresh_if_due(self) -> None:
+        with self._lock:
+            if not self._is_fresh(self._token):
+                self._token = self._provider()
+
+    def _next_delay(self) -> float:
+        token = self._token
+        if token is None:
+            return 0.0
+        return max(token.expires_at - self.refresh_margin - self._clock(), _MIN_REFRESH_INTERVAL)
+
+    def _run(self) -> None:
+        delay = self._next_delay()
+        while not self._stop.wait(delay):
+            try:
+                self._refresh_if_due()
+                delay = self._next_delay()
+            except Exception:
+                logger.warning("Database access token refresh failed; retrying", exc_info=True)
+                delay = self.retry_seconds
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-token-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+
+def _provider_from_settings() -> TokenProvider:
+    if settings.DB_TOKEN_PROVIDER == "static":
+        return StaticTokenProvider(settings.DB_STATIC_TOKEN or "local-access-token")
+    if settings.DB_TOKEN_PROVIDER != "client_secret":
+        raise ValueError(f"Unknown DB_TOKEN_PROVIDER: {settings.DB_TOKEN_PROVIDER}")
+    if not (settings.AZURE_TENANT_ID and settings.AZURE_CLIENT_ID and settings.AZURE_CLIENT_SECRET):
+        raise ValueError(
+            "DB_ACCESS_TOKEN needs AZURE_TENANT_ID, AZURE_CLIENT_ID and AZURE_CLIENT_SECRET"
+        )
+    return ClientSecretTokenProvider(
+        settings.AZURE_TENANT_ID,
+        settings.AZURE_CLIENT_ID,
+        settings.AZURE_CLIENT_SECRET,
+        settings.DB_TOKEN_SCOPE,
+    )
+
+
+_cache: TokenCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    """Return the process-wide token cache, with its background refresher started."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = TokenCache(
+                    _provider_from_settings(),
+                    refresh_margin=settings.DB_TOKEN_REFRESH_MARGIN_SECONDS,
+                )
+                cache.start()
+                _cache = cache
+    return _cache
+
+
+def stop_token_refresh() -> None:
+    """Stop the background refresher and drop the cached token; the next use restarts it."""
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.stop()
+
+
+def encode_access_token(token: str) -> bytes:
+    """Token in the layout the driver expects: 4-byte length, then UTF-16-LE bytes."""
+    raw = token.encode("utf-16-le")
+    return struct.pack(f"<I{len(raw)}s", len(raw), raw)
+
+
+def access_token_attrs() -> dict[int, bytes]:
+    """pyodbc.connect(attrs_before=...) entry for the current cached token."""
+    return {SQL_COPT_SS_ACCESS_TOKEN: encode_access_token(get_token_cache().get().token)}
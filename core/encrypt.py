@@ -1,5 +1,28 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+import anyio
 import bcrypt
 
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when more password hashes/checks are pending than the queue allows."""
+
 
 def hash_password(password: str) -> str:
     """
@@ -39,3 +62,138 @@ def verify_password(entered_password: str, stored_password: str) -> bool:
         )
     except Exception:
         return False
+
+
+def _ready() -> bool:
+    return True
+
+
+class PasswordWorkers:
+    """
+    Runs bcrypt calls on worker threads ("thread") or on a process pool ("process"), so a
+    login burst spreads over every core instead of contending for one interpreter.
+
+    At most max_pending calls may be queued or running; past that run() fails fast with
+    PasswordHashingBusyError rather than letting a burst pile up behind the workers.
+    A process pool that breaks (e.g. a worker was OOM-killed) is replaced and the call
+    retried once, instead of failing every later call until restart.
+    """
+
+    def __init__(self, backend: str = THREAD, workers: int = 1, max_pending: int = 64):
+        if backend not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown password hashing backend: {backend}")
+        if workers < 1 or max_pending < 1:
+            raise ValueError("Password hashing needs at least one worker and one queue slot")
+        self.backend = backend
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that already runs DB and executor threads is unsafe.
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is not pool:
+                return  # already replaced by a concurrent call
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_in_process(self, func: Callable[..., T], *args: Any) -> T:
+        pool = self._process_pool()
+        try:
+            return await asyncio.wrap_future(pool.submit(func, *args))
+        except BrokenProcessPool:
+            logger.warning("Password hashing process pool broke; starting a new one")
+            self._discard_pool(pool)
+            return await asyncio.wrap_future(self._process_pool().submit(func, *args))
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashingBusyError(
+                    f"{self._pending} password checks already pending; try again shortly"
+                )
+            self._pending += 1
+        try:
+            if self.backend == PROCESS:
+                return await self._run_in_process(func, *args)
+            return await anyio.to_thread.run_sync(func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def start(self) -> int:
+        """Start every worker process ahead of the first login. Returns how many."""
+        if self.backend != PROCESS:
+            return 0
+        pool = self._process_pool()
+        await asyncio.gather(
+            *(asyncio.wrap_future(pool.submit(_ready)) for _ in range(self.workers))
+        )
+        return self.workers
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_workers: PasswordWorkers | None = None
+_workers_lock = threading.Lock()
+
+
+def get_password_workers() -> PasswordWorkers:
+    """Return the process-wide password workers, configured from settings on first use."""
+    global _workers
+    if _workers is None:
+        with _workers_lock:
+            if _workers is None:
+                _workers = PasswordWorkers(
+                    settings.PASSWORD_HASH_BACKEND,
+                    settings.PASSWORD_HASH_WORKERS,
+                    settings.PASSWORD_HASH_MAX_PENDING,
+                )
+    return _workers
+
+
+async def start_password_workers() -> int:
+    """Startup primer: spawn the hashing processes (if any) before logins arrive."""
+    return await get_password_workers().start()
+
+
+def shutdown_password_workers(wait: bool = True) -> None:
+    """Stop the hashing processes; the next use recreates them."""
+    global _workers
+    with _workers_lock:
+        workers, _workers = _workers, None
+    if workers is not None:
+        workers.shutdown(wait=wait)
+
+
+async def run_password_task(func: Callable[..., T], *args: Any) -> T:
+    """
+    Await hash_password / verify_password (or another bcrypt call) on the password
+    workers. bcrypt is deliberately slow and CPU-bound; on the event loop one login would
+    stall every other request on the worker. `func` must be a module-level function when
+    PASSWORD_HASH_BACKEND=process. Raises PasswordHashingBusyError when the queue is full.
+    """
+    return await get_password_workers().run(func, *args)
@@ -1,5 +1,9 @@
-
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 import jwt
 from fastapi import HTTPException
@@ -10,20 +14,104 @@ SECRET_KEY = settings.SECRET_KEY
 ACCESS_TOKEN_VALIDITY = settings.ACCESS_TOKEN_VALIDITY
 
 
-def create_access_token(user_id, role=None):
+class VerifiedTokenCache:
+    """
+    LRU of tokens whose signature already checked out: SHA-256 of the token -> claims.
+
+    A hit is only served while the token's `exp` lies in the future, so expired tokens
+    always go back through jwt.decode (and fail there). Tokens without `exp` are not
+    cached. discard() drops a revoked token.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, int | float):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(exp), dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_VERIFIED_CACHE_SIZE)
+
+
+def create_access_token(user_id, role=None, claims=None):
     expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_VALIDITY)
     payload = {"sub": str(user_id), "exp": expire}
     if role is not None:
         payload["role"] = role
+    if claims:
+        payload.update(claims)
     encoded_jwt = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
 
 def decode_access_token(token):
+    # Same session cookie on every request: skip the HMAC check and JSON parse once verified.
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
     except jwt.ExpiredSignatureError as exc:
         raise HTTPException(status_code=401, detail="Token expired") from exc
     except jwt.InvalidTokenError as exc:
-        raise HTTPException(status_code=403, detail="Invalid token") from exc
\ No newline at end of file
+        raise HTTPException(status_code=403, detail="Invalid token") from exc
+    verified_tokens.put(token, payload)
+    return payload
+
+
+def forget_access_token(token):
+    """Drop a token from the verified-token cache, e.g. once it has been revoked."""
+    verified_tokens.discard(token)
@@ -0,0 +1,125 @@
+# core/lifecycle.py
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from core.config import settings
+from core.db_executor import READ, run_db, shutdown_db_executor
+from core.db_token import stop_token_refresh
+from core.encrypt import shutdown_password_workers
+from core.token_revocation import stop_revocation_refresh
+from db import close_pool, get_pool, read_routing_enabled
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+
+# Cache primers run during warm-up: name -> coroutine function returning how many entries
+# it loaded.
+Primer = Callable[[], Awaitable[int]]
+
+
+class Readiness:
+    """Warm-up state reported by /health/ready."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = STARTING
+        self.warmed: dict[str, int] = {}
+        self.error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"status": self.state, "warmed": dict(self.warmed), "error": self.error}
+
+
+readiness = Readiness()
+
+
+async def _fill_pool(read_only: bool, count: int) -> int:
+    pool = get_pool(read_only=read_only)
+    # pool.fill() is safe to run concurrently, so several read workers connect in parallel.
+    parallel = max(1, min(count, settings.DB_EXECUTOR_READ_WORKERS))
+    opened = await asyncio.gather(*(run_db(READ, pool.fill, count) for _ in range(parallel)))
+    return sum(opened)
+
+
+async def warm_up(primers: dict[str, Primer]) -> dict[str, int]:
+    """
+    Open settings.DB_WARMUP_CONNECTIONS pooled connections (per pool) and run the cache
+    primers. Returns what was warmed; raises if any step fails.
+    """
+    count = settings.DB_WARMUP_CONNECTIONS
+    warmed = {"connections": await _fill_pool(False, count)}
+    if read_routing_enabled():
+        warmed["read_connections"] = await _fill_pool(True, count)
+    for name, primer in primers.items():
+        warmed[name] = await primer()
+    return warmed
+
+
+async def _warm_until_ready(primers: dict[str, Primer]) -> None:
+    while True:
+        try:
+            readiness.warmed = await warm_up(primers)
+        except Exception as exc:
+            readiness.error = str(exc)
+            logger.warning(
+                f"Startup warm-up failed; retrying in {settings.DB_WARMUP_RETRY_SECONDS}s",
+                exc_info=True,
+            )
+            await asyncio.sleep(settings.DB_WARMUP_RETRY_SECONDS)
+            continue
+        readiness.state = READY
+        readiness.error = None
+        logger.info(f"Warm-up complete: {readiness.warmed}")
+        return
+
+
+async def drain() -> None:
+    """
+    Let DB work already running finish (up to settings.DB_SHUTDOWN_GRACE_SECONDS; queued
+    work is dropped), then close the pooled connections and stop the background refreshers
+    and the password hashing processes.
+    """
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(shutdown_db_executor, True), settings.DB_SHUTDOWN_GRACE_SECONDS
+        )
+    except TimeoutError:
+        logger.warning("DB work still running after the shutdown grace period; closing anyway")
+    close_pool()
+    stop_token_refresh()
+    stop_revocation_refresh()
+    shutdown_password_workers(wait=False)
+
+
+@asynccontextmanager
+async def managed_lifecycle(primers: dict[str, Primer]):
+    """
+    Body of the app lifespan. Warm-up runs in the background, so the process starts
+    answering /health at once while /health/ready stays 503 until the pools and caches
+    are warm; a failed warm-up (e.g. database not reachable yet) is retried. On exit the
+    app reports draining, then drains and closes the DB resources.
+    """
+    readiness.reset()
+    task = asyncio.create_task(_warm_until_ready(primers))
+    try:
+        yield readiness
+    finally:
+        readiness.state = DRAINING
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await drain()
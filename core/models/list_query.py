@@ -0,0 +1,25 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from core.config import settings
+
+
+class ListQuery(BaseModel):
+    """
+    Reserved query parameters shared by the SAC list endpoints.
+    Every other query parameter is passed to the service as an equality filter.
+
+    - fields: comma-separated projection
+    - limit / after: keyset pagination; "after" is the "next" token of the previous page
+    - include_total: also return the unpaged row count
+    """
+
+    fields: str | None = None
+    limit: int | None = Field(None, ge=1, le=settings.API_MAX_PAGE_SIZE)
+    after: str | None = None
+    include_total: bool = False
+
+    def filters_from(self, query_params: Any) -> dict[str, Any]:
+        reserved = type(self).model_fields
+        return {key: value for key, value in query_params.items() if key not in reserved}
@@ -0,0 +1,92 @@
+# core/principal_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from core.config import settings
+
+_Key = tuple[str, str]
+
+
+def _token_digest(token: str) -> str:
+    # Keys hold a digest, so the cache never keeps session tokens themselves in memory.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    Bounded TTL cache of authenticated users, keyed by (user id, session token).
+
+    Entries expire `ttl` seconds after they were loaded, so a deactivation or role change
+    made directly in the database is picked up within that window; invalidate() drops a
+    user's entries at once. Least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_Key, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._by_user: dict[str, set[_Key]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, user_id: Any, token: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        key = (str(user_id), _token_digest(token))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return dict(user)
+
+    def put(self, user_id: Any, token: str, user: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        key = (str(user_id), _token_digest(token))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(user))
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: _Key) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+    def invalidate(self, user_id: Any = None) -> int:
+        """Drop every cached session of `user_id` (or of everyone). Returns how many."""
+        with self._lock:
+            if user_id is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_user.clear()
+                return dropped
+            keys = self._by_user.pop(str(user_id), set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES, settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
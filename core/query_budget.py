@@ -0,0 +1,36 @@
+# core/query_budget.py
+
+import asyncio
+
+from fastapi import Depends, Request
+
+from db import QueryScope, query_scope
+
+
+async def _cancel_on_disconnect(request: Request, scope: QueryScope) -> None:
+    # Only used on GET routes: the (empty) request body is never read by the endpoint.
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            scope.cancel()
+            return
+
+
+def query_budget(seconds: float | None):
+    """
+    Route dependency: run the request's DB reads under a `seconds` time budget (0/None for
+    no deadline) and cancel any running statement if the client disconnects.
+
+    Usage:
+        @router.get("/", dependencies=[query_budget(settings.DB_QUERY_TIMEOUT_SECONDS)])
+    """
+
+    async def _scope(request: Request):
+        with query_scope(seconds) as scope:
+            watcher = asyncio.create_task(_cancel_on_disconnect(request, scope))
+            try:
+                yield scope
+            finally:
+                watcher.cancel()
+
+    return Depends(_scope)
@@ -0,0 +1,189 @@
+# core/query_stats.py
+
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Fingerprints beyond settings.DB_QUERY_STATS_MAX_FINGERPRINTS are pooled under this key.
+OVERFLOW_FINGERPRINT = "<other>"
+# fingerprint()/table_of() are memoized per SQL text: the statement builders hand back the
+# same strings every call, so the regex passes run once per distinct statement.
+SQL_TEXT_CACHE_SIZE = settings.DB_STATEMENT_CACHE_SIZE
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_PATTERN = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r"(?<![\w\]])-?\d+(?:\.\d+)?\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST_PATTERN = re.compile(r"\((?:\?|\.\.\.)\)(?:\s*,\s*\((?:\?|\.\.\.)\))+")
+_TABLE_PATTERN = re.compile(
+    r"\b(?:FROM|INTO|UPDATE|JOIN)\s+(\[?[A-Za-z_][\w]*\]?(?:\.\[?[A-Za-z_][\w]*\]?)?)",
+    re.I,
+)
+
+
+@lru_cache(maxsize=SQL_TEXT_CACHE_SIZE)
+def fingerprint(sql: str) -> str:
+    """
+    Normalize SQL so statements differing only in literals, parameter-list lengths or
+    VALUES row counts share one key: comments dropped, literals -> ?, lists collapsed.
+    """
+    text = _COMMENT_PATTERN.sub(" ", sql)
+    text = _STRING_PATTERN.sub("?", text)
+    text = _NUMBER_PATTERN.sub("?", text)
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip().rstrip(";").strip()
+    text = _PLACEHOLDER_LIST_PATTERN.sub("...", text)
+    return _ROW_LIST_PATTERN.sub("(...)", text)
+
+
+@lru_cache(maxsize=SQL_TEXT_CACHE_SIZE)
+def table_of(sql: str) -> str | None:
+    """First table named by FROM / INTO / UPDATE / JOIN, without brackets or schema."""
+    match = _TABLE_PATTERN.search(_COMMENT_PATTERN.sub(" ", sql))
+    if not match:
+        return None
+    return match.group(1).split(".")[-1].strip("[]")
+
+
+class _Histogram:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "rows", "params", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.params = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms: float, rows: int, params: int, failed: bool) -> None:
+        self.count += 1
+        self.errors += int(failed)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.params += params
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"le_{bound}" for bound in HISTOGRAM_BUCKETS_MS] + ["gt_max"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "params": self.params,
+            "histogram_ms": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class QueryStats:
+    """In-process latency histograms per SQL fingerprint and per table."""
+
+    def __init__(self, max_fingerprints: int = 500):
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._by_fingerprint: dict[str, _Histogram] = {}
+        self._by_table: dict[str, _Histogram] = {}
+
+    def record(
+        self,
+        sql: str,
+        elapsed_ms: float,
+        *,
+        rows: int = 0,
+        params: int = 0,
+        failed: bool = False,
+    ) -> str:
+        key = fingerprint(sql)
+        table = table_of(sql) or "<none>"
+        with self._lock:
+            histogram = self._by_fingerprint.get(key)
+            if histogram is None:
+                if len(self._by_fingerprint) >= self.max_fingerprints:
+                    key = OVERFLOW_FINGERPRINT
+                histogram = self._by_fingerprint.setdefault(key, _Histogram())
+            histogram.add(elapsed_ms, rows, params, failed)
+            self._by_table.setdefault(table, _Histogram()).add(elapsed_ms, rows, params, failed)
+        return key
+
+    def top(self, limit: int = 20, by: str = "total_ms") -> list[dict[str, Any]]:
+        with self._lock:
+            entries = [
+                {"fingerprint": key, **histogram.snapshot()}
+                for key, histogram in self._by_fingerprint.items()
+            ]
+        entries.sort(key=lambda entry: entry[by], reverse=True)
+        return entries[:limit]
+
+    def tables(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {table: histogram.snapshot() for table, histogram in self._by_table.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_fingerprint.clear()
+            self._by_table.clear()
+
+
+query_stats = QueryStats(settings.DB_QUERY_STATS_MAX_FINGERPRINTS)
+
+
+class _Measurement:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def measure_query(sql: str, params: int = 0):
+    """
+    Time one statement (and whatever fetching happens inside the block). Set `.rows` on
+    the yielded object; failures are counted too. Statements slower than
+    settings.DB_SLOW_QUERY_MS are logged with their fingerprint (never parameter values).
+    """
+    measurement = _Measurement()
+    failed = False
+    started = time.perf_counter()
+    try:
+        yield measurement
+    except GeneratorExit:
+        # A streaming consumer stopped early; the statement itself did not fail.
+        raise
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if settings.DB_QUERY_STATS_ENABLED:
+            key = query_stats.record(
+                sql, elapsed_ms, rows=max(measurement.rows, 0), params=params, failed=failed
+            )
+            if settings.DB_SLOW_QUERY_MS and elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+                logger.warning(
+                    "Slow query: %.1f ms, rows=%s, params=%s, failed=%s: %s",
+                    elapsed_ms,
+                    measurement.rows,
+                    params,
+                    failed,
+                    key,
+                )
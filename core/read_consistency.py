@@ -0,0 +1,22 @@
+# core/read_consistency.py
+
+from fastapi import Depends
+
+from db import check_isolation_level, read_isolation
+
+
+def read_consistency(level: str):
+    """
+    Route dependency: run the request's reads at `level` ("read_committed" or "snapshot").
+    Under snapshot, list and search reads do not queue behind concurrent MERGE writes.
+
+    Usage:
+        @router.get("/", dependencies=[read_consistency(settings.DB_LIST_READ_ISOLATION)])
+    """
+    check_isolation_level(level)
+
+    async def _isolation():
+        with read_isolation(level):
+            yield level
+
+    return Depends(_isolation)
@@ -0,0 +1,714 @@
+# core/sqlite_backend.py
+
+"""
+In-process SQLite stand-in for the SQL Server database, for load tests and benchmarks on
+machines without Azure access (DB_BACKEND=sqlite). Connections mimic the parts of the
+pyodbc API the helpers use, and the T-SQL the helpers and services generate (bracketed
+identifiers, SELECT TOP, MERGE, DELETE ... JOIN (VALUES ...)) is translated or emulated.
+"""
+
+import argparse
+import logging
+import random
+import re
+import sqlite3
+import threading
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from core.encrypt import hash_password
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_ACCOUNTS = 1000
+# Seeded login for end-to-end runs against the stand-in; never present in a real database.
+BENCH_USER_EMAIL = "bench.user@example.com"
+BENCH_USER_PASSWORD = "benchmark"
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+
+def _convert_date(raw: bytes) -> date:
+    text = raw.decode()
+    return datetime.fromisoformat(text).date() if len(text) > 10 else date.fromisoformat(text)
+
+
+def _convert_datetime(raw: bytes) -> datetime:
+    return datetime.fromisoformat(raw.decode())
+
+
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+# ---------------------------------------------------------------------------
+# Schema and seed data
+# ---------------------------------------------------------------------------
+
+_DISTRIBUTION_COLUMNS = """
+    PK_Number INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerNum TEXT NOT NULL,
+    RecipCat TEXT,
+    DistVia TEXT,
+    AttnTo TEXT,
+    EMailAddress TEXT
+"""
+
+_FREQUENCY_COLUMNS = """
+    CustNum TEXT NOT NULL,
+    MthNum INTEGER NOT NULL,
+    RptMth INTEGER,
+    CompDate DATE,
+    RptType TEXT,
+    DelivMeth TEXT
+"""
+
+SCHEMA = f"""
+CREATE TABLE tblAcctSpecial (
+    CustomerNum TEXT PRIMARY KEY,
+    CustomerName TEXT,
+    OnBoardDate DATE,
+    ServLevel TEXT,
+    Stage TEXT,
+    IsSubmitted INTEGER,
+    AcctOwner TEXT,
+    BusinessType TEXT,
+    AcctStatus TEXT,
+    BranchName TEXT,
+    DateNotif DATE,
+    TermDate DATE,
+    TermCode TEXT,
+    MarketSegmentation TEXT,
+    AccountNotes TEXT,
+    InsuredWebsite TEXT,
+    NCMType TEXT,
+    NCMStatus TEXT,
+    NCMStartDt DATE,
+    RelatedEnt TEXT,
+    SAC_Contact1 TEXT,
+    SAC_Contact2 TEXT,
+    LossCtlRep1 TEXT,
+    LossCtlRep2 TEXT,
+    RiskSolMgr TEXT,
+    OBMethod TEXT,
+    HCMAccess TEXT,
+    LossRunDistFreq TEXT,
+    DeductDistFreq TEXT,
+    ClaimRevDistFreq TEXT,
+    CRThresh TEXT,
+    TotalPrem NUMERIC
+);
+CREATE TABLE tblPolicies (
+    PK_Number INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerNum TEXT NOT NULL,
+    PolicyNum TEXT NOT NULL,
+    PolMod TEXT NOT NULL,
+    PolicyStatus TEXT,
+    AccountActiveYN TEXT,
+    AccountName TEXT,
+    AcctOnPolicyName TEXT,
+    PremiumAmt NUMERIC,
+    PolicyType TEXT,
+    AgentCode TEXT,
+    AgentName TEXT,
+    InceptDate DATE
+);
+CREATE INDEX IX_tblPolicies_CustomerNum ON tblPolicies (CustomerNum);
+CREATE TABLE tblAffiliates (
+    PK_Number INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerNum TEXT NOT NULL,
+    AffiliateName TEXT NOT NULL
+);
+CREATE INDEX IX_tblAffiliates_CustomerNum ON tblAffiliates (CustomerNum);
+CREATE TABLE tblHCMUsers (
+    PK_Number INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustNum TEXT NOT NULL,
+    UserTitle TEXT,
+    UserName TEXT,
+    UserEmail TEXT,
+    UserAction TEXT
+);
+CREATE INDEX IX_tblHCMUsers_CustNum ON tblHCMUsers (CustNum);
+CREATE TABLE tblDistribute_LossRun ({_DISTRIBUTION_COLUMNS});
+CREATE TABLE tblDistribute_ClaimReview ({_DISTRIBUTION_COLUMNS});
+CREATE TABLE tblDistribute_DeductBill ({_DISTRIBUTION_COLUMNS});
+CREATE INDEX IX_tblDistribute_LossRun_Customer ON tblDistribute_LossRun (CustomerNum, AttnTo);
+CREATE INDEX IX_tblDistribute_ClaimReview_Customer
+    ON tblDistribute_ClaimReview (CustomerNum, AttnTo);
+CREATE INDEX IX_tblDistribute_DeductBill_Customer
+    ON tblDistribute_DeductBill (CustomerNum, AttnTo);
+CREATE TABLE tblLossRunFrequency ({_FREQUENCY_COLUMNS}, PRIMARY KEY (CustNum, MthNum));
+CREATE TABLE tblClaimReviewFrequency (
+    {_FREQUENCY_COLUMNS},
+    CRNumNarr INTEGER,
+    PRIMARY KEY (CustNum, MthNum)
+);
+CREATE TABLE tblDeductBillFrequency ({_FREQUENCY_COLUMNS}, PRIMARY KEY (CustNum, MthNum));
+CREATE TABLE tblUsers (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FirstName TEXT,
+    LastName TEXT,
+    Email TEXT NOT NULL,
+    Password TEXT,
+    Role TEXT,
+    BranchName TEXT,
+    Active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE tblUserTokenVersions (
+    UserID INTEGER PRIMARY KEY,
+    TokenVersion INTEGER NOT NULL
+);
+CREATE TABLE tblRevokedTokens (
+    Jti TEXT PRIMARY KEY,
+    UserID INTEGER NOT NULL,
+    ExpiresAt INTEGER NOT NULL
+);
+CREATE TABLE tblMGTUsers (
+    SACName TEXT, EmpTitle TEXT, TelNum TEXT, TelExt TEXT, EMailID TEXT, LANID TEXT
+);
+CREATE TABLE tblLossCtrl (RepName TEXT, Active TEXT, LCEmail TEXT, LCTel TEXT, LAN_ID TEXT);
+CREATE TABLE tblBranch (BranchName TEXT, ReportingBranch TEXT);
+CREATE TABLE tblServiceLevel (
+    SortNum INTEGER, "service Level" TEXT, "Dollar Threshold" NUMERIC
+);
+CREATE TABLE tblUnderwriters ("UW Last" TEXT, "UW Email" TEXT);
+CREATE TABLE tblEDW_AGENT_LIST (Agent_Code TEXT, Agent_Name TEXT);
+CREATE TABLE tblDropDowns (DD_Type TEXT, DD_Value TEXT, DD_SortOrder INTEGER);
+"""
+
+# INFORMATION_SCHEMA.COLUMNS stand-in (core/table_metadata.py reads it); DATA_TYPE is the
+# SQLite declared type, so no parameter gets a SQL Server type/size from it.
+METADATA_VIEWS = """
+CREATE VIEW IF NOT EXISTS information_schema_columns AS
+SELECT
+    m.name COLLATE NOCASE AS TABLE_NAME,
+    p.name AS COLUMN_NAME,
+    lower(p.type) AS DATA_TYPE,
+    NULL AS CHARACTER_MAXIMUM_LENGTH,
+    NULL AS NUMERIC_PRECISION,
+    NULL AS NUMERIC_SCALE,
+    p.cid + 1 AS ORDINAL_POSITION,
+    CASE WHEN p."notnull" THEN 'NO' ELSE 'YES' END AS IS_NULLABLE
+FROM sqlite_master AS m
+JOIN pragma_table_info(m.name) AS p
+WHERE m.type = 'table';
+"""
+
+_BRANCHES = ["Atlanta", "Boston", "Chicago", "Dallas", "Denver", "Phoenix", "Seattle"]
+_SERVICE_LEVELS = [
+    ("Comprehensive", 1000000),
+    ("Enhanced", 500000),
+    ("Essential", 250000),
+    ("Primary", 100000),
+    ("Exception", 0),
+]
+_STAGES = ["Admin", "Admin", "Admin", "Director", "Underwriter"]
+_POLICY_TYPES = ["WC", "GL", "AUTO", "PROP", "UMB"]
+_DROPDOWN_TYPES = {
+    "AcctStatus": ["Active", "Inactive", "Pending"],
+    "TermCode": ["Non-Renewal", "Cancelled", "Moved"],
+    "MarketSegmentation": ["Construction", "Healthcare", "Manufacturing", "Retail"],
+    "RecipCat": ["Insured", "Agent", "Broker"],
+    "DistVia": ["Email", "Mail"],
+    "RptType": ["Summary", "Detail"],
+    "DelivMeth": ["Email", "Portal"],
+}
+
+
+def _seed_lookups(conn: sqlite3.Connection, rng: random.Random) -> None:
+    conn.executemany(
+        "INSERT INTO tblMGTUsers VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                f"SAC User {i:02d}",
+                "Account Manager",
+                f"555-01{i:02d}",
+                str(i),
+                f"sac{i}@example.com",
+                f"SAC{i:02d}",
+            )
+            for i in range(40)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO tblLossCtrl VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                f"Loss Rep {i:02d}",
+                "Yes" if i % 4 else "No",
+                f"lc{i}@example.com",
+                f"555-02{i:02d}",
+                f"LC{i:02d}",
+            )
+            for i in range(30)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO tblBranch VALUES (?, ?)", [(name, f"{name} Region") for name in _BRANCHES]
+    )
+    conn.executemany(
+        "INSERT INTO tblServiceLevel VALUES (?, ?, ?)",
+        [(index, name, threshold) for index, (name, threshold) in enumerate(_SERVICE_LEVELS)],
+    )
+    conn.executemany(
+        "INSERT INTO tblUnderwriters VALUES (?, ?)",
+        [(f"Writer{i:02d}", f"uw{i}@example.com") for i in range(25)],
+    )
+    conn.executemany(
+        "INSERT INTO tblEDW_AGENT_LIST VALUES (?, ?)",
+        [(f"AG{i:05d}", f"Agency {i}") for i in range(500)],
+    )
+    conn.executemany(
+        "INSERT INTO tblDropDowns VALUES (?, ?, ?)",
+        [
+            (dd_type, value, order)
+            for dd_type, values in _DROPDOWN_TYPES.items()
+            for order, value in enumerate(values)
+        ],
+    )
+    conn.execute(
+        "INSERT INTO tblUsers (FirstName, LastName, Email, Password, Role, BranchName, Active) "
+        "VALUES (?, ?, ?, ?, ?, ?, 1)",
+        (
+            "Bench",
+            "User",
+            BENCH_USER_EMAIL,
+            hash_password(BENCH_USER_PASSWORD),
+            "Admin",
+            rng.choice(_BRANCHES),
+        ),
+    )
+
+
+def seed(
+    conn: sqlite3.Connection, accounts: int = DEFAULT_SEED_ACCOUNTS, seed_value: int = 42
+) -> None:
+    """
+    Fill a freshly created schema with deterministic data at roughly production ratios:
+    per account ~5 policies, 2 recipients per distribution table, 12 months per frequency
+    table, one HCM user and one affiliate.
+    """
+    rng = random.Random(seed_value)
+    _seed_lookups(conn, rng)
+
+    start = date(2015, 1, 1)
+    account_rows = []
+    policy_rows = []
+    distribution_rows = []
+    frequency_rows = []
+    hcm_rows = []
+    affiliate_rows = []
+
+    for index in range(accounts):
+        customer = f"{100000 + index}"
+        name = f"Customer {index:06d} Holdings"
+        level, _threshold = rng.choice(_SERVICE_LEVELS)
+        onboard = start + timedelta(days=rng.randrange(3650))
+        account_rows.append(
+            (
+                customer,
+                name,
+                onboard,
+                level,
+                rng.choice(_STAGES),
+                int(rng.random() < 0.9),
+                f"SAC User {rng.randrange(40):02d}",
+                rng.choice(["New", "Renewal"]),
+                rng.choice(["Active", "Active", "Active", "Inactive"]),
+                rng.choice(_BRANCHES),
+                rng.choice(_DROPDOWN_TYPES["MarketSegmentation"]),
+                rng.randrange(10000, 5000000),
+            )
+        )
+        for policy in range(rng.randint(1, 9)):
+            policy_rows.append(
+                (
+                    customer,
+                    f"P{index:06d}{policy:02d}",
+                    f"{rng.randrange(5):02d}",
+                    rng.choice(["Active", "Active", "Expired"]),
+                    "Y",
+                    name,
+                    name,
+                    Decimal(rng.randrange(1000, 500000)) / 100,
+                    rng.choice(_POLICY_TYPES),
+                    f"AG{rng.randrange(500):05d}",
+                    f"Agency {rng.randrange(500)}",
+                    onboard + timedelta(days=365 * rng.randrange(5)),
+                )
+            )
+        for attn in ("Risk Manager", "CFO"):
+            distribution_rows.append(
+                (
+                    customer,
+                    rng.choice(_DROPDOWN_TYPES["RecipCat"]),
+                    "Email",
+                    attn,
+                    f"{attn.split()[0].lower()}.{customer}@example.com",
+                )
+            )
+        for month in range(1, 13):
+            frequency_rows.append(
+                (
+                    customer,
+                    month,
+                    month,
+                    None,
+                    rng.choice(_DROPDOWN_TYPES["RptType"]),
+                    rng.choice(_DROPDOWN_TYPES["DelivMeth"]),
+                )
+            )
+        hcm_rows.append(
+            (customer, "HR Director", f"hcm.{customer}", f"hcm.{customer}@example.com", "Add")
+        )
+        affiliate_rows.append((customer, f"{name} Affiliate"))
+
+    conn.executemany(
+        "INSERT INTO tblAcctSpecial (CustomerNum, CustomerName, OnBoardDate, ServLevel, Stage, "
+        "IsSubmitted, AcctOwner, BusinessType, AcctStatus, BranchName, MarketSegmentation, TotalPrem) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        account_rows,
+    )
+    conn.executemany(
+        "INSERT INTO tblPolicies (CustomerNum, PolicyNum, PolMod, PolicyStatus, AccountActiveYN, "
+        "AccountName, AcctOnPolicyName, PremiumAmt, PolicyType, AgentCode, AgentName, InceptDate) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        policy_rows,
+    )
+    for table in ("tblDistribute_LossRun", "tblDistribute_ClaimReview", "tblDistribute_DeductBill"):
+        conn.executemany(
+            f"INSERT INTO {table} (CustomerNum, RecipCat, DistVia, AttnTo, EMailAddress) "
+            "VALUES (?, ?, ?, ?, ?)",
+            distribution_rows,
+        )
+    for table in ("tblLossRunFrequency", "tblClaimReviewFrequency", "tblDeductBillFrequency"):
+        conn.executemany(
+            f"INSERT INTO {table} (CustNum, MthNum, RptMth, CompDate, RptType, DelivMeth) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            frequency_rows,
+        )
+    conn.executemany(
+        "INSERT INTO tblHCMUsers (CustNum, UserTitle, UserName, UserEmail, UserAction) "
+        "VALUES (?, ?, ?, ?, ?)",
+        hcm_rows,
+    )
+    conn.executemany(
+        "INSERT INTO tblAffiliates (CustomerNum, AffiliateName) VALUES (?, ?)", affiliate_rows
+    )
+
+
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
+
+
+def ensure_database(
+    path: str, accounts: int = DEFAULT_SEED_ACCOUNTS, *, rebuild: bool = False
+) -> None:
+    """Create and seed the database file unless it already holds the schema."""
+    key = str(Path(path).resolve())
+    with _init_lock:
+        if key in _initialized and not rebuild:
+            return
+        if rebuild:
+            Path(path).unlink(missing_ok=True)
+        conn = sqlite3.connect(path)
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tblAcctSpecial'"
+            ).fetchone()
+            if not exists:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                seed(conn, accounts)
+                conn.commit()
+                logger.info(f"Seeded SQLite stand-in database {path} with {accounts} accounts")
+            conn.executescript(METADATA_VIEWS)
+        finally:
+            conn.close()
+        _initialized.add(key)
+
+
+# ---------------------------------------------------------------------------
+# T-SQL translation
+# ---------------------------------------------------------------------------
+
+_LITERAL_OR_BRACKET = re.compile(r"N?'(?:[^']|'')*'|\[([^\]]+)\]")
+_LEADING_TOP = re.compile(r"^\s*SELECT\s+TOP\s*(?:\(\s*(\?|\d+)\s*\)|(\d+))\s+", re.I)
+_REWRITES = [
+    (re.compile(r"\bGETDATE\s*\(\s*\)", re.I), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\bISNULL\s*\(", re.I), "IFNULL("),
+    (re.compile(r"\bLEN\s*\(", re.I), "LENGTH("),
+    (re.compile(r"\s+WITH\s*\(\s*NOLOCK\s*\)", re.I), ""),
+    (re.compile(r"\bINFORMATION_SCHEMA\.COLUMNS\b", re.I), "information_schema_columns"),
+]
+_MERGE = re.compile(
+    r"^\s*(?:DECLARE\s+@\w+\s+TABLE\s*\([^)]*\)\s*;\s*)?"
+    r"MERGE\s+INTO\s+(?P<table>\w+)\s+AS\s+target\s+"
+    r"USING\s*\(\s*VALUES\s*(?P<values>.*?)\s*\)\s*AS\s+source\s*\((?P<columns>[^)]*)\)\s*"
+    r"ON\s+(?P<on>.*?)\s+"
+    r"(?:WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+(?P<set>.*?)\s+)?"
+    r"WHEN\s+NOT\s+MATCHED(?:\s+AND\s+source\.(?P<padding>\w+)\s*=\s*0)?\s+THEN\s+"
+    r"INSERT\s*\((?P<insert>[^)]*)\)\s*VALUES\s*\([^)]*\)\s*"
+    r"(?:OUTPUT\s+source\.(?P<ordinal>\w+)\s*,\s*INSERTED\.(?P<identity>\w+)\s*"
+    r"(?:INTO\s+@\w+\s*\([^)]*\)\s*)?)?;?\s*"
+    r"(?:SELECT\s+[\w\s,]+\s+FROM\s+@\w+\s*;?\s*)?$",
+    re.I | re.S,
+)
+_DELETE_JOIN = re.compile(
+    r"^\s*DELETE\s+target\s+FROM\s+(?P<table>\w+)\s+AS\s+target\s+"
+    r"INNER\s+JOIN\s*\(\s*VALUES\s*(?P<values>.*?)\s*\)\s*AS\s+source\s*\((?P<columns>[^)]*)\)"
+    r"\s*ON\s+.*$",
+    re.I | re.S,
+)
+_KEY_PAIR = re.compile(r"target\.(\w+)\s*=\s*source\.(\w+)", re.I)
+_SET_ISOLATION = re.compile(r"\s*SET\s+TRANSACTION\s+ISOLATION\s+LEVEL\b", re.I)
+_SET_PAIR = re.compile(r"(\w+)\s*=\s*source\.(\w+)", re.I)
+
+
+def _names(text: str) -> list[str]:
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+def translate(sql: str, params: Sequence[Any] = ()) -> tuple[str, list[Any]]:
+    """
+    Rewrite a T-SQL statement into SQLite: [ident] -> "ident", N'..' -> '..', a leading
+    SELECT TOP (n) -> LIMIT n (moving its parameter to the end), DELETE ... INNER JOIN
+    (VALUES ...) -> DELETE ... WHERE (keys) IN (VALUES ...), plus a few function renames.
+    MERGE is not translated here; SQLiteCursor emulates it.
+    """
+    params = list(params)
+
+    def _literal(match: re.Match) -> str:
+        if match.group(1) is not None:
+            return '"' + match.group(1) + '"'
+        text = match.group(0)
+        return text[1:] if text[0] in "Nn" else text
+
+    sql = _LITERAL_OR_BRACKET.sub(_literal, sql)
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+
+    delete = _DELETE_JOIN.match(sql)
+    if delete:
+        columns = ", ".join(_names(delete.group("columns")))
+        sql = (
+            f"DELETE FROM {delete.group('table')} "
+            f"WHERE ({columns}) IN (VALUES {delete.group('values')})"
+        )
+
+    top = _LEADING_TOP.match(sql)
+    if top:
+        sql = "SELECT " + sql[top.end() :].rstrip().rstrip(";")
+        if top.group(1) == "?":
+            sql += " LIMIT ?"
+            params.append(params.pop(0))
+        else:
+            sql += f" LIMIT {top.group(1) or top.group(2)}"
+
+    return sql, params
+
+
+class _MergePlan:
+    __slots__ = (
+        "table",
+        "columns",
+        "keys",
+        "updates",
+        "inserts",
+        "padding",
+        "ordinal",
+        "identity",
+    )
+
+    def __init__(self, match: re.Match):
+        self.table = match.group("table")
+        self.columns = _names(match.group("columns"))
+        self.keys = [target for target, _source in _KEY_PAIR.findall(match.group("on"))]
+        self.updates = [column for column, _source in _SET_PAIR.findall(match.group("set") or "")]
+        self.inserts = _names(match.group("insert"))
+        self.padding = match.group("padding")
+        self.ordinal = match.group("ordinal")
+        self.identity = match.group("identity")
+
+
+# ---------------------------------------------------------------------------
+# pyodbc-shaped connection / cursor
+# ---------------------------------------------------------------------------
+
+
+class SQLiteCursor:
+    """Cursor wrapper accepting pyodbc-style calls and T-SQL statements."""
+
+    def __init__(self, connection: "SQLiteConnection"):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._buffered: list[tuple] | None = None
+        self._description: list[tuple] | None = None
+        self._rowcount = -1
+        self.fast_executemany = False
+
+    @property
+    def description(self):
+        if self._buffered is not None:
+            return self._description
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        if self._buffered is not None or self._rowcount != -1:
+            return self._rowcount
+        return self._cursor.rowcount
+
+    @staticmethod
+    def _params(params: tuple) -> list[Any]:
+        if len(params) == 1 and isinstance(params[0], list | tuple):
+            return list(params[0])
+        return list(params)
+
+    def execute(self, sql: str, *params: Any) -> "SQLiteCursor":
+        values = self._params(params)
+        self._buffered = None
+        self._rowcount = -1
+        if _SET_ISOLATION.match(sql):
+            return self  # WAL readers never block on writers; nothing to switch
+        merge = _MERGE.match(sql)
+        if merge:
+            self._run_merge(_MergePlan(merge), values)
+            return self
+        statement, values = translate(sql, values)
+        self._cursor.execute(statement, values)
+        return self
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        for values in seq_of_params:
+            self.execute(sql, list(values))
+
+    def _run_merge(self, plan: _MergePlan, values: list[Any]) -> None:
+        width = len(plan.columns)
+        if not width or len(values) % width:
+            raise sqlite3.ProgrammingError("MERGE parameters do not fill the VALUES rows")
+
+        cursor = self._cursor
+        output: list[tuple] = []
+        affected = 0
+        where = " AND ".join(f"{key} = ?" for key in plan.keys)
+        for start in range(0, len(values), width):
+            row = dict(zip(plan.columns, values[start : start + width], strict=True))
+            if plan.padding and row[plan.padding]:
+                continue  # filler row, only there to keep the statement text fixed
+            key_values = [row[key] for key in plan.keys]
+
+            matched = False
+            if plan.keys and plan.updates:
+                assignments = ", ".join(f"{column} = ?" for column in plan.updates)
+                cursor.execute(
+                    f"UPDATE {plan.table} SET {assignments} WHERE {where}",
+                    [row[column] for column in plan.updates] + key_values,
+                )
+                matched = cursor.rowcount > 0
+                affected += max(cursor.rowcount, 0)
+            elif plan.keys:
+                matched = (
+                    cursor.execute(
+                        f"SELECT 1 FROM {plan.table} WHERE {where} LIMIT 1", key_values
+                    ).fetchone()
+                    is not None
+                )
+
+            if not matched:
+                cursor.execute(
+                    f"INSERT INTO {plan.table} ({', '.join(plan.inserts)}) "
+                    f"VALUES ({', '.join(['?'] * len(plan.inserts))})",
+                    [row[column] for column in plan.inserts],
+                )
+                affected += 1
+                if plan.identity:
+                    output.append((row[plan.ordinal], cursor.lastrowid))
+
+        self._rowcount = affected
+        if plan.identity:
+            self._buffered = output
+            self._description = [
+                (plan.ordinal, None, None, None, None, None, None),
+                (plan.identity, None, None, None, None, None, None),
+            ]
+
+    def fetchone(self):
+        if self._buffered is not None:
+            return self._buffered.pop(0) if self._buffered else None
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int | None = None):
+        if self._buffered is not None:
+            size = size or self._cursor.arraysize
+            batch, self._buffered = self._buffered[:size], self._buffered[size:]
+            return batch
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        if self._buffered is not None:
+            rows, self._buffered = self._buffered, []
+            return rows
+        return self._cursor.fetchall()
+
+    def setinputsizes(self, sizes: Any) -> None:
+        # SQLite binds by value type; declared sizes have no plan-cache effect here.
+        pass
+
+    def cancel(self) -> None:
+        self._connection.raw.interrupt()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Connection wrapper with the pyodbc surface the pool and helpers rely on."""
+
+    def __init__(self, raw: sqlite3.Connection):
+        self.raw = raw
+        # Accepted for pyodbc compatibility (scoped_cursor sets it); SQLite has no statement
+        # timeout, cancellation goes through cursor.cancel() / interrupt().
+        self.timeout = 0
+
+    def cursor(self) -> SQLiteCursor:
+        return SQLiteCursor(self)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+def connect(path: str, seed_accounts: int = DEFAULT_SEED_ACCOUNTS) -> SQLiteConnection:
+    """Open a connection to the stand-in database, creating and seeding it on first use."""
+    ensure_database(path, seed_accounts)
+    raw = sqlite3.connect(
+        path,
+        timeout=30,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,  # pooled connections move between DB executor threads
+    )
+    return SQLiteConnection(raw)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the SQLite stand-in database.")
+    parser.add_argument("path", nargs="?", default="sac_local.sqlite3")
+    parser.add_argument("--accounts", type=int, default=DEFAULT_SEED_ACCOUNTS)
+    args = parser.parse_args(argv)
+    ensure_database(args.path, args.accounts, rebuild=True)
+    print(f"Seeded {args.path} with {args.accounts} accounts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# core/streaming.py
+
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+RecordBatch = list[dict[str, Any]]
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def _dump(record: dict[str, Any]) -> str:
+    # Same value encoding FastAPI applies to regular (non-streamed) responses.
+    return json.dumps(jsonable_encoder(record), separators=(",", ":"))
+
+
+def _stream_error(exc: Exception) -> dict[str, Any]:
+    # The 200 status is already sent: end the body with an error object instead of cutting it.
+    logger.error(f"Stream failed after the response started - {exc}")
+    return {"error": str(exc)}
+
+
+async def _encode_json_array(batches: AsyncIterator[RecordBatch]) -> AsyncIterator[str]:
+    separator = ""
+    yield "["
+    try:
+        async for batch in batches:
+            if batch:
+                yield separator + ",".join(_dump(record) for record in batch)
+                separator = ","
+    except Exception as exc:
+        yield separator + _dump(_stream_error(exc))
+    yield "]"
+
+
+async def _encode_ndjson(batches: AsyncIterator[RecordBatch]) -> AsyncIterator[str]:
+    try:
+        async for batch in batches:
+            if batch:
+                yield "".join(_dump(record) + "\n" for record in batch)
+    except Exception as exc:
+        yield _dump(_stream_error(exc)) + "\n"
+
+
+async def _with_first(
+    first: RecordBatch | None,
+    batches: AsyncIterator[RecordBatch],
+    transform: Callable[[RecordBatch], RecordBatch] | None,
+) -> AsyncIterator[RecordBatch]:
+    try:
+        if first is not None:
+            yield transform(first) if transform else first
+        async for batch in batches:
+            yield transform(batch) if transform else batch
+    finally:
+        await batches.aclose()
+
+
+async def stream_records_response(
+    batches: AsyncIterator[RecordBatch],
+    *,
+    ndjson: bool = False,
+    transform: Callable[[RecordBatch], RecordBatch] | None = None,
+) -> StreamingResponse:
+    """
+    Stream record batches as a JSON array (default) or NDJSON, one batch in memory at a time.
+
+    The first batch is read before the response starts, so a failing query still raises
+    here (and maps to a normal error response). A later failure ends the body with an
+    {"error": ...} object (the last array element, or the last NDJSON line), so the
+    output stays parseable and the client can tell it was cut short.
+    """
+    try:
+        first = await anext(batches, None)
+    except BaseException:
+        await batches.aclose()
+        raise
+
+    records = _with_first(first, batches, transform)
+    if ndjson:
+        return StreamingResponse(_encode_ndjson(records), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_encode_json_array(records), media_type="application/json")
@@ -0,0 +1,255 @@
+# core/table_metadata.py
+
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from decimal import Decimal
+from typing import Any
+
+import pyodbc
+
+from core.config import settings
+from core.date_utils import parse_date_input
+
+logger = logging.getLogger(__name__)
+
+InputSize = tuple[int, int, int]
+
+_COLUMNS_QUERY = """
+SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_NAME = ?
+"""
+
+_STRING_TYPES = {
+    "char": pyodbc.SQL_CHAR,
+    "varchar": pyodbc.SQL_VARCHAR,
+    "nchar": pyodbc.SQL_WCHAR,
+    "nvarchar": pyodbc.SQL_WVARCHAR,
+}
+_INTEGER_TYPES = {
+    "bigint": pyodbc.SQL_BIGINT,
+    "int": pyodbc.SQL_INTEGER,
+    "smallint": pyodbc.SQL_SMALLINT,
+    "tinyint": pyodbc.SQL_TINYINT,
+}
+_DECIMAL_TYPES = {"decimal", "numeric", "money", "smallmoney"}
+_MONEY_PRECISION = {"money": (19, 4), "smallmoney": (10, 4)}
+_DATE_TYPES = {"date", "datetime", "datetime2", "smalldatetime", "datetimeoffset"}
+# A failed lookup is retried after this long, not after the full schema cache TTL.
+FAILED_LOOKUP_RETRY_SECONDS = 10.0
+
+
+class ColumnInfo:
+    """One INFORMATION_SCHEMA.COLUMNS row."""
+
+    __slots__ = ("name", "data_type", "max_length", "precision", "scale")
+
+    def __init__(
+        self,
+        name: str,
+        data_type: str,
+        max_length: int | None = None,
+        precision: int | None = None,
+        scale: int | None = None,
+    ):
+        self.name = name
+        self.data_type = (data_type or "").lower()
+        self.max_length = max_length
+        self.precision = precision
+        self.scale = scale
+
+    def input_size(self, values: Sequence[Any]) -> InputSize | None:
+        """
+        cursor.setinputsizes() entry for binding `values` to this column, or None to keep
+        pyodbc's default binding. Strings get the column's declared length instead of their
+        own, so every call produces the same parameter declaration (and reuses one plan).
+        """
+        present = [value for value in values if value is not None]
+
+        sql_type = _STRING_TYPES.get(self.data_type)
+        if sql_type is not None:
+            if not all(isinstance(value, str) for value in present):
+                return None
+            longest = max((len(value) for value in present), default=0)
+            size = self.max_length or 0
+            if size < 0 or longest > size:
+                size = 0  # (n)varchar(max), or a value the column cannot hold anyway
+            return (sql_type, size, 0)
+
+        sql_type = _INTEGER_TYPES.get(self.data_type)
+        if sql_type is not None:
+            if not all(isinstance(value, int | str) for value in present):
+                return None
+            return (sql_type, 0, 0)
+
+        if self.data_type in _DECIMAL_TYPES:
+            if not all(
+                isinstance(value, Decimal | int) and not isinstance(value, bool)
+                for value in present
+            ):
+                return None
+            precision, scale = _MONEY_PRECISION.get(
+                self.data_type, (self.precision or 18, self.scale or 0)
+            )
+            return (pyodbc.SQL_DECIMAL, precision, scale)
+
+        return None
+
+
+# table (lower-cased) -> (monotonic load time, columns)
+_tables: dict[str, tuple[float, dict[str, ColumnInfo]]] = {}
+# table (lower-cased) -> monotonic time before which a failed lookup is not retried
+_failed: dict[str, float] = {}
+_tables_lock = threading.Lock()
+
+
+def cached_table_columns(table: str) -> dict[str, ColumnInfo] | None:
+    """get_table_columns() without a connection: the cached entry, or None if due a load."""
+    key = table.lower()
+    if time.monotonic() < _failed.get(key, 0.0):
+        return {}
+    cached = _tables.get(key)
+    if cached is None:
+        return None
+    loaded_at, columns = cached
+    ttl = settings.DB_SCHEMA_CACHE_TTL_SECONDS
+    if ttl <= 0 or time.monotonic() - loaded_at < ttl:
+        return columns
+    return None
+
+
+def get_table_columns(conn: Any, table: str) -> dict[str, ColumnInfo]:
+    """
+    Column metadata for `table`, keyed by lower-cased column name. Loaded lazily on `conn`
+    and reloaded once older than settings.DB_SCHEMA_CACHE_TTL_SECONDS (0: never). An empty
+    mapping means "unknown table" (or a failed lookup): callers then skip typing/checks.
+    Failed lookups are not cached; they are retried after FAILED_LOOKUP_RETRY_SECONDS.
+    """
+    key = table.lower()
+    columns = cached_table_columns(table)
+    if columns is not None:
+        return columns
+
+    columns = {}
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_COLUMNS_QUERY, [table])
+        for row in cursor.fetchall():
+            info = ColumnInfo(*row)
+            columns[info.name.lower()] = info
+    except Exception:
+        logger.warning(f"Could not load column metadata for {table}", exc_info=True)
+        with _tables_lock:
+            _failed[key] = time.monotonic() + FAILED_LOOKUP_RETRY_SECONDS
+        return {}
+    finally:
+        cursor.close()
+
+    with _tables_lock:
+        _tables[key] = (time.monotonic(), columns)
+        _failed.pop(key, None)
+    return columns
+
+
+def parameter_sizes(
+    conn: Any,
+    table: str,
+    param_columns: Sequence[str | None],
+    rows: Sequence[Sequence[Any]],
+) -> list[InputSize | None] | None:
+    """
+    setinputsizes() list for a statement on `table` whose i-th parameter binds to
+    param_columns[i] (None: not a column value). `rows` holds one parameter sequence per
+    execution (a single one for execute, all of them for executemany).
+    Returns None when nothing could be typed.
+    """
+    if not settings.DB_TYPED_PARAMETERS:
+        return None
+
+    columns = get_table_columns(conn, table)
+    if not columns:
+        return None
+
+    sizes: list[InputSize | None] = []
+    for position, column in enumerate(param_columns):
+        info = columns.get(column.lower()) if column else None
+        sizes.append(info.input_size([row[position] for row in rows]) if info else None)
+
+    return sizes if any(sizes) else None
+
+
+def bind_parameter_types(
+    conn: Any,
+    cursor: Any,
+    table: str,
+    param_columns: Sequence[str | None],
+    rows: Sequence[Sequence[Any]],
+) -> None:
+    """
+    Declare parameter types on `cursor` before execute/executemany, when known. pyodbc keeps
+    input sizes on the cursor across executes, so an untyped statement clears them rather
+    than binding with an earlier statement's declarations.
+    """
+    sizes = parameter_sizes(conn, table, param_columns, rows)
+    if sizes is not None:
+        cursor.setinputsizes(sizes)
+    elif settings.DB_TYPED_PARAMETERS:
+        cursor.setinputsizes(None)
+
+
+def prepare_records(
+    conn: Any,
+    table: str,
+    records: list[dict[str, Any]],
+    required: Sequence[str] = (),
+) -> list[dict[str, Any]]:
+    """
+    Check rows against the table's columns before a write, so a stray payload key fails
+    (or is dropped) here instead of rolling back the whole batch after a round trip.
+
+    Unknown keys are dropped with a warning (DB_UNKNOWN_COLUMNS=drop) or rejected with
+    ValueError (reject); an unknown `required` column is always rejected. Non-empty strings
+    bound for date/time columns are parsed. Rows pass through unchanged with
+    DB_UNKNOWN_COLUMNS=allow or when the table's metadata is unavailable.
+    """
+    if settings.DB_UNKNOWN_COLUMNS == "allow":
+        return records
+
+    columns = get_table_columns(conn, table)
+    if not columns:
+        return records
+
+    unknown = sorted({key for record in records for key in record if key.lower() not in columns})
+    if unknown:
+        unknown_required = [column for column in required if column in unknown]
+        if unknown_required or settings.DB_UNKNOWN_COLUMNS == "reject":
+            raise ValueError(
+                f"Unknown column(s) for {table}: {', '.join(unknown_required or unknown)}"
+            )
+        logger.warning(f"Dropping unknown column(s) for {table}: {', '.join(unknown)}")
+
+    prepared: list[dict[str, Any]] = []
+    for record in records:
+        row: dict[str, Any] = {}
+        for key, value in record.items():
+            info = columns.get(key.lower())
+            if info is None:
+                continue
+            if info.data_type in _DATE_TYPES and isinstance(value, str) and value.strip():
+                value = parse_date_input(value)
+            row[key] = value
+        prepared.append(row)
+    return prepared
+
+
+def clear_table_metadata(table: str | None = None) -> None:
+    """Forget cached metadata (for one table, or all), e.g. after a schema change."""
+    with _tables_lock:
+        if table is None:
+            _tables.clear()
+            _failed.clear()
+        else:
+            _tables.pop(table.lower(), None)
+            _failed.pop(table.lower(), None)
@@ -0,0 +1,185 @@
+# core/token_revocation.py
+
+import logging
+import threading
+import time
+from typing import Any
+
+from core.config import settings
+from core.db_executor import READ, run_db
+from core.db_helpers import insert_records, run_raw_query
+from db import db_connection
+
+logger = logging.getLogger(__name__)
+
+_REVOKED_QUERY = "SELECT Jti, ExpiresAt FROM tblRevokedTokens WHERE ExpiresAt > ?"
+_VERSIONS_QUERY = "SELECT UserID, TokenVersion FROM tblUserTokenVersions"
+_DISABLED_QUERY = "SELECT ID FROM tblUsers WHERE active = 0"
+
+
+class RevocationList:
+    """
+    In-memory view of what invalidates a self-contained session token before its exp:
+    revoked token ids (jti), a minimum token version per user (bumped on role changes
+    and forced sign-outs) and deactivated users. Checks are dict/set lookups; refresh()
+    reloads all three from the database, periodically on a background thread after
+    start(), so revocations made by other instances are picked up within one interval.
+    Until the first load, `loaded` is False and is_revoked() knows nothing: callers must
+    not trust token claims on it alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked: dict[str, float] = {}
+        self._versions: dict[str, int] = {}
+        self._disabled: set[str] = set()
+        self.loaded_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_revoked(self, claims: dict[str, Any]) -> bool:
+        user_id = str(claims.get("sub"))
+        if claims.get("jti") in self._revoked or user_id in self._disabled:
+            return True
+        return int(claims.get("ver", 0)) < self._versions.get(user_id, 0)
+
+    def version_of(self, user_id: Any) -> int:
+        return self._versions.get(str(user_id), 0)
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def set_version(self, user_id: Any, version: int) -> None:
+        with self._lock:
+            key = str(user_id)
+            self._versions[key] = max(version, self._versions.get(key, 0))
+
+    def replace(
+        self,
+        revoked: dict[str, float],
+        versions: dict[str, int],
+        disabled: set[str],
+    ) -> None:
+        with self._lock:
+            # Revocations only ever end at exp and versions only grow, so anything applied
+            # locally while the reload ran is kept rather than overwritten.
+            now = time.time()
+            for jti, expires_at in self._revoked.items():
+                if expires_at > now:
+                    revoked.setdefault(jti, expires_at)
+            for user_id, version in self._versions.items():
+                versions[user_id] = max(version, versions.get(user_id, 0))
+            self._revoked = revoked
+            self._versions = versions
+            self._disabled = disabled
+            self.loaded_at = time.time()
+
+    def refresh(self) -> int:
+        """Reload the lists from the database (blocking). Returns how many entries loaded."""
+        now = int(time.time())
+        revoked = {
+            str(row["Jti"]): float(row["ExpiresAt"])
+            for row in run_raw_query(_REVOKED_QUERY, [now], read_only=False)
+        }
+        versions = {
+            str(row["UserID"]): int(row["TokenVersion"])
+            for row in run_raw_query(_VERSIONS_QUERY, [], read_only=False)
+        }
+        disabled = {str(row["ID"]) for row in run_raw_query(_DISABLED_QUERY, [], read_only=False)}
+        self.replace(revoked, versions, disabled)
+        return len(revoked) + len(versions) + len(disabled)
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.warning(
+                    "Token revocation refresh failed; keeping the last list", exc_info=True
+                )
+
+    def start(self, interval: float) -> None:
+        """Start the background refresher (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name="token-revocations", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "revoked_tokens": len(self._revoked),
+                "user_versions": len(self._versions),
+                "disabled_users": len(self._disabled),
+                "loaded_at": self.loaded_at,
+            }
+
+
+revocations = RevocationList()
+
+
+def revoke_token(claims: dict[str, Any]) -> None:
+    """Persist a token's jti on the denylist (until its exp) and apply it locally. Blocking."""
+    jti, expires_at = claims["jti"], int(claims["exp"])
+    insert_records(
+        "tblRevokedTokens",
+        [{"Jti": jti, "UserID": int(claims["sub"]), "ExpiresAt": expires_at}],
+    )
+    revocations.revoke(jti, expires_at)
+
+
+def bump_token_version(user_id: int) -> int:
+    """
+    Invalidate every token issued to `user_id` so far (tokens carry the version current at
+    issue time). Blocking; returns the new version.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE tblUserTokenVersions SET TokenVersion = TokenVersion + 1 WHERE UserID = ?",
+            (user_id,),
+        )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                "INSERT INTO tblUserTokenVersions (UserID, TokenVersion) VALUES (?, 1)",
+                (user_id,),
+            )
+        cursor.execute("SELECT TokenVersion FROM tblUserTokenVersions WHERE UserID = ?", (user_id,))
+        version = int(cursor.fetchone()[0])
+        conn.commit()
+
+    revocations.set_version(user_id, version)
+    return version
+
+
+async def start_revocation_refresh() -> int:
+    """
+    Startup primer: load the revocation lists, then keep them fresh in the background.
+    Does nothing unless AUTH_SELF_CONTAINED_TOKENS is on. The refresher starts even if
+    this first load fails, so the list still loads once the database answers.
+    """
+    if not settings.AUTH_SELF_CONTAINED_TOKENS:
+        return 0
+    try:
+        return await run_db(READ, revocations.refresh)
+    finally:
+        revocations.start(settings.AUTH_REVOCATION_REFRESH_SECONDS)
+
+
+def stop_revocation_refresh() -> None:
+    revocations.stop()
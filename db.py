@@ -1,50 +1,569 @@
 # db.py
 
+import logging
+import math
+import threading
+import time
 import warnings
+from collections import deque
+from collections.abc import Callable
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
 
 import pyodbc
 
 from core.config import settings
+from core.db_token import access_token_attrs
 
 warnings.filterwarnings(
     "ignore", category=UserWarning, message="pandas only supports SQLAlchemy connectable"
 )
 
+logger = logging.getLogger(__name__)
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled connection becomes available within the pool timeout."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a pool that has been closed."""
+
+
+class QueryInterruptedError(Exception):
+    """Base for statements stopped by their query scope; the app maps these to 504."""
+
+
+class QueryTimeoutError(QueryInterruptedError, TimeoutError):
+    """Raised when a statement runs past the time budget of its query scope."""
+
+
+class QueryCancelledError(QueryInterruptedError, RuntimeError):
+    """Raised when a statement is cancelled because the request behind it went away."""
+
 
 # Build SQL connection string
-def _build_connection_string() -> str:
-    return (
-        f"Driver={settings.DB_DRIVER};"
-        f"Server={settings.DB_SERVER};"
-        f"Database={settings.DB_NAME};"
-        f"Authentication={settings.DB_AUTH};"
-        "Encrypt=yes;"
-        "TrustServerCertificate=no;"
-    )
+def _build_connection_string(read_only: bool = False) -> str:
+    server = (settings.DB_READ_SERVER or settings.DB_SERVER) if read_only else settings.DB_SERVER
+    conn_str = f"Driver={settings.DB_DRIVER};Server={server};Database={settings.DB_NAME};"
+    if not settings.DB_ACCESS_TOKEN:
+        # The driver rejects Authentication= alongside a pre-acquired access token.
+        conn_str += f"Authentication={settings.DB_AUTH};"
+    conn_str += "Encrypt=yes;TrustServerCertificate=no;"
+    if read_only:
+        # Lets an availability-group listener route the session to a readable secondary.
+        conn_str += "ApplicationIntent=ReadOnly;"
+    return conn_str
+
+
+def read_routing_enabled() -> bool:
+    """True when reads have their own target (DB_READ_SERVER and/or DB_READ_INTENT)."""
+    return bool(settings.DB_READ_SERVER or settings.DB_READ_INTENT)
+
+
+def _connect_mssql(read_only: bool = False) -> pyodbc.Connection:
+    conn_str = _build_connection_string(read_only)
+    if settings.DB_ACCESS_TOKEN:
+        # Cached and refreshed in the background, so connecting never waits on Azure AD.
+        return pyodbc.connect(conn_str, attrs_before=access_token_attrs())
+    return pyodbc.connect(conn_str)
+
+
+def _connect_sqlite(read_only: bool = False) -> Any:
+    # One local file serves reads and writes alike; read_only only selects the pool.
+    from core.sqlite_backend import connect
+
+    return connect(settings.DB_SQLITE_PATH, settings.DB_SQLITE_SEED_ACCOUNTS)
+
+
+_BACKENDS: dict[str, Callable[[bool], Any]] = {
+    "mssql": _connect_mssql,
+    "sqlite": _connect_sqlite,
+}
 
 
 # New Connection Getter
-def get_raw_connection() -> pyodbc.Connection:
+def get_raw_connection(read_only: bool = False) -> pyodbc.Connection:
     """
-    Returns a NEW pyodbc connection.
-    Services or context managers will use this.
+    Returns a NEW connection from the configured backend (settings.DB_BACKEND), to the
+    read-only target when read_only is set. The connection pools use this as their
+    factory; prefer db_connection() elsewhere.
     """
-    conn_str = _build_connection_string()
-    return pyodbc.connect(conn_str)
+    connector = _BACKENDS.get(settings.DB_BACKEND)
+    if connector is None:
+        raise ValueError(f"Unknown DB_BACKEND: {settings.DB_BACKEND}")
+    return connector(read_only)
+
+
+class _PoolEntry:
+    __slots__ = ("conn", "created_at", "idle_since")
+
+    def __init__(self, conn: Any, created_at: float):
+        self.conn = conn
+        self.created_at = created_at
+        self.idle_since = created_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of DB connections.
+
+    - min_size connections are opened by fill() and kept around once created
+    - at most max_size connections are open at any time (idle + checked out)
+    - acquire() blocks up to `timeout` seconds when exhausted; timeout <= 0 fails fast
+    - connections older than recycle_seconds are closed and replaced on checkout
+    - with pre_ping, connections idle for pre_ping_idle_seconds or longer are validated
+      with SELECT 1 before being handed out; a recently used one is trusted, and one that
+      fails anyway is discarded by connection() on the pyodbc.Error
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        min_size: int = 0,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        recycle_seconds: float | None = 1800,
+        pre_ping: bool = True,
+        pre_ping_idle_seconds: float = 0.0,
+    ):
+        if max_size < 1:
+            raise ValueError("Pool max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("Pool min_size must be between 0 and max_size")
+
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_seconds = recycle_seconds
+        self.pre_ping = pre_ping
+        self.pre_ping_idle_seconds = pre_ping_idle_seconds
+
+        self._cond = threading.Condition()
+        self._idle: deque[_PoolEntry] = deque()
+        self._in_use: dict[int, _PoolEntry] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+    # ---- internal helpers ----
+
+    def _connect(self) -> _PoolEntry:
+        return _PoolEntry(self._factory(), time.monotonic())
+
+    def _is_expired(self, entry: _PoolEntry) -> bool:
+        if not self.recycle_seconds or self.recycle_seconds <= 0:
+            return False
+        return time.monotonic() - entry.created_at >= self.recycle_seconds
+
+    def _needs_ping(self, entry: _PoolEntry) -> bool:
+        return self.pre_ping and time.monotonic() - entry.idle_since >= self.pre_ping_idle_seconds
+
+    @staticmethod
+    def _ping(conn: Any) -> bool:
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            logger.warning("Pooled connection failed validation; replacing it", exc_info=True)
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            logger.debug("Error closing pooled connection", exc_info=True)
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    # ---- public API ----
+
+    def acquire(self) -> Any:
+        deadline = time.monotonic() + self.timeout if self.timeout > 0 else None
+        entry: _PoolEntry | None = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if deadline is None:
+                    raise PoolExhaustedError(
+                        f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"Timed out after {self.timeout}s waiting for a pooled connection"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        # Slot reserved; validation and connect happen outside the lock.
+        if entry is not None and (
+            self._is_expired(entry) or (self._needs_ping(entry) and not self._ping(entry.conn))
+        ):
+            self._close_quietly(entry.conn)
+            entry = None
+
+        if entry is None:
+            try:
+                entry = self._connect()
+            except Exception:
+                self._forget()
+                raise
+
+        with self._cond:
+            self._in_use[id(entry.conn)] = entry
+        return entry.conn
+
+    def release(self, conn: Any, *, discard: bool = False) -> None:
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            # Not ours (or already released); nothing to account for.
+            self._close_quietly(conn)
+            return
+
+        if not discard:
+            try:
+                # Reset any open transaction and query timeout before the connection is reused.
+                conn.rollback()
+                conn.timeout = 0
+            except Exception:
+                logger.warning("Rollback failed on pooled connection; discarding", exc_info=True)
+                discard = True
+
+        with self._cond:
+            if discard or self._closed or self._is_expired(entry):
+                self._size -= 1
+                reuse = False
+            else:
+                entry.idle_since = time.monotonic()
+                self._idle.append(entry)
+                reuse = True
+            self._cond.notify()
+
+        if not reuse:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except pyodbc.Error:
+            # Driver-level failure: the connection state is unknown, don't reuse it.
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def fill(self, count: int | None = None) -> int:
+        """Open idle connections until `count` (default min_size) exist. Returns how many opened."""
+        target = self.min_size if count is None else min(count, self.max_size)
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= target:
+                    return opened
+                self._size += 1
+            try:
+                entry = self._connect()
+            except Exception:
+                self._forget()
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+            opened += 1
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.conn)
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": self._waiting,
+                "max_size": self.max_size,
+            }
+
+
+_pool: ConnectionPool | None = None
+_read_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _pool_factory() -> Any:
+    # Resolved at call time so get_raw_connection can be swapped (tests, alternate drivers).
+    return get_raw_connection()
+
+
+def _read_pool_factory() -> Any:
+    return get_raw_connection(read_only=True)
+
+
+def _new_pool(factory: Callable[[], Any]) -> ConnectionPool:
+    return ConnectionPool(
+        factory,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        # Headroom for streamed reads, so they never take a lane worker's connection.
+        max_size=settings.DB_POOL_MAX_SIZE + settings.DB_MAX_OPEN_STREAMS,
+        timeout=settings.DB_POOL_TIMEOUT,
+        recycle_seconds=settings.DB_POOL_RECYCLE_SECONDS,
+        pre_ping=settings.DB_POOL_PRE_PING,
+        pre_ping_idle_seconds=settings.DB_POOL_PRE_PING_IDLE_SECONDS,
+    )
+
+
+def get_pool(read_only: bool = False) -> ConnectionPool:
+    """
+    Return the process-wide connection pool, creating it from settings on first use.
+    With read_only and read routing enabled this is the separate read-intent pool;
+    otherwise reads share the primary pool.
+    """
+    global _pool, _read_pool
+    if read_only and read_routing_enabled():
+        if _read_pool is None:
+            with _pool_lock:
+                if _read_pool is None:
+                    _read_pool = _new_pool(_read_pool_factory)
+        return _read_pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _new_pool(_pool_factory)
+    return _pool
+
+
+def close_pool() -> None:
+    """Close every idle pooled connection and drop the pools; the next use recreates them."""
+    global _pool, _read_pool
+    with _pool_lock:
+        pools = [_pool, _read_pool]
+        _pool = _read_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.close()
+
+
+# SQLSTATEs the driver reports for an expired query timeout and for a cancelled statement.
+_TIMEOUT_SQLSTATE = "HYT00"
+_CANCELLED_SQLSTATE = "HY008"
+
+
+class QueryScope:
+    """
+    Time budget and in-flight cursors for the DB work done on behalf of one request.
+
+    Cursors opened with scoped_cursor() get the remaining budget as their query timeout,
+    and cancel() interrupts any statement they are running (from any thread).
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.deadline = time.monotonic() + self.timeout if self.timeout else None
+        self.cancelled = False
+        self._cursors: set[Any] = set()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise QueryCancelledError("Query cancelled: the request is no longer active")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise QueryTimeoutError(f"Query exceeded its {self.timeout:g}s time budget")
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            try:
+                cursor.cancel()
+            except Exception:
+                logger.debug("Error cancelling statement", exc_info=True)
+
+    def _register(self, cursor: Any) -> None:
+        with self._lock:
+            if not self.cancelled:
+                self._cursors.add(cursor)
+                return
+        raise QueryCancelledError("Query cancelled: the request is no longer active")
+
+    def _unregister(self, cursor: Any) -> None:
+        with self._lock:
+            self._cursors.discard(cursor)
+
+
+_query_scope: ContextVar[QueryScope | None] = ContextVar("query_scope", default=None)
+
+
+def current_query_scope() -> QueryScope | None:
+    return _query_scope.get()
+
+
+@contextmanager
+def query_scope(timeout: float | None = None):
+    """Run the enclosed DB work (including executor jobs started from it) under one QueryScope."""
+    scope = QueryScope(timeout)
+    token = _query_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _query_scope.reset(token)
+
+
+READ_COMMITTED = "read_committed"
+SNAPSHOT = "snapshot"
+_ISOLATION_LEVELS = {READ_COMMITTED: "READ COMMITTED", SNAPSHOT: "SNAPSHOT"}
+
+_read_isolation: ContextVar[str | None] = ContextVar("read_isolation", default=None)
+
+
+def check_isolation_level(level: str) -> str:
+    if level not in _ISOLATION_LEVELS:
+        raise ValueError(f"Unknown read isolation level: {level}")
+    return level
+
+
+def current_read_isolation() -> str:
+    """Isolation for reads on their own connection: enclosing read_isolation() or the default."""
+    return _read_isolation.get() or check_isolation_level(settings.DB_READ_ISOLATION)
+
+
+@contextmanager
+def read_isolation(level: str):
+    """
+    Run the enclosed reads (including executor jobs started from it) at `level`.
+
+    SNAPSHOT reads see the last committed version of each row and never wait on writer
+    locks (the database needs ALLOW_SNAPSHOT_ISOLATION ON). READ_COMMITTED keeps the
+    database default, which already reads row versions when READ_COMMITTED_SNAPSHOT is on.
+    """
+    token = _read_isolation.set(check_isolation_level(level))
+    try:
+        yield level
+    finally:
+        _read_isolation.reset(token)
+
+
+@contextmanager
+def isolated_reads(conn: Any):
+    """
+    Apply current_read_isolation() to a connection checked out for reads, and restore
+    READ COMMITTED before it goes back to the pool (session isolation outlives rollback).
+    """
+    level = current_read_isolation()
+    if level == READ_COMMITTED:
+        yield conn
+        return
+
+    def _set(isolation: str) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {_ISOLATION_LEVELS[isolation]}")
+        finally:
+            cursor.close()
+
+    _set(level)
+    try:
+        yield conn
+    finally:
+        # End the snapshot transaction first; the level can only change outside one.
+        conn.rollback()
+        _set(READ_COMMITTED)
+
+
+@contextmanager
+def scoped_cursor(conn: Any):
+    """
+    Open a cursor bound to the current query scope, if there is one.
+
+    The remaining budget becomes the statement timeout and the scope can cancel the cursor;
+    driver timeout/cancel errors surface as QueryTimeoutError / QueryCancelledError.
+    """
+    scope = _query_scope.get()
+    remaining = None
+    if scope is not None:
+        scope.check()
+        remaining = scope.remaining()
+
+    # pyodbc applies the connection timeout to cursors created from it; 0 disables it.
+    conn.timeout = max(1, math.ceil(remaining)) if remaining is not None else 0
+    cursor = conn.cursor()
+    try:
+        if scope is not None:
+            scope._register(cursor)
+        yield cursor
+    except pyodbc.Error as exc:
+        state = exc.args[0] if exc.args else None
+        if state == _TIMEOUT_SQLSTATE:
+            raise QueryTimeoutError(
+                f"Query exceeded its {scope.timeout:g}s time budget"
+                if scope is not None and scope.timeout
+                else "Query timeout expired"
+            ) from exc
+        if state == _CANCELLED_SQLSTATE or (scope is not None and scope.cancelled):
+            raise QueryCancelledError("Query cancelled: the request is no longer active") from exc
+        raise
+    finally:
+        if scope is not None:
+            scope._unregister(cursor)
+        cursor.close()
 
 
 # Context Manager
 @contextmanager
-def db_connection():
+def db_connection(read_only: bool = False):
     """
+    Check a connection out of the pool and return it on exit.
+
     Usage:
         with db_connection() as conn:
             cursor = conn.cursor()
             ...
+
+    Uncommitted work is rolled back when the connection goes back to the pool.
+    read_only=True routes to the read-intent target when one is configured; use it only
+    for reads that can tolerate replica lag (never for read-after-write).
     """
-    conn = get_raw_connection()
-    try:
+    with get_pool(read_only).connection() as conn:
         yield conn
-    finally:
-        conn.close()
\ No newline at end of file
@@ -1,18 +1,29 @@
 import logging
+import uuid
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import HTTPException, Request, Response
+from fastapi import Depends, HTTPException, Request, Response
 
 from core.config import settings
+from core.db_executor import READ, WRITE, run_db
 from core.db_helpers import run_raw_query
-from core.encrypt import hash_password, verify_password
+from core.encrypt import (
+    PasswordHashingBusyError,
+    hash_password,
+    run_password_task,
+    verify_password,
+)
 from core.jwt_handler import (
     ACCESS_TOKEN_VALIDITY,
     create_access_token,
     decode_access_token,
+    forget_access_token,
 )
+from core.principal_cache import principal_cache
+from core.token_revocation import bump_token_version, revocations, revoke_token
 from db import db_connection
+from services.sac.account_validation import normalize_role
 
 logger = logging.getLogger(__name__)
 
@@ -49,9 +60,76 @@ def _persist_hashed_password(user_id: int, new_hash: str) -> None:
         conn.commit()
 
 
+def _user_profile(user_record: dict[str, Any]) -> dict[str, Any]:
+    # Only safe fields leave the service.
+    return {
+        "id": user_record["ID"],
+        "first_name": user_record["FirstName"],
+        "last_name": user_record["LastName"],
+        "email": user_record["Email"],
+        "role": user_record["Role"],
+        "branch": user_record["BranchName"],
+    }
+
+
+def _session_claims(user: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Extra claims for AUTH_SELF_CONTAINED_TOKENS: the safe profile fields, the user's current
+    token version and a token id (jti) that logout can put on the denylist.
+    Until the revocation list has loaded the version is unknown, so the token is issued
+    without them and validated against tblUsers like any other.
+    """
+    if not settings.AUTH_SELF_CONTAINED_TOKENS or not revocations.loaded:
+        return None
+    return {
+        "first_name": user["first_name"],
+        "last_name": user["last_name"],
+        "email": user["email"],
+        "branch": user["branch"],
+        "ver": revocations.version_of(user["id"]),
+        "jti": uuid.uuid4().hex,
+    }
+
+
+def _user_from_claims(payload: dict[str, Any]) -> dict[str, Any]:
+    user_id = str(payload["sub"])
+    return {
+        "id": int(user_id) if user_id.isdigit() else user_id,
+        "first_name": payload.get("first_name"),
+        "last_name": payload.get("last_name"),
+        "email": payload.get("email"),
+        "role": payload.get("role"),
+        "branch": payload.get("branch"),
+    }
+
+
+def invalidate_user_sessions(user_id: Any = None) -> int:
+    """
+    Forget cached principals of `user_id` (or of every user), e.g. after a deactivation or
+    role change, so their next request re-reads tblUsers. Returns how many were dropped.
+    """
+    return principal_cache.invalidate(user_id)
+
+
+async def revoke_user_tokens(user_id: int) -> int:
+    """
+    Sign `user_id` out everywhere: bump their token version, so every self-contained token
+    issued so far is rejected (other instances follow within
+    AUTH_REVOCATION_REFRESH_SECONDS), and drop their cached sessions. Returns the version
+    (0 without AUTH_SELF_CONTAINED_TOKENS, where only the cached sessions are dropped).
+    """
+    if not settings.AUTH_SELF_CONTAINED_TOKENS:
+        invalidate_user_sessions(user_id)
+        return 0
+    version = await run_db(WRITE, bump_token_version, user_id)
+    invalidate_user_sessions(user_id)
+    return version
+
+
 # -------------------------
 # DB HELPERS FOR AUTH USER
 # -------------------------
+# Pinned to the primary: login rewrites password hashes and must see new/disabled users at once.
 
 
 def get_user_by_email(email: str) -> dict[str, Any] | None:
@@ -67,7 +145,7 @@ def get_user_by_email(email: str) -> dict[str, Any] | None:
     """
 
     try:
-        results = run_raw_query(query, [email])
+        results = run_raw_query(query, [email], read_only=False)
     except Exception as e:
         logger.error(f"DB error fetching user by email {email}: {e}")
         raise
@@ -90,7 +168,7 @@ def get_user_by_id(user_id: int) -> dict[str, Any] | None:
     """
 
     try:
-        results = run_raw_query(query, [user_id])
+        results = run_raw_query(query, [user_id], read_only=False)
     except Exception as e:
         logger.error(f"DB error fetching user by id {user_id}: {e}")
         raise
@@ -111,6 +189,7 @@ async def login_user(login_data: dict[str, Any], response: Response):
     Validates user email/password.
     Sets HTTP-only cookie.
     Returns user profile + token.
+    DB lookups run on the DB executor and bcrypt on a worker thread, off the event loop.
     """
 
     email = login_data.get("email")
@@ -120,7 +199,7 @@ async def login_user(login_data: dict[str, Any], response: Response):
         raise HTTPException(status_code=400, detail={"error": "Missing email or password"})
 
     # Fetch user from DB
-    user_record = get_user_by_email(email)
+    user_record = await run_db(READ, get_user_by_email, email)
 
     if not user_record:
         logger.warning(f"Login failed: user not found ({email})")
@@ -130,7 +209,14 @@ async def login_user(login_data: dict[str, Any], response: Response):
     needs_rehash = False
 
     try:
-        password_valid = verify_password(password, stored_password)
+        password_valid = await run_password_task(verify_password, password, stored_password)
+    except PasswordHashingBusyError as exc:
+        logger.warning(f"Login shed, password workers busy ({email}): {exc}")
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "Too many sign-in attempts in progress, try again shortly"},
+            headers={"Retry-After": "1"},
+        ) from exc
     except ValueError:
         if password == stored_password:
             password_valid = True
@@ -144,24 +230,17 @@ async def login_user(login_data: dict[str, Any], response: Response):
 
     if needs_rehash:
         try:
-            new_hash = hash_password(password)
-            _persist_hashed_password(user_record["ID"], new_hash)
+            new_hash = await run_password_task(hash_password, password)
+            await run_db(WRITE, _persist_hashed_password, user_record["ID"], new_hash)
             logger.info(f"Rehashed legacy password for user {email}")
         except Exception as exc:
             logger.error(f"Failed to rehash password for user {email}: {exc}", exc_info=True)
 
     # Prepare user payload (only safe fields)
-    user = {
-        "id": user_record["ID"],
-        "first_name": user_record["FirstName"],
-        "last_name": user_record["LastName"],
-        "email": user_record["Email"],
-        "role": user_record["Role"],
-        "branch": user_record["BranchName"],
-    }
+    user = _user_profile(user_record)
 
     # Create JWT
-    token = create_access_token(user["id"], user.get("role"))
+    token = create_access_token(user["id"], user.get("role"), _session_claims(user))
 
     # Set cookie
     _set_session_cookie(response, token)
@@ -175,6 +254,10 @@ async def get_current_user_from_token(request: Request):
     """
     Validates JWT from cookie.
     Returns decoded user.
+    Self-contained tokens (AUTH_SELF_CONTAINED_TOKENS) are answered from their claims after
+    an in-memory revocation check, once the revocation list has loaded. Otherwise the user
+    record is cached per (user id, token) for AUTH_PRINCIPAL_CACHE_TTL_SECONDS; a miss reads
+    tblUsers on the DB read lane.
     """
 
     token = request.cookies.get(SESSION_COOKIE_NAME)
@@ -188,17 +271,18 @@ async def get_current_user_from_token(request: Request):
             user_id = payload["user"].get("id")
         if not user_id:
             raise HTTPException(status_code=401, detail={"error": "Invalid token"})
-        user_record = get_user_by_id(user_id)
-        if not user_record:
-            raise HTTPException(status_code=401, detail={"error": "Invalid token"})
-        user = {
-            "id": user_record["ID"],
-            "first_name": user_record["FirstName"],
-            "last_name": user_record["LastName"],
-            "email": user_record["Email"],
-            "role": user_record["Role"],
-            "branch": user_record["BranchName"],
-        }
+        if settings.AUTH_SELF_CONTAINED_TOKENS and "ver" in payload and revocations.loaded:
+            if revocations.is_revoked(payload):
+                raise HTTPException(status_code=401, detail={"error": "Token revoked"})
+            user = _user_from_claims(payload)
+        else:
+            user = principal_cache.get(user_id, token)
+        if user is None:
+            user_record = await run_db(READ, get_user_by_id, user_id)
+            if not user_record:
+                raise HTTPException(status_code=401, detail={"error": "Invalid token"})
+            user = _user_profile(user_record)
+            principal_cache.put(user_id, token, user)
     except Exception as e:
         logger.error(f"Token decode failed: {e}")
         raise HTTPException(status_code=401, detail={"error": "Invalid token"}) from e
@@ -206,10 +290,30 @@ async def get_current_user_from_token(request: Request):
     return {"message": "User authenticated", "user": user, "token": token}
 
 
-async def logout_user(response: Response):
+async def require_admin(current_user: Annotated[dict, Depends(get_current_user_from_token)]):
+    """
+    Route dependency for admin-only operations: 403 unless the authenticated user's role
+    is Admin (same role normalization as the SAC account validation).
+    """
+    if normalize_role((current_user.get("user") or {}).get("role")) != "Admin":
+        raise HTTPException(status_code=403, detail={"error": "Admin role required"})
+    return current_user
+
+
+async def logout_user(response: Response, request: Request | None = None):
     """
     Deletes the session cookie.
+    With self-contained tokens the token's jti also goes on the revocation list.
     """
+    token = request.cookies.get(SESSION_COOKIE_NAME) if request is not None else None
+    if token and settings.AUTH_SELF_CONTAINED_TOKENS:
+        try:
+            payload = decode_access_token(token)
+            if "jti" in payload:
+                await run_db(WRITE, revoke_token, payload)
+            forget_access_token(token)
+        except Exception as exc:
+            logger.warning(f"Could not revoke token on logout: {exc}")
     _clear_session_cookie(response)
     logger.info("User logged out successfully")
     return {"message": "Logged out successfully"}
@@ -227,6 +331,14 @@ async def refresh_user_token(request: Request, response: Response, token: str |
     if not token:
         raise HTTPException(status_code=401, detail={"error": "No token found"})
 
+    # A logged-out or superseded token must not be renewed before the denylist is known.
+    if settings.AUTH_SELF_CONTAINED_TOKENS and not revocations.loaded:
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "Token refresh is not available yet, try again shortly"},
+            headers={"Retry-After": "1"},
+        )
+
     try:
         payload = decode_access_token(token)
         user_id = payload.get("sub")
@@ -234,15 +346,18 @@ async def refresh_user_token(request: Request, response: Response, token: str |
             user_id = payload["user"].get("id")
         if not user_id:
             raise HTTPException(status_code=401, detail={"error": "Invalid token"})
-        user_record = get_user_by_id(user_id)
+        if settings.AUTH_SELF_CONTAINED_TOKENS and revocations.is_revoked(payload):
+            raise HTTPException(status_code=401, detail={"error": "Token revoked"})
+        user_record = await run_db(READ, get_user_by_id, user_id)
         if not user_record:
             raise HTTPException(status_code=401, detail={"error": "Invalid token"})
     except Exception as e:
         logger.error(f"Token refresh failed: {e}")
         raise HTTPException(status_code=401, detail={"error": "Invalid token"}) from e
 
-    # Generate new token
-    new_token = create_access_token(user_id, payload.get("role"))
+    # Generate new token from the freshly loaded record, so role changes apply on refresh
+    user = _user_profile(user_record)
+    new_token = create_access_token(user_id, user["role"], _session_claims(user))
 
     _set_session_cookie(response, new_token)
 
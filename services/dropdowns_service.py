@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 from copy import deepcopy
@@ -153,6 +154,13 @@ async def _fetch_dynamic_dropdown(dd_type: str) -> list[dict[str, Any]]:
         raise HTTPException(status_code=500, detail={"error": str(exc)}) from exc
 
 
+async def prime_dropdown_cache() -> int:
+    """Load every dropdown, and the combined "all" list, into the cache (startup warm-up)."""
+    names = ["all", *_DROPDOWN_QUERIES]
+    await asyncio.gather(*(get_dropdown_values(name) for name in names))
+    return len(names)
+
+
 async def get_all_dropdowns() -> list[dict[str, Any]]:
     query = """
         SELECT DD_Type, DD_Value, DD_SortOrder
@@ -74,7 +74,7 @@ ZERO_REQUIRED_LEVELS = {
 }
 
 
-def _normalize_role(role: str | None) -> str:
+def normalize_role(role: str | None) -> str:
     if not role:
         return DEFAULT_ROLE
     lowered = role.strip().lower()
@@ -156,7 +156,7 @@ def validate_account_payload(payload: dict[str, Any], role: str | None) -> list[
     Validate the SAC account payload and return a list of error dicts.
     """
 
-    normalized_role = _normalize_role(role)
+    normalized_role = normalize_role(role)
     errors: list[dict[str, str]] = []
 
     for field, message in REQUIRED_FIELDS:
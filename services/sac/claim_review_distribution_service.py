@@ -6,10 +6,13 @@ from fastapi import HTTPException
 from core.date_utils import format_records_dates, normalize_payload_dates
 from core.db_helpers import (
     delete_records_async,
+    fetch_page_async,
     fetch_records_async,
     merge_upsert_records_async,
     sanitize_filters,
+    sanitize_table_fields_async,
 )
+from db import QueryInterruptedError
 
 
 logger = logging.getLogger(__name__)
@@ -17,13 +20,36 @@ logger = logging.getLogger(__name__)
 TABLE_NAME = "tblDistribute_ClaimReview"
 ALLOWED_FILTERS = {"CustomerNum", "EMailAddress"}
 IDENTITY_COLUMNS = {"PK_Number"}
+PAGE_KEY_COLUMNS = ["PK_Number"]
 
 
-async def get_distribution(query_params: dict[str, Any]):
+async def get_distribution(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+):
     try:
         filters = sanitize_filters(query_params, ALLOWED_FILTERS)
-        records = await fetch_records_async(table=TABLE_NAME, filters=filters)
+        columns = await sanitize_table_fields_async(TABLE_NAME, fields)
+        if limit:
+            page = await fetch_page_async(
+                table=TABLE_NAME,
+                filters=filters,
+                key_columns=PAGE_KEY_COLUMNS,
+                limit=limit,
+                after=after,
+                columns=columns,
+                include_total=include_total,
+            )
+            page["items"] = format_records_dates(page["items"])
+            return page
+        records = await fetch_records_async(table=TABLE_NAME, filters=filters, columns=columns)
         return format_records_dates(records)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
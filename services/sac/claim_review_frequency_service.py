@@ -8,15 +8,19 @@ from fastapi import HTTPException
 
 from core.date_utils import format_records_dates, normalize_payload_dates
 from core.db_helpers import (
+    fetch_page_async,
     fetch_records_async,
     merge_upsert_records_async,
     sanitize_filters,
+    sanitize_table_fields_async,
 )
+from db import QueryInterruptedError
 
 logger = logging.getLogger(__name__)
 
 TABLE_NAME = "tblClaimReviewFrequency"
 ORDER_BY_COLUMN = "MthNum"
+PAGE_KEY_COLUMNS = [ORDER_BY_COLUMN, "CustNum"]
 ALLOWED_FILTERS_DB = {"CustNum", "MthNum"}
 FILTER_MAP = {"CustomerNum": "CustNum"}
 
@@ -35,20 +39,44 @@ def _restore_customer_num(records: list[dict[str, Any]]) -> list[dict[str, Any]]
     return records
 
 
-async def get_frequency(query_params: dict[str, Any]) -> list[dict[str, Any]]:
+async def get_frequency(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+) -> list[dict[str, Any]] | dict[str, Any]:
     """
     Fetch account(s) from tblClaimReviewFrequency.
     """
     try:
         normalized = {FILTER_MAP.get(key, key): value for key, value in query_params.items()}
         filters = sanitize_filters(normalized, ALLOWED_FILTERS_DB)
+        requested = await sanitize_table_fields_async(TABLE_NAME, fields, FILTER_MAP)
+        columns = [FILTER_MAP.get(field, field) for field in requested or []]
+        if limit:
+            page = await fetch_page_async(
+                table=TABLE_NAME,
+                filters=filters,
+                key_columns=PAGE_KEY_COLUMNS,
+                limit=limit,
+                after=after,
+                columns=columns or None,
+                include_total=include_total,
+            )
+            page["items"] = format_records_dates(_restore_customer_num(page["items"]))
+            return page
         records = await fetch_records_async(
             table=TABLE_NAME,
             filters=filters,
             order_by=ORDER_BY_COLUMN,
+            columns=columns or None,
         )
         restored = _restore_customer_num(records)
         return format_records_dates(restored)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
@@ -5,11 +5,15 @@ from fastapi import HTTPException
 
 from core.date_utils import format_records_dates, normalize_payload_dates
 from core.db_helpers import (
+    fetch_page_async,
     fetch_records_async,
     insert_records_async,
     merge_upsert_records_async,
     sanitize_filters,
+    sanitize_table_fields_async,
+    unit_of_work,
 )
+from db import QueryInterruptedError
 
 logger = logging.getLogger(__name__)
 
@@ -33,13 +37,38 @@ def _restore_customer_num(records: list[dict[str, Any]]) -> list[dict[str, Any]]
     return records
 
 
-async def get_hcm_users(query_params: dict[str, Any]):
+async def get_hcm_users(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+):
     try:
         normalized = {FILTER_MAP.get(key, key): value for key, value in query_params.items()}
         filters = sanitize_filters(normalized)
-        records = await fetch_records_async(table=TABLE_NAME, filters=filters)
+        requested = await sanitize_table_fields_async(TABLE_NAME, fields, FILTER_MAP)
+        columns = [FILTER_MAP.get(field, field) for field in requested or []]
+        if limit:
+            page = await fetch_page_async(
+                table=TABLE_NAME,
+                filters=filters,
+                key_columns=[PRIMARY_KEY],
+                limit=limit,
+                after=after,
+                columns=columns or None,
+                include_total=include_total,
+            )
+            page["items"] = format_records_dates(_restore_customer_num(page["items"]))
+            return page
+        records = await fetch_records_async(
+            table=TABLE_NAME, filters=filters, columns=columns or None
+        )
         restored = _restore_customer_num(records)
         return format_records_dates(restored)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
@@ -63,15 +92,17 @@ async def upsert_hcm_users(data_list: list[dict[str, Any]]):
             else:
                 to_update.append(sanitized_record)
 
-        if to_update:
-            await merge_upsert_records_async(
-                table=TABLE_NAME,
-                data_list=to_update,
-                key_columns=UPSERT_KEY_COLUMNS,
-            )
-
-        if to_insert:
-            await insert_records_async(table=TABLE_NAME, records=to_insert)
+        # One transaction: updates and inserts commit (or roll back) together.
+        async with unit_of_work():
+            if to_update:
+                await merge_upsert_records_async(
+                    table=TABLE_NAME,
+                    data_list=to_update,
+                    key_columns=UPSERT_KEY_COLUMNS,
+                )
+
+            if to_insert:
+                await insert_records_async(table=TABLE_NAME, records=to_insert)
 
         return {"message": "Transaction successful", "count": len(data_list)}
     except Exception as e:
@@ -11,11 +11,16 @@ from core.date_utils import (
     normalize_payload_dates,
 )
 from core.db_helpers import (
+    fetch_page_async,
     fetch_records_async,
     merge_upsert_records_async,
     run_raw_query_async,
+    run_raw_query_page_async,
     sanitize_filters,
+    sanitize_table_fields_async,
+    select_list,
 )
+from db import QueryInterruptedError
 
 logger = logging.getLogger(__name__)
 
@@ -39,22 +44,44 @@ _DATE_FIELDS = {
     "NCMStartDt",
     "NCMEndDt",
 }
+PAGE_KEY_COLUMNS = ["CustomerNum"]
 
 
-async def get_sac_account(query_params: dict[str, Any]):
+async def get_sac_account(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+):
     try:
         filters = sanitize_filters(query_params, ALLOWED_FILTERS)
+        columns = await sanitize_table_fields_async(TABLE_NAME, fields)
         branch_filter = filters.pop("BranchName", None)
-
-        if not branch_filter:
-            records = await fetch_records_async(table=TABLE_NAME, filters=filters)
-            return format_records_dates(records, fields=_DATE_FIELDS)
-
-        branch_terms = [term for term in re.split(r"[ ,&]+", str(branch_filter)) if term.strip()]
+        branch_terms = (
+            [term for term in re.split(r"[ ,&]+", str(branch_filter)) if term.strip()]
+            if branch_filter
+            else []
+        )
 
         # Fall back to simple filtering if nothing usable came from the branch filter.
         if not branch_terms:
-            records = await fetch_records_async(table=TABLE_NAME, filters=filters)
+            if limit:
+                page = await fetch_page_async(
+                    table=TABLE_NAME,
+                    filters=filters,
+                    key_columns=PAGE_KEY_COLUMNS,
+                    limit=limit,
+                    after=after,
+                    columns=columns,
+                    include_total=include_total,
+                )
+                page["items"] = format_records_dates(page["items"], fields=_DATE_FIELDS)
+                return page
+            records = await fetch_records_async(
+                table=TABLE_NAME, filters=filters, columns=columns
+            )
             return format_records_dates(records, fields=_DATE_FIELDS)
 
         clauses: list[str] = []
@@ -68,12 +95,29 @@ async def get_sac_account(query_params: dict[str, Any]):
         clauses.append(f"({' OR '.join(branch_clauses)})")
         params.extend(f"{term}%" for term in branch_terms)
 
-        query = f"SELECT * FROM {TABLE_NAME}"
+        hidden = [key for key in PAGE_KEY_COLUMNS if limit and columns and key not in columns]
+        selected = columns + hidden if columns else None
+        query = f"SELECT {select_list(selected)} FROM {TABLE_NAME}"
         if clauses:
             query += " WHERE " + " AND ".join(clauses)
 
+        if limit:
+            page = await run_raw_query_page_async(
+                query,
+                params,
+                key_columns=PAGE_KEY_COLUMNS,
+                limit=limit,
+                after=after,
+                include_total=include_total,
+                hidden_columns=hidden,
+            )
+            page["items"] = format_records_dates(page["items"], fields=_DATE_FIELDS)
+            return page
+
         records = await run_raw_query_async(query, list(params))
         return format_records_dates(records, fields=_DATE_FIELDS)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
@@ -5,23 +5,50 @@ from fastapi import HTTPException
 
 from core.date_utils import format_records_dates, normalize_payload_dates
 from core.db_helpers import (
+    fetch_page_async,
     fetch_records_async,
     insert_records_async,
     merge_upsert_records_async,
     sanitize_filters,
+    sanitize_table_fields_async,
+    unit_of_work,
 )
+from db import QueryInterruptedError
 
 logger = logging.getLogger(__name__)
 
 TABLE_NAME = "tblAffiliates"
 PRIMARY_KEY = "PK_Number"
+PAGE_KEY_COLUMNS = [PRIMARY_KEY]
 
 
-async def get_affiliates(query_params: dict[str, Any]):
+async def get_affiliates(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+):
     try:
         filters = sanitize_filters(query_params)
-        records = await fetch_records_async(table=TABLE_NAME, filters=filters)
+        columns = await sanitize_table_fields_async(TABLE_NAME, fields)
+        if limit:
+            page = await fetch_page_async(
+                table=TABLE_NAME,
+                filters=filters,
+                key_columns=PAGE_KEY_COLUMNS,
+                limit=limit,
+                after=after,
+                columns=columns,
+                include_total=include_total,
+            )
+            page["items"] = format_records_dates(page["items"])
+            return page
+        records = await fetch_records_async(table=TABLE_NAME, filters=filters, columns=columns)
         return format_records_dates(records)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
@@ -44,16 +71,18 @@ async def upsert_affiliates(data_list: list[dict[str, Any]]):
             else:
                 to_update.append(record)
 
-        if to_update:
-            await merge_upsert_records_async(
-                table=TABLE_NAME,
-                data_list=to_update,
-                key_columns=[PRIMARY_KEY],
-                exclude_key_columns_from_insert=True,
-            )
+        # One transaction: updates and inserts commit (or roll back) together.
+        async with unit_of_work():
+            if to_update:
+                await merge_upsert_records_async(
+                    table=TABLE_NAME,
+                    data_list=to_update,
+                    key_columns=[PRIMARY_KEY],
+                    exclude_key_columns_from_insert=True,
+                )
 
-        if to_insert:
-            await insert_records_async(table=TABLE_NAME, records=to_insert)
+            if to_insert:
+                await insert_records_async(table=TABLE_NAME, records=to_insert)
 
         return {"message": "Transaction successful", "count": len(data_list)}
     except Exception as e:
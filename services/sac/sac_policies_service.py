@@ -2,19 +2,22 @@ import logging
 from typing import Any
 
 from fastapi import HTTPException
-from fastapi.concurrency import run_in_threadpool
 
 from core.date_utils import format_records_dates, normalize_payload_dates, parse_date_input
+from core.db_executor import BULK, run_db
 from core.db_helpers import (
     _ensure_safe_identifier,
+    fetch_page_async,
     fetch_records_async,
     insert_records_async,
     merge_upsert_records_async,
     run_raw_query_async,
     sanitize_filters,
+    sanitize_table_fields_async,
+    unit_of_work,
 )
 from core.models.sac_policies import normalize_money_string
-from db import db_connection
+from db import QueryInterruptedError, db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -24,35 +27,53 @@ ALLOWED_FILTERS = {"CustomerNum", "PolicyNum", "PolMod","PK_Number"}
 PREMIUM_ALLOWED_FILTERS = {"CustomerNum", "PolicyNum", "PolMod", "PolicyStatus"}
 
 
-async def _lookup_pk_number(record: dict[str, Any]) -> int | None:
+async def _insert_policy(record: dict[str, Any]) -> int | None:
     """
-    Fetch the latest PK_Number for a policy identified by its natural key fields.
-    Used after inserts to return the new identity value.
+    Insert a policy row and return the PK_Number generated for it.
+    The identity comes back from the INSERT itself (OUTPUT INSERTED), not a follow-up lookup.
     """
-    try:
-        query = """
-            SELECT TOP 1 PK_Number
-            FROM tblPolicies
-            WHERE CustomerNum = ? AND PolicyNum = ? AND PolMod = ?
-            ORDER BY PK_Number DESC
-        """
-        params = [record["CustomerNum"], record["PolicyNum"], record["PolMod"]]
-        rows = await run_raw_query_async(query, params)
-        return rows[0]["PK_Number"] if rows else None
-    except Exception as exc:
-        logger.warning("Failed to fetch PK_Number for new policy row: %s", exc)
-        return None
-
-
-async def get_sac_policies(query_params: dict[str, Any]):
+    result = await insert_records_async(
+        table=TABLE_NAME, records=[record], return_identity=PRIMARY_KEY
+    )
+    identities = (result or {}).get("identities") or [None]
+    return identities[0]
+
+
+def _format_policies(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    formatted = format_records_dates(records)
+    for record in formatted:
+        if "PremiumAmt" in record:
+            record["PremiumAmt"] = normalize_money_string(record.get("PremiumAmt"))
+    return formatted
+
+
+async def get_sac_policies(
+    query_params: dict[str, Any],
+    fields: str | None = None,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+):
     try:
         filters = sanitize_filters(query_params, ALLOWED_FILTERS)
-        records = await fetch_records_async(table=TABLE_NAME, filters=filters)
-        formatted = format_records_dates(records)
-        for record in formatted:
-            if "PremiumAmt" in record:
-                record["PremiumAmt"] = normalize_money_string(record.get("PremiumAmt"))
-        return formatted
+        columns = await sanitize_table_fields_async(TABLE_NAME, fields)
+        if limit:
+            page = await fetch_page_async(
+                table=TABLE_NAME,
+                filters=filters,
+                key_columns=[PRIMARY_KEY],
+                limit=limit,
+                after=after,
+                columns=columns,
+                include_total=include_total,
+            )
+            page["items"] = _format_policies(page["items"])
+            return page
+        records = await fetch_records_async(table=TABLE_NAME, filters=filters, columns=columns)
+        return _format_policies(records)
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
@@ -66,48 +87,49 @@ async def upsert_sac_policies(data: dict[str, Any]):
         pk_value = normalized.get(PRIMARY_KEY)
         pk_response: int | None = None
 
-        if pk_value in (None, ""):
-            sanitized_record = {k: v for k, v in normalized.items() if k != PRIMARY_KEY}
-            if sanitized_record:
-                await insert_records_async(table=TABLE_NAME, records=[sanitized_record])
-                pk_response = await _lookup_pk_number(sanitized_record)
-        else:
-            existing = await fetch_records_async(table=TABLE_NAME, filters={PRIMARY_KEY: pk_value})
-            existing_row = existing[0] if existing else None
-
-            # If incoming mod differs from stored mod, treat this as a "new mod" clone and insert
-            existing_mod = None
-            if existing_row and existing_row.get("PolMod") is not None:
-                existing_mod = str(existing_row.get("PolMod"))
-            incoming_mod = None
-            if normalized.get("PolMod") is not None:
-                incoming_mod = str(normalized.get("PolMod"))
-
-            if existing_row is None:
-                logger.info("PK_Number %s not found; inserting new policy row", pk_value)
-                sanitized_record = {k: v for k, v in normalized.items() if k != PRIMARY_KEY}
-                if sanitized_record:
-                    await insert_records_async(table=TABLE_NAME, records=[sanitized_record])
-                    pk_response = await _lookup_pk_number(sanitized_record)
-            elif incoming_mod is not None and incoming_mod != existing_mod:
-                logger.info(
-                    "Detected new mod for policy PK_Number %s (old %s -> new %s); inserting clone",
-                    pk_value,
-                    existing_mod,
-                    incoming_mod,
-                )
+        async with unit_of_work():
+            if pk_value in (None, ""):
                 sanitized_record = {k: v for k, v in normalized.items() if k != PRIMARY_KEY}
                 if sanitized_record:
-                    await insert_records_async(table=TABLE_NAME, records=[sanitized_record])
-                    pk_response = await _lookup_pk_number(sanitized_record)
+                    pk_response = await _insert_policy(sanitized_record)
             else:
-                await merge_upsert_records_async(
-                    table=TABLE_NAME,
-                    data_list=[normalized],
-                    key_columns=[PRIMARY_KEY],
-                    exclude_key_columns_from_insert=True,
+                # Read inside the unit of work: primary connection, same transaction as the write.
+                existing = await fetch_records_async(
+                    table=TABLE_NAME, filters={PRIMARY_KEY: pk_value}
                 )
-                pk_response = pk_value
+                existing_row = existing[0] if existing else None
+
+                # If incoming mod differs from stored mod, treat this as a "new mod" clone and insert
+                existing_mod = None
+                if existing_row and existing_row.get("PolMod") is not None:
+                    existing_mod = str(existing_row.get("PolMod"))
+                incoming_mod = None
+                if normalized.get("PolMod") is not None:
+                    incoming_mod = str(normalized.get("PolMod"))
+
+                if existing_row is None:
+                    logger.info("PK_Number %s not found; inserting new policy row", pk_value)
+                    sanitized_record = {k: v for k, v in normalized.items() if k != PRIMARY_KEY}
+                    if sanitized_record:
+                        pk_response = await _insert_policy(sanitized_record)
+                elif incoming_mod is not None and incoming_mod != existing_mod:
+                    logger.info(
+                        "Detected new mod for policy PK_Number %s (old %s -> new %s); inserting clone",
+                        pk_value,
+                        existing_mod,
+                        incoming_mod,
+                    )
+                    sanitized_record = {k: v for k, v in normalized.items() if k != PRIMARY_KEY}
+                    if sanitized_record:
+                        pk_response = await _insert_policy(sanitized_record)
+                else:
+                    await merge_upsert_records_async(
+                        table=TABLE_NAME,
+                        data_list=[normalized],
+                        key_columns=[PRIMARY_KEY],
+                        exclude_key_columns_from_insert=True,
+                    )
+                    pk_response = pk_value
 
         return {"message": "Transaction successful", "count": 1, "pk": pk_response}
     except Exception as e:
@@ -149,7 +171,7 @@ async def update_field_for_all_policies(data: dict[str, Any]):
         return {"message": "Update successful"}
 
     try:
-        return await run_in_threadpool(_execute_update)
+        return await run_db(BULK, _execute_update)
     except Exception as e:
         logger.error(f"Error updating policies field: {str(e)}")
         raise HTTPException(status_code=500, detail={"error": str(e)}) from e
@@ -179,6 +201,8 @@ async def get_premium(query_params: dict[str, Any]):
         premium_value = rows[0]["Premium"] if rows else 0
         return premium_value
 
+    except QueryInterruptedError:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
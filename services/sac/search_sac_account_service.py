@@ -3,11 +3,17 @@ import logging
 from fastapi import HTTPException
 
 from core.date_utils import format_records_dates
-from core.db_helpers import run_raw_query_async
+from core.db_helpers import (
+    StreamsBusyError,
+    run_raw_query_page_async,
+    stream_raw_query_async,
+)
+from core.streaming import stream_records_response
+from db import QueryInterruptedError
 
 logger = logging.getLogger(__name__)
 
-# Map frontend "search by" values to actual SQL queries
+# Map frontend "search by" values to actual SQL queries (no ORDER BY; see SEARCH_SORT_KEYS)
 SEARCH_QUERIES = {
     "AccountName": """
         SELECT
@@ -22,7 +28,6 @@ SEARCH_QUERIES = {
             tblAcctSpecial.CustomerNum,
             tblAcctSpecial.OnBoardDate,
             tblAcctSpecial.ServLevel
-        ORDER BY tblAcctSpecial.CustomerName;
     """,
     "CustomerNum": """
         SELECT
@@ -37,7 +42,6 @@ SEARCH_QUERIES = {
             tblAcctSpecial.CustomerName,
             tblAcctSpecial.OnBoardDate,
             tblAcctSpecial.ServLevel
-        ORDER BY tblAcctSpecial.CustomerNum;
     """,
     "PolicyNum": """
         SELECT
@@ -57,7 +61,6 @@ SEARCH_QUERIES = {
             tblAcctSpecial.OnBoardDate,
             tblAcctSpecial.ServLevel
         HAVING tblPOLICIES.PolicyNum IS NOT NULL
-        ORDER BY tblPOLICIES.PolicyNum;
     """,
     "ProducerCode": """
         SELECT
@@ -74,7 +77,6 @@ SEARCH_QUERIES = {
             tblPolicies.InceptDate,
             tblPolicies.CustomerNum
         HAVING tblPolicies.AgentCode IS NOT NULL
-        ORDER BY tblPolicies.AgentCode;
     """,
     "PolicyNameInsured": """
         SELECT
@@ -92,19 +94,71 @@ SEARCH_QUERIES = {
             tblAcctSpecial.AcctOwner,
             tblPolicies.CustomerNum
         HAVING tblPolicies.AcctOnPolicyName IS NOT NULL
-        ORDER BY tblPolicies.AcctOnPolicyName;
     """,
 }
 
 
-async def search_sac_account_records(search_by: str):
+# Result ordering per search type; also the keyset for paginated searches, so each list
+# must identify a row uniquely within its query.
+SEARCH_SORT_KEYS = {
+    "AccountName": ["[Customer Name]", "[Customer Number]"],
+    "CustomerNum": ["[Customer Number]"],
+    "PolicyNum": ["[Policy Number]", "[Customer Number]"],
+    "ProducerCode": [
+        "[Producer Code]",
+        "[Producer]",
+        "[Customer Name]",
+        "[Inception Date]",
+        "[Customer Number]",
+    ],
+    "PolicyNameInsured": ["[Name Insured on Policy]", "[Customer Number]"],
+}
+
+
+async def search_sac_account_records(
+    search_by: str,
+    *,
+    limit: int | None = None,
+    after: str | None = None,
+    include_total: bool = False,
+    ndjson: bool = False,
+):
+    """
+    Paged when `limit` is given; otherwise the full result is streamed from the cursor
+    as a JSON array (or NDJSON) rather than built in memory.
+    """
     if search_by not in SEARCH_QUERIES:
         raise HTTPException(status_code=400, detail={"error": "Invalid search type"})
 
     try:
-        query = SEARCH_QUERIES[search_by]
-        records = await run_raw_query_async(query)
-        return format_records_dates(records)
+        query = SEARCH_QUERIES[search_by].strip()
+        sort_keys = SEARCH_SORT_KEYS[search_by]
+        if limit:
+            page = await run_raw_query_page_async(
+                query,
+                key_columns=sort_keys,
+                limit=limit,
+                after=after,
+                include_total=include_total,
+            )
+            page["items"] = format_records_dates(page["items"])
+            return page
+        return await stream_records_response(
+            stream_raw_query_async(f"{query}\nORDER BY {', '.join(sort_keys)};"),
+            ndjson=ndjson,
+            transform=format_records_dates,
+        )
+    except QueryInterruptedError:
+        raise
+    except StreamsBusyError as exc:
+        logger.warning(f"Search shed, streamed reads busy: {exc}")
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "Too many searches in progress, try again shortly"},
+            headers={"Retry-After": "1"},
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail={"error": str(exc)}) from exc
     except Exception as e:
         logger.warning(f"Search failed - {str(e)}")
         raise HTTPException(status_code=500, detail={"error": str(e)}) from e
@@ -4,7 +4,7 @@ from api.sac import claim_review_distribution
 def test_get_claim_review_distribution(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_get(params):
+    async def fake_get(params, **options):
         captured["params"] = params
         return [{"CustomerNum": "1"}]
 
@@ -4,7 +4,7 @@ from api.sac import hcm_users
 def test_get_hcm_users(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_get(params):
+    async def fake_get(params, **options):
         captured["params"] = params
         return [{"CustNum": "1001"}]
 
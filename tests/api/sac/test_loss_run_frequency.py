@@ -4,7 +4,7 @@ from api.sac import loss_run_frequency
 def test_get_loss_run_frequency(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_get(params):
+    async def fake_get(params, **options):
         captured["params"] = params
         return [{"CustomerNum": "1", "MthNum": 1}]
 
@@ -4,7 +4,7 @@ from api.sac import sac_account
 def test_get_sac_account_forwards_query_params(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_service(params):
+    async def fake_service(params, **options):
         captured["params"] = params
         return [{"CustomerNum": "C1"}]
 
@@ -34,3 +34,58 @@ def test_upsert_sac_account_dumps_payload(make_test_client, monkeypatch):
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
     assert captured["payload"] == payload
+
+
+def test_get_sac_account_forwards_fields_separately(make_test_client, monkeypatch):
+    captured = {}
+
+    async def fake_service(params, **options):
+        captured["params"] = params
+        captured["options"] = options
+        return [{"CustomerNum": "C1"}]
+
+    monkeypatch.setattr(sac_account, "get_sac_account_service", fake_service)
+    client = make_test_client(sac_account.router)
+
+    response = client.get("/?Stage=Active&fields=CustomerNum,CustomerName")
+
+    assert response.status_code == 200
+    assert captured["params"] == {"Stage": "Active"}
+    assert captured["options"]["fields"] == "CustomerNum,CustomerName"
+    assert captured["options"]["limit"] is None
+
+
+def test_get_sac_account_forwards_pagination(make_test_client, monkeypatch):
+    captured = {}
+
+    async def fake_service(params, **options):
+        captured["params"] = params
+        captured["options"] = options
+        return {"items": [{"CustomerNum": "C1"}], "next": "tok2", "total": 3}
+
+    monkeypatch.setattr(sac_account, "get_sac_account_service", fake_service)
+    client = make_test_client(sac_account.router)
+
+    response = client.get("/?Stage=Active&limit=1&after=tok1&include_total=true")
+
+    assert response.status_code == 200
+    assert response.json()["next"] == "tok2"
+    assert captured["params"] == {"Stage": "Active"}
+    assert captured["options"] == {
+        "fields": None,
+        "limit": 1,
+        "after": "tok1",
+        "include_total": True,
+    }
+
+
+def test_get_sac_account_rejects_oversized_page(make_test_client, monkeypatch):
+    async def fake_service(params, **options):
+        raise AssertionError("service should not be called")
+
+    monkeypatch.setattr(sac_account, "get_sac_account_service", fake_service)
+    client = make_test_client(sac_account.router)
+
+    response = client.get("/?limit=0")
+
+    assert response.status_code == 422
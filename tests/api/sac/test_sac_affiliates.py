@@ -4,7 +4,7 @@ from api.sac import sac_affiliates
 def test_get_affiliates(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_service(params):
+    async def fake_service(params, **options):
         captured["params"] = params
         return [{"AffiliateName": "Alpha"}]
 
@@ -4,7 +4,7 @@ from api.sac import sac_policies
 def test_get_sac_policies(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_get(params):
+    async def fake_get(params, **options):
         captured["params"] = params
         return [{"PolicyNum": "P1"}]
 
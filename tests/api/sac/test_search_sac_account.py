@@ -4,8 +4,9 @@ from api.sac import search_sac_account
 def test_search_sac_account(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_search(term):
+    async def fake_search(term, **options):
         captured["term"] = term
+        captured["options"] = options
         return [{"CustomerName": "ACME"}]
 
     monkeypatch.setattr(
@@ -18,3 +19,27 @@ def test_search_sac_account(make_test_client, monkeypatch):
     assert response.status_code == 200
     assert response.json() == [{"CustomerName": "ACME"}]
     assert captured["term"] == "acme"
+    assert captured["options"] == {
+        "limit": None,
+        "after": None,
+        "include_total": False,
+        "ndjson": False,
+    }
+
+
+def test_search_sac_account_negotiates_ndjson(make_test_client, monkeypatch):
+    captured = {}
+
+    async def fake_search(term, **options):
+        captured["options"] = options
+        return []
+
+    monkeypatch.setattr(
+        search_sac_account, "get_sac_account_records_service", fake_search
+    )
+    client = make_test_client(search_sac_account.router)
+
+    response = client.get("/?search_by=acme", headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert captured["options"]["ndjson"] is True
@@ -39,7 +39,7 @@ def test_get_current_user(make_test_client, monkeypatch):
 def test_logout_route(make_test_client, monkeypatch):
     captured = {}
 
-    async def fake_logout(response):
+    async def fake_logout(response, request=None):
         captured["response"] = response
         return {"message": "bye"}
 
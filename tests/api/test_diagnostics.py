@@ -0,0 +1,55 @@
+from api import diagnostics
+from core.jwt_handler import VerifiedTokenCache
+from core.query_stats import QueryStats
+from services.auth_service import get_current_user_from_token
+
+
+def test_query_stats_endpoint_returns_top_fingerprints(make_test_client, monkeypatch):
+    stats = QueryStats()
+    stats.record("SELECT * FROM tblA WHERE id = 1", 5.0)
+    stats.record("SELECT * FROM tblB", 50.0)
+    monkeypatch.setattr(diagnostics, "query_stats", stats)
+    client = make_test_client(diagnostics.router)
+
+    response = client.get("/queries", params={"top": 1})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["fingerprint"] for entry in body["fingerprints"]] == ["SELECT * FROM tblB"]
+    assert set(body["tables"]) == {"tblA", "tblB"}
+
+    assert client.delete("/queries").status_code == 403
+    assert client.get("/queries").json()["fingerprints"] != []
+
+    client.app.dependency_overrides[get_current_user_from_token] = lambda: {
+        "user": {"id": 1, "role": "admin"}
+    }
+    assert client.delete("/queries").status_code == 200
+    assert client.get("/queries").json()["fingerprints"] == []
+
+
+def test_query_stats_endpoint_rejects_unknown_sort(make_test_client):
+    client = make_test_client(diagnostics.router)
+
+    assert client.get("/queries", params={"sort": "params"}).status_code == 422
+
+
+def test_token_cache_endpoint_reports_hit_counts(make_test_client, monkeypatch):
+    cache = VerifiedTokenCache(max_entries=8)
+    cache.put("token", {"sub": "1", "exp": 4102444800})
+    cache.get("token")
+    cache.get("other")
+    monkeypatch.setattr(diagnostics, "verified_tokens", cache)
+    client = make_test_client(diagnostics.router)
+
+    response = client.get("/token_cache")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "size": 1,
+        "max_entries": 8,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "hit_ratio": 0.5,
+    }
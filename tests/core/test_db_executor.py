@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from core import db_executor
+
+
+@pytest.fixture
+def executor():
+    pool = db_executor.DBExecutor({"read": 1, "write": 1, "bulk": 1})
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_lanes_are_isolated(executor):
+    release = threading.Event()
+    blocked = executor.submit("read", release.wait, 5)
+
+    # The read lane is busy, but writes still get a worker immediately.
+    assert await executor.run("write", lambda: "written") == "written"
+
+    release.set()
+    assert blocked.result(timeout=5) is True
+
+
+def test_stats_report_queue_depth_and_wait(executor):
+    release = threading.Event()
+    started = threading.Event()
+
+    def _block():
+        started.set()
+        release.wait(5)
+
+    first = executor.submit("read", _block)
+    started.wait(5)
+    second = executor.submit("read", lambda: None)
+
+    stats = executor.stats()["read"]
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+
+    release.set()
+    first.result(timeout=5)
+    second.result(timeout=5)
+
+    stats = executor.stats()["read"]
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    assert stats["completed"] == 2
+    assert stats["wait_max_ms"] > 0
+    assert executor.stats()["write"]["completed"] == 0
+
+
+def test_cancelled_queued_job_leaves_queue(executor):
+    release = threading.Event()
+    running = executor.submit("bulk", release.wait, 5)
+    queued = executor.submit("bulk", lambda: None)
+
+    assert queued.cancel() is True
+    assert executor.stats()["bulk"]["queued"] == 0
+
+    release.set()
+    running.result(timeout=5)
+
+
+@pytest.mark.anyio
+async def test_run_propagates_context(executor):
+    request_id = contextvars.ContextVar("request_id")
+    request_id.set("abc")
+
+    assert await executor.run("read", request_id.get) == "abc"
+
+
+@pytest.mark.anyio
+async def test_run_propagates_exceptions(executor):
+    def _fail():
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError, match="query failed"):
+        await executor.run("write", _fail)
+    assert executor.stats()["write"]["running"] == 0
+
+
+def test_rejects_unknown_lanes_and_empty_limits():
+    with pytest.raises(ValueError):
+        db_executor.DBExecutor({"analytics": 1})
+    with pytest.raises(ValueError):
+        db_executor.DBExecutor({"read": 0})
+
+    pool = db_executor.DBExecutor({"read": 1})
+    try:
+        with pytest.raises(ValueError):
+            pool.submit("write", lambda: None)
+    finally:
+        pool.shutdown()
+
+
+def test_write_class_uses_bulk_threshold(monkeypatch):
+    monkeypatch.setattr(db_executor.settings, "DB_BULK_ROW_THRESHOLD", 10)
+    assert db_executor.write_class(10) == "write"
+    assert db_executor.write_class(11) == "bulk"
+
+
+@pytest.mark.anyio
+async def test_shared_executor_is_recreated_after_shutdown():
+    first = db_executor.get_db_executor()
+    assert await db_executor.run_db("read", lambda: 1) == 1
+    db_executor.shutdown_db_executor()
+
+    second = db_executor.get_db_executor()
+    assert second is not first
+    assert await asyncio.wait_for(db_executor.run_db("read", lambda: 2), timeout=5) == 2
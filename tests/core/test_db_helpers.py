@@ -1,4 +1,6 @@
 from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
 
 import pandas as pd
 import pytest
@@ -10,21 +12,50 @@ from core import db_helpers
 class DummyCursor:
     def __init__(self):
         self.queries: list[tuple[str, list]] = []
+        self.description = None
+        self.rows: list[tuple] = []
+        self.closed = False
+        self.many = None
+        self.fast_executemany = False
+        self.rowcount = -1
 
-    def execute(self, query: str, params: list):
+    def execute(self, query: str, params: list = ()):
         self.queries.append((query.strip(), list(params)))
 
+    def executemany(self, query: str, seq_of_params: list):
+        self.many = (query.strip(), [list(params) for params in seq_of_params])
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def nextset(self):
+        return False
+
+    def fetchmany(self, size: int):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
 
 class DummyConnection:
     def __init__(self):
         self.cursor_obj = DummyCursor()
         self.committed = False
+        self.rolled_back = False
+        self.read_only = False
+        self.commits = 0
 
     def cursor(self):
         return self.cursor_obj
 
     def commit(self):
         self.committed = True
+        self.commits += 1
+
+    def rollback(self):
+        self.rolled_back = True
 
     def __enter__(self):
         return self
@@ -38,16 +69,50 @@ def fake_db(monkeypatch):
     connections: list[DummyConnection] = []
 
     @contextmanager
-    def _db_connection():
+    def _db_connection(read_only=False):
         conn = DummyConnection()
+        conn.read_only = read_only
         connections.append(conn)
         yield conn
 
     monkeypatch.setattr(db_module, "db_connection", _db_connection)
     monkeypatch.setattr(db_helpers, "db_connection", _db_connection)
+    # Statement assertions below expect no INFORMATION_SCHEMA lookups; see typed_columns.
+    monkeypatch.setattr(db_helpers.settings, "DB_TYPED_PARAMETERS", False)
+    monkeypatch.setattr(db_helpers.settings, "DB_UNKNOWN_COLUMNS", "allow")
     return connections
 
 
+@pytest.fixture
+def typed_columns(monkeypatch):
+    from core import table_metadata
+    from core.table_metadata import ColumnInfo
+
+    monkeypatch.setattr(db_helpers.settings, "DB_TYPED_PARAMETERS", True)
+    monkeypatch.setattr(db_helpers.settings, "DB_SCHEMA_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(
+        table_metadata,
+        "_tables",
+        {
+            "tbltest": (
+                0.0,
+                {
+                    "customernum": ColumnInfo("CustomerNum", "nvarchar", 20),
+                    "stage": ColumnInfo("Stage", "varchar", 50),
+                    "premium": ColumnInfo("Premium", "decimal", None, 12, 2),
+                    "onboarddate": ColumnInfo("OnBoardDate", "date"),
+                },
+            )
+        },
+    )
+
+    sizes: list = []
+    monkeypatch.setattr(
+        DummyCursor, "setinputsizes", lambda self, value: sizes.append(value), raising=False
+    )
+    return sizes
+
+
 def test_sanitize_filters_with_allowlist():
     filters = {"CustomerNum": "1", "BadField": "x"}
     with pytest.raises(ValueError) as exc:
@@ -68,6 +133,52 @@ def test_build_select_query_with_filters():
     assert params == ["1", "Active"]
 
 
+def test_build_select_query_with_columns():
+    query, params = db_helpers.build_select_query(
+        "tblTest", {"CustomerNum": "1"}, columns=["CustomerNum", "Stage"]
+    )
+
+    assert query == "SELECT CustomerNum, Stage FROM tblTest WHERE CustomerNum = ?"
+    assert params == ["1"]
+
+
+def test_sanitize_fields():
+    assert db_helpers.sanitize_fields(None) is None
+    assert db_helpers.sanitize_fields(" , ") is None
+    assert db_helpers.sanitize_fields("CustomerNum, Stage,CustomerNum") == ["CustomerNum", "Stage"]
+
+    with pytest.raises(ValueError) as exc:
+        db_helpers.sanitize_fields("CustomerNum,Secret", {"CustomerNum"})
+    assert "Invalid field(s): Secret" in str(exc.value)
+
+    with pytest.raises(ValueError):
+        db_helpers.sanitize_fields("CustomerNum; DROP TABLE x")
+
+
+@pytest.mark.anyio
+async def test_sanitize_table_fields_checks_table_columns(monkeypatch):
+    loads: list[str] = []
+
+    def fake_table_fields(table):
+        loads.append(table)
+        return {"CustNum", "UserName"} if table == "tblHCMUsers" else set()
+
+    monkeypatch.setattr(db_helpers, "cached_table_columns", lambda table: None)
+    monkeypatch.setattr(db_helpers, "table_fields", fake_table_fields)
+
+    fields = await db_helpers.sanitize_table_fields_async(
+        "tblHCMUsers", "CustomerNum,UserName", aliases={"CustomerNum": "CustNum"}
+    )
+    assert fields == ["CustomerNum", "UserName"]
+    with pytest.raises(ValueError, match="Invalid field\\(s\\): UserNmae"):
+        await db_helpers.sanitize_table_fields_async("tblHCMUsers", "UserNmae")
+
+    # Metadata unavailable: identifier rules only. No projection: no lookup at all.
+    assert await db_helpers.sanitize_table_fields_async("tblOther", "Anything") == ["Anything"]
+    assert await db_helpers.sanitize_table_fields_async("tblOther", None) is None
+    assert loads == ["tblHCMUsers", "tblHCMUsers", "tblOther"]
+
+
 def test_fetch_records(monkeypatch, fake_db):
     captured = {}
 
@@ -76,12 +187,270 @@ def test_fetch_records(monkeypatch, fake_db):
         captured["params"] = params
         return pd.DataFrame([{"CustomerNum": "1", "Stage": "Active"}])
 
+    from core.query_stats import QueryStats
+
+    stats = QueryStats()
+    monkeypatch.setattr("core.query_stats.query_stats", stats)
+    monkeypatch.setattr(db_helpers.settings, "DB_READ_WITH_PANDAS", True)
     monkeypatch.setattr(pd, "read_sql", fake_read_sql)
     result = db_helpers.fetch_records("tblTest", {"CustomerNum": "1"})
 
     assert result == [{"CustomerNum": "1", "Stage": "Active"}]
     assert captured["query"] == "SELECT * FROM tblTest WHERE CustomerNum = ?"
     assert captured["params"] == ["1"]
+    # The DataFrame path is timed like the cursor path.
+    assert stats.top(1)[0]["rows"] == 1
+
+
+def test_fetch_records_reads_cursor_without_pandas(monkeypatch, fake_db):
+    def fail_read_sql(*args, **kwargs):
+        raise AssertionError("pandas path should not be used")
+
+    monkeypatch.setattr(db_helpers.settings, "DB_READ_WITH_PANDAS", False)
+    monkeypatch.setattr(pd, "read_sql", fail_read_sql)
+
+    rows = [
+        ("1", Decimal("12.50"), datetime(2024, 1, 1, 9, 30)),
+        ("2", None, None),
+        ("3", Decimal("0"), datetime(2024, 2, 1)),
+    ]
+
+    original_execute = DummyCursor.execute
+
+    def execute(self, query, params):
+        original_execute(self, query, params)
+        self.description = [("CustomerNum",), ("Premium",), ("OnBoardDate",)]
+        self.rows = list(rows)
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+    monkeypatch.setattr(db_helpers.settings, "DB_FETCH_BATCH_SIZE", 2)
+
+    result = db_helpers.fetch_records("tblTest", {"CustomerNum": "1"})
+
+    assert result == [
+        {
+            "CustomerNum": "1",
+            "Premium": Decimal("12.50"),
+            "OnBoardDate": datetime(2024, 1, 1, 9, 30),
+        },
+        {"CustomerNum": "2", "Premium": None, "OnBoardDate": None},
+        {"CustomerNum": "3", "Premium": Decimal("0"), "OnBoardDate": datetime(2024, 2, 1)},
+    ]
+    cursor = fake_db[0].cursor_obj
+    assert cursor.queries == [("SELECT * FROM tblTest WHERE CustomerNum = ?", ["1"])]
+    assert cursor.closed is True
+
+
+def test_run_raw_query_without_result_set(fake_db):
+    assert db_helpers.run_raw_query("UPDATE tblTest SET Stage = ?", ["Active"]) == []
+
+
+def test_page_token_round_trips_typed_values():
+    values = ["Acme", 7, None, Decimal("1.50"), date(2024, 1, 2), datetime(2024, 1, 2, 3, 4)]
+    token = db_helpers.encode_page_token(values)
+    assert db_helpers.decode_page_token(token, len(values)) == values
+
+
+@pytest.mark.parametrize("token", ["not-base64!", db_helpers.encode_page_token(["a", "b"])])
+def test_decode_page_token_rejects_bad_tokens(token):
+    with pytest.raises(ValueError, match="Invalid page token"):
+        db_helpers.decode_page_token(token, 1)
+
+
+def test_build_keyset_clause_handles_nulls():
+    clause, params = db_helpers.build_keyset_clause(["MthNum", "CustNum"], [None, "C1"])
+    assert clause == "((MthNum IS NOT NULL) OR (MthNum IS NULL AND CustNum > ?))"
+    assert params == ["C1"]
+
+    clause, params = db_helpers.build_keyset_clause(["MthNum", "CustNum"], [3, "C1"])
+    assert clause == "((MthNum > ?) OR (MthNum = ? AND CustNum > ?))"
+    assert params == [3, 3, "C1"]
+
+
+def test_fetch_page_returns_next_token_and_hides_key_columns(monkeypatch, fake_db):
+    original_execute = DummyCursor.execute
+
+    def execute(self, query, params):
+        original_execute(self, query, params)
+        self.description = [("Stage",), ("CustomerNum",)]
+        self.rows = [("Active", "1"), ("Active", "2"), ("Active", "3")]
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+
+    page = db_helpers.fetch_page(
+        "tblTest",
+        {"Stage": "Active"},
+        key_columns=["CustomerNum"],
+        limit=2,
+        after=db_helpers.encode_page_token(["0"]),
+        columns=["Stage"],
+    )
+
+    assert page == {
+        "items": [{"Stage": "Active"}, {"Stage": "Active"}],
+        "next": db_helpers.encode_page_token(["2"]),
+    }
+    query, params = fake_db[0].cursor_obj.queries[0]
+    assert query.startswith("SELECT TOP (?) * FROM (")
+    assert "SELECT Stage, CustomerNum FROM tblTest WHERE Stage = ?" in query
+    assert query.endswith("WHERE ((CustomerNum > ?)) ORDER BY CustomerNum")
+    assert params == [3, "Active", "0"]
+
+
+def test_run_raw_query_page_last_page_with_total(monkeypatch, fake_db):
+    calls = []
+
+    def fake_read(conn, query, params, table=None, param_columns=None):
+        calls.append((query, params))
+        if query.startswith("SELECT COUNT(*)"):
+            return [{"total": 1}]
+        return [{"Customer Number": "C1"}]
+
+    monkeypatch.setattr(db_helpers, "_execute_read", fake_read)
+
+    page = db_helpers.run_raw_query_page(
+        "SELECT CustomerNum AS [Customer Number] FROM tblTest;",
+        key_columns=["[Customer Number]"],
+        limit=5,
+        include_total=True,
+    )
+
+    assert page == {"items": [{"Customer Number": "C1"}], "next": None, "total": 1}
+    assert calls[0][0].endswith("ORDER BY [Customer Number]")
+    assert calls[1][1] == []
+
+
+def test_run_raw_query_page_rejects_unsafe_sort_column(fake_db):
+    with pytest.raises(ValueError, match="Invalid sort column"):
+        db_helpers.run_raw_query_page("SELECT 1 AS x", key_columns=["x; DROP"], limit=1)
+
+
+def test_stream_raw_query_yields_batches_and_closes_cursor(monkeypatch, fake_db):
+    original_execute = DummyCursor.execute
+
+    def execute(self, query, params):
+        original_execute(self, query, params)
+        self.description = [("CustomerNum",)]
+        self.rows = [("1",), ("2",), ("3",)]
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+
+    batches = db_helpers.stream_raw_query("SELECT CustomerNum FROM tblTest", batch_size=2)
+    assert next(batches) == [{"CustomerNum": "1"}, {"CustomerNum": "2"}]
+
+    cursor = fake_db[0].cursor_obj
+    assert cursor.closed is False
+    batches.close()
+    assert cursor.closed is True
+
+
+@pytest.mark.anyio
+async def test_stream_raw_query_async_releases_on_early_close(monkeypatch, fake_db):
+    original_execute = DummyCursor.execute
+
+    def execute(self, query, params):
+        original_execute(self, query, params)
+        self.description = [("CustomerNum",)]
+        self.rows = [("1",), ("2",)]
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+
+    batches = db_helpers.stream_raw_query_async("SELECT CustomerNum FROM tblTest", batch_size=1)
+    assert await anext(batches) == [{"CustomerNum": "1"}]
+    await batches.aclose()
+
+    assert fake_db[0].cursor_obj.closed is True
+
+
+@pytest.mark.anyio
+async def test_stream_raw_query_async_caps_open_streams(monkeypatch, fake_db):
+    original_execute = DummyCursor.execute
+
+    def execute(self, query, params):
+        original_execute(self, query, params)
+        self.description = [("CustomerNum",)]
+        self.rows = [("1",), ("2",)]
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+    monkeypatch.setattr(db_helpers.settings, "DB_MAX_OPEN_STREAMS", 1)
+
+    first = db_helpers.stream_raw_query_async("SELECT CustomerNum FROM tblTest", batch_size=1)
+    assert await anext(first) == [{"CustomerNum": "1"}]
+
+    second = db_helpers.stream_raw_query_async("SELECT CustomerNum FROM tblTest")
+    with pytest.raises(db_helpers.StreamsBusyError):
+        await anext(second)
+    assert len(fake_db) == 1  # refused before taking a connection
+
+    await first.aclose()
+    third = db_helpers.stream_raw_query_async("SELECT CustomerNum FROM tblTest")
+    assert await anext(third) == [{"CustomerNum": "1"}, {"CustomerNum": "2"}]
+    await third.aclose()
+
+
+def test_reads_use_read_intent_connection_unless_pinned(fake_db):
+    db_helpers.fetch_records("tblTest", {"CustomerNum": "1"})
+    db_helpers.fetch_records("tblTest", {"CustomerNum": "1"}, read_only=False)
+    db_helpers.run_raw_query("SELECT 1")
+    db_helpers.insert_records("tblTest", [{"CustomerNum": "1"}])
+
+    assert [conn.read_only for conn in fake_db] == [True, False, True, False]
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_shares_one_connection_and_commits_once(fake_db):
+    async with db_helpers.unit_of_work():
+        await db_helpers.merge_upsert_records_async(
+            "tblTest", [{"CustomerNum": "1", "Stage": "Active"}], ["CustomerNum"]
+        )
+        await db_helpers.fetch_records_async("tblTest", {"CustomerNum": "1"})
+        async with db_helpers.unit_of_work():
+            await db_helpers.insert_records_async("tblTest", [{"CustomerNum": "2"}])
+
+    assert len(fake_db) == 1
+    conn = fake_db[0]
+    assert conn.commits == 1
+    assert conn.rolled_back is False
+    assert len(conn.cursor_obj.queries) == 3
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_rolls_back_everything_on_error(fake_db):
+    with pytest.raises(RuntimeError):
+        async with db_helpers.unit_of_work():
+            await db_helpers.insert_records_async("tblTest", [{"CustomerNum": "2"}])
+            raise RuntimeError("second step failed")
+
+    assert len(fake_db) == 1
+    assert fake_db[0].commits == 0
+    assert fake_db[0].rolled_back is True
+
+    # Outside a unit of work each helper call commits on its own connection again.
+    await db_helpers.insert_records_async("tblTest", [{"CustomerNum": "3"}])
+    assert len(fake_db) == 2
+    assert fake_db[1].commits == 1
+
+
+def test_snapshot_reads_switch_isolation_outside_a_unit_of_work(fake_db):
+    with db_module.read_isolation(db_module.SNAPSHOT):
+        db_helpers.fetch_records("tblTest", {"CustomerNum": "1"})
+
+    queries = [query for query, _ in fake_db[0].cursor_obj.queries]
+    assert queries[0] == "SET TRANSACTION ISOLATION LEVEL SNAPSHOT"
+    assert queries[1].startswith("SELECT")
+    assert queries[2] == "SET TRANSACTION ISOLATION LEVEL READ COMMITTED"
+    assert fake_db[0].rolled_back is True
+
+
+@pytest.mark.anyio
+async def test_snapshot_reads_inside_unit_of_work_keep_the_transaction(fake_db):
+    with db_module.read_isolation(db_module.SNAPSHOT):
+        async with db_helpers.unit_of_work():
+            await db_helpers.fetch_records_async("tblTest", {"CustomerNum": "1"})
+
+    queries = [query for query, _ in fake_db[0].cursor_obj.queries]
+    assert len(queries) == 1
+    assert queries[0].startswith("SELECT")
 
 
 def test_insert_records_uses_connection(fake_db):
@@ -93,3 +462,306 @@ def test_insert_records_uses_connection(fake_db):
     executed_query, params = conn.cursor_obj.queries[0]
     assert "INSERT INTO tblTest" in executed_query
     assert params == ["1", "Active"]
+
+
+def test_insert_records_batches_same_shape_with_fast_executemany(fake_db):
+    records = [
+        {"CustNum": "1", "UserName": "a"},
+        {"CustNum": "2", "UserName": "b"},
+        {"CustNum": "3", "UserName": "c", "Email": "c@x"},
+        {},
+    ]
+
+    result = db_helpers.insert_records("tblHCMUsers", records)
+
+    assert result == {"message": "Insertion successful", "count": 4}
+    cursor = fake_db[0].cursor_obj
+    assert cursor.fast_executemany is True
+    assert cursor.many == (
+        "INSERT INTO tblHCMUsers (CustNum, UserName) VALUES (?, ?)",
+        [["1", "a"], ["2", "b"]],
+    )
+    assert cursor.queries == [
+        ("INSERT INTO tblHCMUsers (CustNum, UserName, Email) VALUES (?, ?, ?)", ["3", "c", "c@x"])
+    ]
+    assert fake_db[0].committed is True
+
+
+def test_insert_records_returns_identities_in_input_order(monkeypatch, fake_db):
+    # OUTPUT rows come back unordered; the ordinal maps them to input positions.
+    monkeypatch.setattr(DummyCursor, "fetchall", lambda self: [(2, 503), (0, 501), (1, 502)])
+    records = [
+        {"CustomerNum": "1", "PolicyNum": "P1"},
+        {"CustomerNum": "1", "PolicyNum": "P2"},
+        {"CustomerNum": "1", "PolicyNum": "P3"},
+    ]
+
+    result = db_helpers.insert_records("tblPolicies", records, return_identity="PK_Number")
+
+    assert result["identities"] == [501, 502, 503]
+    query, params = fake_db[0].cursor_obj.queries[0]
+    assert ") AS source (_RowOrdinal, CustomerNum, PolicyNum)" in query
+    assert "ON 1 = 0" in query
+    assert query.startswith("DECLARE @ids TABLE (_RowOrdinal int NOT NULL, PK_Number bigint);")
+    assert (
+        "OUTPUT source._RowOrdinal, INSERTED.PK_Number INTO @ids (_RowOrdinal, PK_Number);" in query
+    )
+    assert query.endswith("SELECT _RowOrdinal, PK_Number FROM @ids;")
+    assert params == [0, "1", "P1", 1, "1", "P2", 2, "1", "P3"]
+
+
+def test_insert_records_reads_identities_past_the_merge_row_count(monkeypatch, fake_db):
+    def nextset(self):
+        # Driver view: the MERGE's row count comes first, then the SELECT FROM @ids.
+        self.description = [("_RowOrdinal",), ("PK_Number",)]
+        self.rows = [(0, 9)]
+        return True
+
+    monkeypatch.setattr(DummyCursor, "nextset", nextset)
+
+    result = db_helpers.insert_records(
+        "tblPolicies", [{"CustomerNum": "1"}], return_identity="PK_Number"
+    )
+
+    assert result["identities"] == [9]
+
+
+def test_merge_upsert_records_batches_rows_into_one_statement(fake_db):
+    rows = [{"CustNum": "C1", "MthNum": month, "RptMth": month * 10} for month in range(1, 13)]
+
+    result = db_helpers.merge_upsert_records("tblFreq", rows, ["CustNum", "MthNum"])
+
+    assert result == {"message": "Transaction successful", "count": 12}
+    conn = fake_db[0]
+    assert conn.committed is True
+    assert len(conn.cursor_obj.queries) == 1
+    query, params = conn.cursor_obj.queries[0]
+    assert query.startswith("MERGE INTO tblFreq AS target")
+    assert ") AS source (CustNum, MthNum, RptMth, _IsPadding)" in query
+    assert query.count("(?, ?, ?, ?)") == 50  # 12 rows padded to the next bucket
+    assert (
+        "ON source._IsPadding = 0 AND target.CustNum = source.CustNum"
+        " AND target.MthNum = source.MthNum" in query
+    )
+    assert "UPDATE SET RptMth = source.RptMth" in query
+    assert "WHEN NOT MATCHED AND source._IsPadding = 0 THEN" in query
+    assert params[:8] == ["C1", 1, 10, 0, "C1", 2, 20, 0]
+    assert params[48:] == [None, None, None, 1] * 38
+
+
+def test_merge_upsert_records_pads_batches_to_fixed_sizes(fake_db):
+    db_helpers.clear_statement_cache()
+    for count in (2, 7, 10):
+        rows = [{"Id": index, "Name": "x"} for index in range(count)]
+        db_helpers.merge_upsert_records("tblUsers", rows, ["Id"])
+
+    queries = {query for conn in fake_db for query, _ in conn.cursor_obj.queries}
+    assert len(queries) == 1
+    assert db_helpers.statement_cache_info()["merge"]["size"] == 1
+
+
+def test_merge_row_bucket_never_pads_past_the_largest_fitting_bucket():
+    assert db_helpers._merge_row_bucket(12, 3) == 50
+    # 45 columns: 43 rows per statement, so no bucket above 10 fits.
+    assert db_helpers._merge_row_bucket(12, 45) == 12
+    assert db_helpers._merge_row_bucket(43, 45) == 43
+    assert db_helpers._merge_row_bucket(120, 3) == 120
+
+
+def test_merge_upsert_records_groups_by_column_set_and_parameter_limit(monkeypatch, fake_db):
+    monkeypatch.setattr(db_helpers, "MAX_SQL_PARAMETERS", 6)
+    rows = [
+        {"Id": 1, "Name": "a"},
+        {"Id": 2, "Name": "b", "Email": "b@x"},
+        {"Id": 3, "Name": "c"},
+        {"Id": 4, "Name": "d"},
+    ]
+
+    db_helpers.merge_upsert_records("tblUsers", rows, ["Id"])
+
+    queries = fake_db[0].cursor_obj.queries
+    assert [params for _, params in queries] == [
+        [1, "a", 0, 3, "c", 0],
+        [4, "d", 0],
+        [2, "b", "b@x", 0],
+    ]
+
+
+def test_merge_upsert_records_splits_on_repeated_keys(fake_db):
+    rows = [
+        {"Id": 1, "Name": "first"},
+        {"Id": 2, "Name": "other"},
+        {"Id": 1, "Name": "second"},
+    ]
+
+    db_helpers.merge_upsert_records("tblUsers", rows, ["Id"])
+
+    queries = fake_db[0].cursor_obj.queries
+    assert [params for _, params in queries] == [
+        [1, "first", 0, 2, "other", 0] + [None, None, 1] * 8,
+        [1, "second", 0],
+    ]
+
+
+def test_merge_upsert_records_unbatched_runs_one_statement_per_row(fake_db):
+    rows = [{"Id": 1, "Name": "a"}, {"Id": 2, "Name": "b"}]
+
+    result = db_helpers.merge_upsert_records(
+        "tblUsers", rows, ["Id"], exclude_key_columns_from_insert=True, batched=False
+    )
+
+    assert result["count"] == 2
+    queries = fake_db[0].cursor_obj.queries
+    assert len(queries) == 2
+    assert "INSERT (Name)" in queries[0][0]
+
+
+def test_merge_upsert_records_rolls_back_on_error(monkeypatch, fake_db):
+    def fail(self, query, params):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(DummyCursor, "execute", fail)
+
+    with pytest.raises(RuntimeError):
+        db_helpers.merge_upsert_records("tblUsers", [{"Id": 1, "Name": "a"}], ["Id"])
+
+    assert fake_db[0].rolled_back is True
+    assert fake_db[0].committed is False
+
+
+def test_delete_records_bulk_deletes_in_one_statement(monkeypatch, fake_db):
+    def execute(self, query, params):
+        self.queries.append((query.strip(), list(params)))
+        self.rowcount = 2
+
+    monkeypatch.setattr(DummyCursor, "execute", execute)
+    data = [
+        {"CustomerNum": "1", "AttnTo": "A", "RecipCat": "x"},
+        {"CustomerNum": "1", "AttnTo": "B"},
+        {"CustomerNum": "1", "AttnTo": "missing"},
+    ]
+
+    result = db_helpers.delete_records("tblDist", data, ["CustomerNum", "AttnTo"])
+
+    assert result == {"message": "Deletion successful", "count": 2}
+    queries = fake_db[0].cursor_obj.queries
+    assert queries == [
+        (
+            "DELETE target FROM tblDist AS target "
+            "INNER JOIN (VALUES (?, ?), (?, ?), (?, ?)) AS source (CustomerNum, AttnTo) "
+            "ON target.CustomerNum = source.CustomerNum AND target.AttnTo = source.AttnTo",
+            ["1", "A", "1", "B", "1", "missing"],
+        )
+    ]
+    assert fake_db[0].committed is True
+
+
+def test_delete_records_chunks_under_parameter_limit(monkeypatch, fake_db):
+    monkeypatch.setattr(db_helpers, "MAX_SQL_PARAMETERS", 4)
+    data = [{"CustomerNum": str(i), "AttnTo": "A"} for i in range(5)]
+
+    db_helpers.delete_records("tblDist", data, ["CustomerNum", "AttnTo"])
+
+    queries = fake_db[0].cursor_obj.queries
+    assert [len(params) for _, params in queries] == [4, 4, 2]
+    assert queries[-1][0] == "DELETE FROM tblDist WHERE CustomerNum = ? AND AttnTo = ?"
+
+
+def test_delete_records_requires_key_columns(fake_db):
+    with pytest.raises(ValueError, match="AttnTo is required for deletion"):
+        db_helpers.delete_records("tblDist", [{"CustomerNum": "1"}], ["CustomerNum", "AttnTo"])
+
+    assert fake_db == []
+
+
+def test_statement_cache_reuses_generated_sql(fake_db):
+    db_helpers.clear_statement_cache()
+    rows = [{"CustNum": "C1", "MthNum": 1, "RptMth": 10}]
+
+    db_helpers.merge_upsert_records("tblFreq", rows, ["CustNum", "MthNum"])
+    db_helpers.merge_upsert_records("tblFreq", rows, ["CustNum", "MthNum"])
+    db_helpers.delete_records("tblFreq", rows, ["CustNum", "MthNum"])
+
+    info = db_helpers.statement_cache_info()
+    assert info["merge"]["misses"] == 1
+    assert info["merge"]["hits"] == 1
+    assert info["delete"]["misses"] == 1
+    assert info["total"]["size"] == 2
+    assert fake_db[0].cursor_obj.queries[0][0] == fake_db[1].cursor_obj.queries[0][0]
+
+
+def test_statement_cache_does_not_cache_invalid_identifiers():
+    db_helpers.clear_statement_cache()
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            db_helpers._build_insert_query("tblTest", ("Good", "bad;col"))
+
+    assert db_helpers.statement_cache_info()["insert"]["size"] == 0
+
+
+def test_helpers_record_query_stats(monkeypatch, fake_db):
+    from core.query_stats import QueryStats
+
+    stats = QueryStats()
+    monkeypatch.setattr("core.query_stats.query_stats", stats)
+    monkeypatch.setattr(db_helpers.settings, "DB_READ_WITH_PANDAS", False)
+
+    db_helpers.run_raw_query("SELECT * FROM tblTest WHERE Stage = ?", ["Active"])
+    db_helpers.insert_records("tblTest", [{"A": 1}, {"A": 2}])
+
+    entries = {entry["fingerprint"]: entry for entry in stats.top(10)}
+    assert entries["SELECT * FROM tblTest WHERE Stage = ?"]["params"] == 1
+    assert entries["INSERT INTO tblTest (A) VALUES (?)"]["rows"] == 2
+    assert stats.tables()["tblTest"]["count"] == 2
+
+
+def test_helpers_declare_parameter_types_from_column_metadata(monkeypatch, fake_db, typed_columns):
+    from core.table_metadata import pyodbc
+
+    monkeypatch.setattr(db_helpers.settings, "DB_READ_WITH_PANDAS", False)
+
+    db_helpers.fetch_records("tblTest", {"CustomerNum": "1", "Stage": "Active"})
+    db_helpers.fetch_records("tblTest", {"CustomerNum": "123456", "Stage": "Inactive"})
+    db_helpers.merge_upsert_records(
+        "tblTest",
+        [{"CustomerNum": "7", "Premium": Decimal("1.50"), "Stage": None}],
+        ["CustomerNum"],
+    )
+
+    customer = (pyodbc.SQL_WVARCHAR, 20, 0)
+    stage = (pyodbc.SQL_VARCHAR, 50, 0)
+    assert typed_columns[0] == typed_columns[1] == [customer, stage]
+    assert typed_columns[2] == [customer, (pyodbc.SQL_DECIMAL, 12, 2), stage, None]
+    executed = [query for conn in fake_db for query, _ in conn.cursor_obj.queries]
+    assert not any("INFORMATION_SCHEMA" in query for query in executed)
+
+
+def test_writes_drop_unknown_columns_and_parse_dates(monkeypatch, fake_db, typed_columns):
+    monkeypatch.setattr(db_helpers.settings, "DB_UNKNOWN_COLUMNS", "drop")
+
+    db_helpers.merge_upsert_records(
+        "tblTest",
+        [{"CustomerNum": "7", "OnBoardDate": "2024-03-01", "frontendOnly": True}],
+        ["CustomerNum"],
+    )
+    db_helpers.insert_records("tblTest", [{"CustomerNum": "8", "stray": 1}])
+
+    merge_query, merge_params = fake_db[0].cursor_obj.queries[0]
+    assert "frontendOnly" not in merge_query
+    assert merge_params == ["7", date(2024, 3, 1), 0]
+    assert fake_db[1].cursor_obj.queries == [
+        ("INSERT INTO tblTest (CustomerNum) VALUES (?)", ["8"])
+    ]
+
+
+def test_writes_reject_unknown_columns_before_executing(monkeypatch, fake_db, typed_columns):
+    monkeypatch.setattr(db_helpers.settings, "DB_UNKNOWN_COLUMNS", "reject")
+
+    with pytest.raises(ValueError, match="Unknown column\\(s\\) for tblTest: stray"):
+        db_helpers.merge_upsert_records(
+            "tblTest", [{"CustomerNum": "7", "stray": 1}], ["CustomerNum"]
+        )
+
+    assert fake_db[0].cursor_obj.queries == []
+    assert fake_db[0].committed is False
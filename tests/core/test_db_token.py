@@ -0,0 +1,99 @@
+import struct
+import time
+
+import pytest
+
+from core import db_token
+from core.db_token import AccessToken, StaticTokenProvider, TokenCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ClockedProvider:
+    def __init__(self, clock: FakeClock, lifetime: float = 3600):
+        self.clock = clock
+        self.lifetime = lifetime
+        self.calls = 0
+        self.error: Exception | None = None
+
+    def __call__(self) -> AccessToken:
+        if self.error is not None:
+            raise self.error
+        self.calls += 1
+        return AccessToken(f"token-{self.calls}", self.clock.now + self.lifetime)
+
+
+def test_encode_access_token_prefixes_utf16_length():
+    encoded = db_token.encode_access_token("abc")
+
+    assert encoded == struct.pack("<I", 6) + "abc".encode("utf-16-le")
+
+
+def test_cache_reuses_token_until_refresh_margin():
+    clock = FakeClock()
+    provider = ClockedProvider(clock)
+    cache = TokenCache(provider, refresh_margin=300, clock=clock)
+
+    assert cache.get().token == "token-1"
+    clock.now += 3000
+    assert cache.get().token == "token-1"
+
+    clock.now += 301  # inside the margin
+    assert cache.get().token == "token-2"
+    assert provider.calls == 2
+
+
+def test_failed_refresh_serves_the_still_valid_token():
+    clock = FakeClock()
+    provider = ClockedProvider(clock)
+    cache = TokenCache(provider, refresh_margin=300, clock=clock)
+    cache.get()
+
+    provider.error = db_token.TokenAcquisitionError("identity provider unavailable")
+    clock.now += 3400
+    assert cache.get().token == "token-1"
+
+    clock.now += 300  # expired
+    with pytest.raises(db_token.TokenAcquisitionError):
+        cache.get()
+
+
+def test_background_refresh_renews_before_expiry():
+    provider = StaticTokenProvider(lifetime=1.2)
+    cache = TokenCache(provider, refresh_margin=0.1)
+    cache.start()
+    try:
+        deadline = time.monotonic() + 5
+        while provider.calls < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        cache.stop()
+
+    assert provider.calls >= 2
+    assert cache.get().token == "local-access-token"
+
+
+def test_access_token_attrs_use_the_configured_provider(monkeypatch):
+    monkeypatch.setattr(db_token.settings, "DB_TOKEN_PROVIDER", "static", raising=False)
+    monkeypatch.setattr(db_token.settings, "DB_STATIC_TOKEN", "stand-in", raising=False)
+    db_token.stop_token_refresh()
+    try:
+        attrs = db_token.access_token_attrs()
+    finally:
+        db_token.stop_token_refresh()
+
+    assert attrs == {db_token.SQL_COPT_SS_ACCESS_TOKEN: db_token.encode_access_token("stand-in")}
+
+
+def test_client_secret_provider_requires_azure_settings(monkeypatch):
+    monkeypatch.setattr(db_token.settings, "DB_TOKEN_PROVIDER", "client_secret", raising=False)
+    monkeypatch.setattr(db_token.settings, "AZURE_CLIENT_SECRET", None, raising=False)
+
+    with pytest.raises(ValueError, match="AZURE_TENANT_ID"):
+        db_token._provider_from_settings()
@@ -1,3 +1,6 @@
+import threading
+
+import anyio
 import pytest
 
 from core import encrypt
@@ -14,3 +17,61 @@ def test_verify_password_rejects_non_bcrypt():
         encrypt.verify_password("pw", "notahash")
 
     assert encrypt.verify_password(None, "anything") is False
+
+
+@pytest.mark.anyio
+async def test_run_password_task_verifies_off_the_loop():
+    hashed = encrypt.hash_password("super-secret")
+
+    assert await encrypt.run_password_task(encrypt.verify_password, "super-secret", hashed)
+    with pytest.raises(ValueError):
+        await encrypt.run_password_task(encrypt.verify_password, "pw", "notahash")
+
+
+@pytest.mark.anyio
+async def test_process_backend_hashes_in_worker_processes():
+    workers = encrypt.PasswordWorkers(encrypt.PROCESS, workers=2, max_pending=4)
+    try:
+        assert await workers.start() == 2
+        hashed = await workers.run(encrypt.hash_password, "super-secret")
+        assert await workers.run(encrypt.verify_password, "super-secret", hashed) is True
+    finally:
+        workers.shutdown()
+
+
+@pytest.mark.anyio
+async def test_full_queue_fails_fast():
+    workers = encrypt.PasswordWorkers(encrypt.THREAD, workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def hold_slot():
+        return await workers.run(release.wait, 5)
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(hold_slot)
+        await anyio.sleep(0.05)
+        assert workers.stats()["pending"] == 1
+
+        with pytest.raises(encrypt.PasswordHashingBusyError):
+            await workers.run(encrypt.verify_password, "pw", "x" * 60)
+        release.set()
+
+    assert workers.stats()["pending"] == 0
+
+
+@pytest.mark.anyio
+async def test_process_backend_replaces_a_broken_pool():
+    workers = encrypt.PasswordWorkers(encrypt.PROCESS, workers=1, max_pending=4)
+    try:
+        await workers.start()
+        broken = workers._pool
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join()
+
+        hashed = await workers.run(encrypt.hash_password, "super-secret")
+
+        assert workers._pool is not broken
+        assert encrypt.verify_password("super-secret", hashed) is True
+    finally:
+        workers.shutdown()
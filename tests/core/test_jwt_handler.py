@@ -1,3 +1,5 @@
+import time
+
 import pytest
 from fastapi import HTTPException
 
@@ -22,3 +24,55 @@ def test_decode_invalid_token_raises():
 def test_verify_token_invalid():
     with pytest.raises(HTTPException):
         jwt_handler.verify_token("invalid-token")
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = jwt_handler.VerifiedTokenCache(max_entries=2)
+    monkeypatch.setattr(jwt_handler, "verified_tokens", cache)
+    return cache
+
+
+def test_decode_serves_verified_tokens_from_cache(token_cache, monkeypatch):
+    token = jwt_handler.create_access_token(123, "admin")
+    decodes: list[str] = []
+    real_decode = jwt_handler.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt_handler.jwt, "decode", counting_decode)
+
+    first = jwt_handler.decode_access_token(token)
+    second = jwt_handler.decode_access_token(token)
+
+    assert first == second
+    assert second["sub"] == "123"
+    assert len(decodes) == 1
+    assert token_cache.stats()["hits"] == 1
+
+    jwt_handler.forget_access_token(token)
+    jwt_handler.decode_access_token(token)
+    assert len(decodes) == 2
+
+
+def test_expired_tokens_are_never_served_from_cache(token_cache):
+    token_cache.put("stale", {"sub": "1", "exp": time.time() - 1})
+    token_cache.put("no-exp", {"sub": "1"})
+
+    assert token_cache.get("stale") is None
+    assert token_cache.get("no-exp") is None
+    assert token_cache.stats()["size"] == 0
+
+
+def test_least_recently_used_tokens_are_evicted(token_cache):
+    exp = time.time() + 60
+    token_cache.put("a", {"sub": "1", "exp": exp})
+    token_cache.put("b", {"sub": "2", "exp": exp})
+    token_cache.get("a")
+    token_cache.put("c", {"sub": "3", "exp": exp})
+
+    assert token_cache.get("b") is None
+    assert token_cache.get("a")["sub"] == "1"
+    assert token_cache.stats()["evictions"] == 1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from core import lifecycle
+
+
+class FakePool:
+    def __init__(self):
+        self.filled: list[int] = []
+
+    def fill(self, count=None):
+        self.filled.append(count)
+        return 1 if len(self.filled) == 1 else 0
+
+
+@pytest.fixture
+def fake_lifecycle(monkeypatch):
+    pool = FakePool()
+    closed: list[str] = []
+
+    monkeypatch.setattr(lifecycle, "get_pool", lambda read_only=False: pool)
+    monkeypatch.setattr(lifecycle, "read_routing_enabled", lambda: False)
+    monkeypatch.setattr(lifecycle, "shutdown_db_executor", lambda wait: closed.append("executor"))
+    monkeypatch.setattr(lifecycle, "close_pool", lambda: closed.append("pool"))
+    monkeypatch.setattr(lifecycle, "stop_token_refresh", lambda: closed.append("token"))
+    monkeypatch.setattr(lifecycle.settings, "DB_WARMUP_CONNECTIONS", 2)
+    monkeypatch.setattr(lifecycle.settings, "DB_WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(lifecycle.settings, "DB_SHUTDOWN_GRACE_SECONDS", 5)
+    yield pool, closed
+    lifecycle.readiness.reset()
+
+
+async def _wait_until_ready():
+    for _ in range(200):
+        if lifecycle.readiness.ready:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"never became ready: {lifecycle.readiness.snapshot()}")
+
+
+@pytest.mark.anyio
+async def test_lifecycle_warms_then_drains(fake_lifecycle):
+    pool, closed = fake_lifecycle
+
+    async def prime():
+        return 3
+
+    async with lifecycle.managed_lifecycle({"dropdowns": prime}) as readiness:
+        await _wait_until_ready()
+        assert readiness.snapshot() == {
+            "status": "ready",
+            "warmed": {"connections": 1, "dropdowns": 3},
+            "error": None,
+        }
+        assert set(pool.filled) == {2}
+        assert closed == []
+
+    assert lifecycle.readiness.state == lifecycle.DRAINING
+    assert closed == ["executor", "pool", "token"]
+
+
+@pytest.mark.anyio
+async def test_failed_warm_up_is_retried(fake_lifecycle):
+    attempts: list[int] = []
+
+    async def flaky_prime():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("database not reachable yet")
+        return 1
+
+    async with lifecycle.managed_lifecycle({"dropdowns": flaky_prime}) as readiness:
+        await _wait_until_ready()
+        assert readiness.error is None
+
+    assert len(attempts) == 2
@@ -0,0 +1,57 @@
+from core.principal_cache import PrincipalCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("core.principal_cache.time.monotonic", lambda: now[0])
+    cache = PrincipalCache(max_entries=10, ttl=60)
+
+    cache.put(1, "token", {"id": 1})
+    assert cache.get(1, "token") == {"id": 1}
+    assert cache.get(1, "other-token") is None
+
+    now[0] += 60
+    assert cache.get(1, "token") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = PrincipalCache(max_entries=2, ttl=60)
+    cache.put(1, "a", {"id": 1})
+    cache.put(2, "b", {"id": 2})
+    cache.get(1, "a")
+
+    cache.put(3, "c", {"id": 3})
+
+    assert cache.get(2, "b") is None
+    assert cache.get(1, "a") == {"id": 1}
+    assert cache.get(3, "c") == {"id": 3}
+
+
+def test_invalidate_drops_one_user_or_everyone():
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    cache.put(1, "a", {"id": 1})
+    cache.put(1, "b", {"id": 1})
+    cache.put(2, "c", {"id": 2})
+
+    assert cache.invalidate(1) == 2
+    assert cache.get(1, "a") is None
+    assert cache.get(2, "c") == {"id": 2}
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+
+def test_cached_users_are_copies():
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    cache.put(1, "a", {"id": 1, "role": "user"})
+
+    cache.get(1, "a")["role"] = "admin"
+
+    assert cache.get(1, "a")["role"] == "user"
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = PrincipalCache(max_entries=10, ttl=0)
+    cache.put(1, "a", {"id": 1})
+
+    assert cache.get(1, "a") is None
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db
+from core.query_budget import _cancel_on_disconnect, query_budget
+
+
+def test_query_budget_scopes_the_request():
+    app = FastAPI()
+
+    @app.get("/", dependencies=[query_budget(12)])
+    async def endpoint():
+        scope = db.current_query_scope()
+        return {"timeout": scope.timeout, "cancelled": scope.cancelled}
+
+    response = TestClient(app).get("/")
+
+    assert response.status_code == 200
+    assert response.json() == {"timeout": 12, "cancelled": False}
+    assert db.current_query_scope() is None
+
+
+@pytest.mark.anyio
+async def test_disconnect_cancels_the_scope():
+    messages = asyncio.Queue()
+
+    class FakeRequest:
+        async def receive(self):
+            return await messages.get()
+
+    scope = db.QueryScope(30)
+    watcher = asyncio.create_task(_cancel_on_disconnect(FakeRequest(), scope))
+
+    await messages.put({"type": "http.request", "body": b"", "more_body": False})
+    await asyncio.sleep(0)
+    assert scope.cancelled is False
+
+    await messages.put({"type": "http.disconnect"})
+    await asyncio.wait_for(watcher, timeout=1)
+    assert scope.cancelled is True
@@ -0,0 +1,106 @@
+import logging
+
+import pytest
+
+from core import query_stats as query_stats_module
+from core.query_stats import QueryStats, fingerprint, measure_query, table_of
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    fresh = QueryStats(max_fingerprints=3)
+    monkeypatch.setattr(query_stats_module, "query_stats", fresh)
+    return fresh
+
+
+def test_fingerprint_strips_literals_and_collapses_lists():
+    assert (
+        fingerprint(
+            "SELECT *  FROM tblAcctSpecial\n WHERE Stage = 'Admin' AND IsSubmitted = 1 -- note"
+        )
+        == "SELECT * FROM tblAcctSpecial WHERE Stage = ? AND IsSubmitted = ?"
+    )
+    assert fingerprint("SELECT a FROM t WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT a FROM t WHERE id IN (?)"
+    ).replace("(?)", "(...)")
+
+    two_rows = "MERGE INTO tblX AS target USING (VALUES (?, ?), (?, ?)) AS source (A, B) ON 1 = 1;"
+    three_rows = (
+        "MERGE INTO tblX AS target USING (VALUES (?, ?), (?, ?), (?, ?)) AS source (A, B) ON 1 = 1"
+    )
+    assert fingerprint(two_rows) == fingerprint(three_rows)
+    assert "VALUES (...)" in fingerprint(two_rows)
+
+
+def test_table_of_reads_statement_target():
+    assert table_of("SELECT * FROM [dbo].[tblPolicies] WHERE x = ?") == "tblPolicies"
+    assert table_of("INSERT INTO tblLossRunDist (A) VALUES (?)") == "tblLossRunDist"
+    assert table_of("UPDATE tblPolicies SET Stage = ?") == "tblPolicies"
+    assert table_of("SELECT 1") is None
+
+
+def test_fingerprint_and_table_of_are_memoized_per_statement():
+    sql = "MERGE INTO tblMemo AS target USING (VALUES (?, ?), (?, ?)) AS source (A, B) ON 1 = 0;"
+    fingerprint.cache_clear()
+    table_of.cache_clear()
+
+    for _ in range(3):
+        fingerprint(sql)
+        table_of(sql)
+
+    assert fingerprint.cache_info().hits == 2
+    assert table_of.cache_info().hits == 2
+
+
+def test_record_builds_histograms_and_top_by_total_time(stats):
+    stats.record("SELECT * FROM tblA WHERE id = 1", 3.0, rows=1, params=1)
+    stats.record("SELECT * FROM tblA WHERE id = 2", 40.0, rows=2, params=1)
+    stats.record("DELETE FROM tblB WHERE id = ?", 2000.0, failed=True)
+
+    top = stats.top(2)
+
+    assert [entry["fingerprint"] for entry in top] == [
+        "DELETE FROM tblB WHERE id = ?",
+        "SELECT * FROM tblA WHERE id = ?",
+    ]
+    select = top[1]
+    assert select["count"] == 2
+    assert select["total_ms"] == 43.0
+    assert select["max_ms"] == 40.0
+    assert select["rows"] == 3
+    assert select["histogram_ms"]["le_5"] == 1
+    assert select["histogram_ms"]["le_50"] == 1
+    assert top[0]["errors"] == 1
+    assert stats.tables()["tblA"]["count"] == 2
+    assert stats.top(1, by="count")[0]["fingerprint"].startswith("SELECT")
+
+
+def test_record_pools_fingerprints_beyond_limit(stats):
+    for table in ("tblA", "tblB", "tblC", "tblD", "tblE"):
+        stats.record(f"SELECT * FROM {table}", 1.0)
+
+    entries = {entry["fingerprint"]: entry for entry in stats.top(10)}
+    assert len(entries) == 4
+    assert entries[query_stats_module.OVERFLOW_FINGERPRINT]["count"] == 2
+
+
+def test_measure_query_logs_slow_statements_without_parameters(stats, monkeypatch, caplog):
+    monkeypatch.setattr(query_stats_module.settings, "DB_SLOW_QUERY_MS", 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger="core.query_stats"):
+        with measure_query("SELECT * FROM tblA WHERE Name = 'secret'", params=0) as measured:
+            measured.rows = 4
+
+    assert "Slow query" in caplog.text
+    assert "secret" not in caplog.text
+    assert stats.top(1)[0]["rows"] == 4
+
+
+def test_measure_query_counts_failures(stats):
+    with pytest.raises(RuntimeError):
+        with measure_query("SELECT * FROM tblA", params=2):
+            raise RuntimeError("boom")
+
+    entry = stats.top(1)[0]
+    assert entry["errors"] == 1
+    assert entry["params"] == 2
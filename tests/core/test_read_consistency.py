@@ -0,0 +1,24 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db
+from core.read_consistency import read_consistency
+
+
+def test_read_consistency_sets_the_request_isolation():
+    app = FastAPI()
+
+    @app.get("/", dependencies=[read_consistency(db.SNAPSHOT)])
+    async def endpoint():
+        return {"isolation": db.current_read_isolation()}
+
+    response = TestClient(app).get("/")
+
+    assert response.status_code == 200
+    assert response.json() == {"isolation": "snapshot"}
+
+
+def test_read_consistency_rejects_unknown_level_at_import():
+    with pytest.raises(ValueError, match="Unknown read isolation level"):
+        read_consistency("uncommitted")
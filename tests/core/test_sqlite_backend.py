@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+import db
+from core import db_helpers, sqlite_backend
+from core.sqlite_backend import translate
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("sqlite") / "sac.sqlite3")
+    sqlite_backend.ensure_database(path, accounts=25)
+    return path
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch, database):
+    monkeypatch.setattr(db.settings, "DB_BACKEND", "sqlite")
+    monkeypatch.setattr(db.settings, "DB_SQLITE_PATH", database)
+    monkeypatch.setattr(db.settings, "DB_READ_WITH_PANDAS", False)
+    monkeypatch.setattr(db, "_pool", None)
+    monkeypatch.setattr(db, "_read_pool", None)
+    yield database
+    db.close_pool()
+
+
+def test_translate_brackets_top_and_literals():
+    sql, params = translate(
+        "SELECT TOP (?) * FROM (SELECT [UW Last] FROM tblUnderwriters "
+        "WHERE Note = N'[x]') AS page_source WHERE (([UW Last] > ?)) ORDER BY [UW Last];",
+        [6, "A"],
+    )
+
+    assert sql == (
+        'SELECT * FROM (SELECT "UW Last" FROM tblUnderwriters '
+        "WHERE Note = '[x]') AS page_source WHERE ((\"UW Last\" > ?)) "
+        'ORDER BY "UW Last" LIMIT ?'
+    )
+    assert params == ["A", 6]
+
+
+def test_translate_delete_join_to_row_value_in():
+    sql, params = translate(
+        "DELETE target FROM tblDist AS target INNER JOIN (VALUES (?, ?), (?, ?)) "
+        "AS source (CustomerNum, AttnTo) ON target.CustomerNum = source.CustomerNum "
+        "AND target.AttnTo = source.AttnTo",
+        ["1", "A", "1", "B"],
+    )
+
+    assert sql == "DELETE FROM tblDist WHERE (CustomerNum, AttnTo) IN (VALUES (?, ?), (?, ?))"
+    assert params == ["1", "A", "1", "B"]
+
+
+def test_seeded_tables_serve_helper_reads(sqlite_db):
+    accounts = db_helpers.fetch_records("tblAcctSpecial", {"CustomerNum": "100003"})
+    assert len(accounts) == 1
+    assert isinstance(accounts[0]["OnBoardDate"], date)
+
+    page = db_helpers.fetch_page(
+        "tblPolicies", {"CustomerNum": "100003"}, key_columns=["PK_Number"], limit=2
+    )
+    assert len(page["items"]) <= 2
+
+    services = db_helpers.run_raw_query(
+        "SELECT [service Level], [Dollar Threshold] FROM tblServiceLevel ORDER BY SortNum"
+    )
+    assert services[0] == {"service Level": "Comprehensive", "Dollar Threshold": 1000000}
+    assert len(db_helpers.run_raw_query("SELECT * FROM tblLossRunFrequency")) == 25 * 12
+
+
+def test_merge_insert_and_delete_are_emulated(sqlite_db):
+    rows = [
+        {"CustomerNum": "100001", "AttnTo": "Risk Manager", "DistVia": "Mail"},
+        {"CustomerNum": "100001", "AttnTo": "Treasurer", "DistVia": "Email"},
+    ]
+
+    db_helpers.merge_upsert_records("tblDistribute_LossRun", rows, ["CustomerNum", "AttnTo"])
+
+    stored = db_helpers.fetch_records("tblDistribute_LossRun", {"CustomerNum": "100001"})
+    by_attn = {row["AttnTo"]: row["DistVia"] for row in stored}
+    assert by_attn == {"Risk Manager": "Mail", "CFO": "Email", "Treasurer": "Email"}
+
+    result = db_helpers.insert_records(
+        "tblAffiliates",
+        [
+            {"CustomerNum": "100001", "AffiliateName": "One"},
+            {"CustomerNum": "100001", "AffiliateName": "Two"},
+        ],
+        return_identity="PK_Number",
+    )
+    first, second = result["identities"]
+    assert second == first + 1
+
+    deleted = db_helpers.delete_records(
+        "tblDistribute_LossRun",
+        [
+            {"CustomerNum": "100001", "AttnTo": "Treasurer"},
+            {"CustomerNum": "100001", "AttnTo": "CFO"},
+        ],
+        ["CustomerNum", "AttnTo"],
+    )
+    assert deleted["count"] == 2
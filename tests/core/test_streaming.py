@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from core import streaming
+
+
+async def _batches(*batches, fail_after=None):
+    for index, batch in enumerate(batches):
+        if fail_after is not None and index == fail_after:
+            raise RuntimeError("cursor failed")
+        yield batch
+
+
+async def _body(response):
+    return "".join([chunk async for chunk in response.body_iterator])
+
+
+def test_wants_ndjson():
+    assert streaming.wants_ndjson("application/x-ndjson")
+    assert not streaming.wants_ndjson("application/json")
+    assert not streaming.wants_ndjson(None)
+
+
+@pytest.mark.anyio
+async def test_stream_json_array_encodes_like_regular_responses():
+    response = await streaming.stream_records_response(
+        _batches(
+            [{"Id": 1, "Amount": Decimal("1.50")}],
+            [],
+            [{"Id": 2, "When": datetime(2024, 1, 2, 3, 4)}],
+        )
+    )
+
+    assert response.media_type == "application/json"
+    assert json.loads(await _body(response)) == [
+        {"Id": 1, "Amount": 1.5},
+        {"Id": 2, "When": "2024-01-02T03:04:00"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_stream_empty_result_is_empty_array():
+    response = await streaming.stream_records_response(_batches())
+    assert await _body(response) == "[]"
+
+
+@pytest.mark.anyio
+async def test_stream_ndjson_applies_transform_per_batch():
+    def upper(batch):
+        return [{key: value.upper() for key, value in record.items()} for record in batch]
+
+    response = await streaming.stream_records_response(
+        _batches([{"Name": "a"}, {"Name": "b"}], [{"Name": "c"}]),
+        ndjson=True,
+        transform=upper,
+    )
+
+    assert await _body(response) == '{"Name":"A"}\n{"Name":"B"}\n{"Name":"C"}\n'
+
+
+@pytest.mark.anyio
+async def test_stream_raises_before_response_when_first_batch_fails():
+    with pytest.raises(RuntimeError):
+        await streaming.stream_records_response(_batches([{"Id": 1}], fail_after=0))
+
+
+@pytest.mark.anyio
+async def test_stream_failure_after_first_batch_closes_the_json_array():
+    response = await streaming.stream_records_response(
+        _batches([{"Id": 1}], [{"Id": 2}], fail_after=1)
+    )
+
+    assert json.loads(await _body(response)) == [{"Id": 1}, {"error": "cursor failed"}]
+
+
+@pytest.mark.anyio
+async def test_stream_failure_after_first_batch_ends_ndjson_with_an_error_line():
+    response = await streaming.stream_records_response(
+        _batches([{"Id": 1}], [{"Id": 2}], fail_after=1), ndjson=True
+    )
+
+    assert await _body(response) == '{"Id":1}\n{"error":"cursor failed"}\n'
@@ -0,0 +1,170 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from core import table_metadata
+from core.table_metadata import (
+    ColumnInfo,
+    bind_parameter_types,
+    get_table_columns,
+    parameter_sizes,
+    prepare_records,
+    pyodbc,
+)
+
+
+class MetadataCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params):
+        self.conn.lookups.append(params[0])
+        if self.conn.error:
+            raise self.conn.error
+
+    def fetchall(self):
+        return list(self.conn.rows)
+
+    def close(self):
+        pass
+
+
+class MetadataConnection:
+    def __init__(self, rows=(), error=None):
+        self.rows = rows
+        self.error = error
+        self.lookups: list[str] = []
+
+    def cursor(self):
+        return MetadataCursor(self)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(table_metadata, "_tables", {})
+    monkeypatch.setattr(table_metadata, "_failed", {})
+    monkeypatch.setattr(table_metadata.settings, "DB_TYPED_PARAMETERS", True)
+    monkeypatch.setattr(table_metadata.settings, "DB_SCHEMA_CACHE_TTL_SECONDS", 600)
+    monkeypatch.setattr(table_metadata.settings, "DB_UNKNOWN_COLUMNS", "drop")
+
+
+def test_string_columns_bind_declared_length():
+    column = ColumnInfo("CustomerName", "nvarchar", 100)
+
+    assert column.input_size(["a"]) == column.input_size(["a much longer name"])
+    assert column.input_size(["a"]) == (pyodbc.SQL_WVARCHAR, 100, 0)
+    assert column.input_size(["x" * 101]) == (pyodbc.SQL_WVARCHAR, 0, 0)
+    assert ColumnInfo("Notes", "nvarchar", -1).input_size(["x"]) == (pyodbc.SQL_WVARCHAR, 0, 0)
+    assert column.input_size([None]) == (pyodbc.SQL_WVARCHAR, 100, 0)
+    assert column.input_size([5]) is None
+
+
+def test_numeric_columns():
+    assert ColumnInfo("IsSubmitted", "int").input_size([1]) == (pyodbc.SQL_INTEGER, 0, 0)
+    assert ColumnInfo("PremiumAmt", "money").input_size([Decimal("1.5")]) == (
+        pyodbc.SQL_DECIMAL,
+        19,
+        4,
+    )
+    assert ColumnInfo("PremiumAmt", "decimal", None, 12, 2).input_size(["1.50"]) is None
+    assert ColumnInfo("OnBoardDate", "date").input_size(["2024-01-01"]) is None
+
+
+def test_table_columns_are_loaded_once_per_table():
+    conn = MetadataConnection(rows=[("CustomerNum", "nvarchar", 20, None, None)])
+
+    first = get_table_columns(conn, "tblAcctSpecial")
+    second = get_table_columns(conn, "TBLACCTSPECIAL")
+
+    assert first is second
+    assert first["customernum"].max_length == 20
+    assert conn.lookups == ["tblAcctSpecial"]
+
+    table_metadata.clear_table_metadata("tblAcctSpecial")
+    get_table_columns(conn, "tblAcctSpecial")
+    assert len(conn.lookups) == 2
+
+
+def test_parameter_sizes_falls_back_when_metadata_is_unavailable():
+    failing = MetadataConnection(error=RuntimeError("no access"))
+
+    assert parameter_sizes(failing, "tblX", ["A"], [["x"]]) is None
+    assert parameter_sizes(failing, "tblX", ["A"], [["x"]]) is None
+    assert failing.lookups == ["tblX"]
+
+
+def test_failed_lookups_are_retried_before_the_ttl():
+    failing = MetadataConnection(error=RuntimeError("deadlock victim"))
+    assert get_table_columns(failing, "tblX") == {}
+    assert get_table_columns(failing, "tblX") == {}
+    assert failing.lookups == ["tblX"]
+    assert "tblx" not in table_metadata._tables
+
+    table_metadata._failed["tblx"] = 0.0  # retry window over, long before the 600s TTL
+    conn = MetadataConnection(rows=[("A", "int", None, 10, 0)])
+    assert set(get_table_columns(conn, "tblX")) == {"a"}
+    assert set(get_table_columns(conn, "tblX")) == {"a"}
+    assert conn.lookups == ["tblX"]
+
+
+def test_parameter_sizes_covers_every_executemany_row():
+    conn = MetadataConnection(rows=[("AttnTo", "varchar", 10, None, None)])
+
+    assert parameter_sizes(conn, "tblDist", [None, "AttnTo"], [[1, "a"], [2, "b"]]) == [
+        None,
+        (pyodbc.SQL_VARCHAR, 10, 0),
+    ]
+    assert parameter_sizes(conn, "tblDist", ["AttnTo"], [["a"], ["x" * 11]]) == [
+        (pyodbc.SQL_VARCHAR, 0, 0)
+    ]
+    assert parameter_sizes(conn, "tblDist", ["Unknown"], [["a"]]) is None
+
+
+def test_untyped_statement_clears_earlier_input_sizes():
+    conn = MetadataConnection(rows=[("AttnTo", "varchar", 10, None, None)])
+    declared: list = []
+
+    class SizedCursor:
+        def setinputsizes(self, sizes):
+            declared.append(sizes)
+
+    cursor = SizedCursor()
+    bind_parameter_types(conn, cursor, "tblDist", ["AttnTo"], [["a"]])
+    bind_parameter_types(conn, cursor, "tblDist", ["Unknown"], [["a"]])
+
+    assert declared == [[(pyodbc.SQL_VARCHAR, 10, 0)], None]
+
+
+def test_table_columns_reload_after_ttl(monkeypatch):
+    conn = MetadataConnection(rows=[("CustomerNum", "nvarchar", 20, None, None)])
+    get_table_columns(conn, "tblAcctSpecial")
+
+    loaded_at, columns = table_metadata._tables["tblacctspecial"]
+    table_metadata._tables["tblacctspecial"] = (loaded_at - 601, columns)
+    get_table_columns(conn, "tblAcctSpecial")
+
+    assert conn.lookups == ["tblAcctSpecial", "tblAcctSpecial"]
+
+
+def test_prepare_records_keeps_known_columns_and_rejects_unknown_keys(monkeypatch):
+    conn = MetadataConnection(
+        rows=[
+            ("CustomerNum", "nvarchar", 20, None, None),
+            ("TermDate", "datetime", None, None, None),
+        ]
+    )
+
+    prepared = prepare_records(
+        conn, "tblAcctSpecial", [{"customernum": "1", "TermDate": "2024-01-02T10:00:00", "x": 1}]
+    )
+    assert prepared == [{"customernum": "1", "TermDate": datetime(2024, 1, 2, 10, 0)}]
+
+    with pytest.raises(ValueError, match="Unknown column\\(s\\) for tblAcctSpecial: Key"):
+        prepare_records(conn, "tblAcctSpecial", [{"Key": 1}], required=["Key"])
+
+    monkeypatch.setattr(table_metadata.settings, "DB_UNKNOWN_COLUMNS", "reject")
+    with pytest.raises(ValueError, match="x"):
+        prepare_records(conn, "tblAcctSpecial", [{"CustomerNum": "1", "x": 1}])
+
+    assert prepare_records(MetadataConnection(), "tblNew", [{"x": 1}]) == [{"x": 1}]
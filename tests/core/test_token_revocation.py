@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+
+import pytest
+
+from core import sqlite_backend, token_revocation
+from core.token_revocation import RevocationList
+
+
+def test_is_revoked_checks_jti_version_and_deactivation():
+    revocations = RevocationList()
+    revocations.replace({"old-jti": 4102444800.0}, {"7": 2}, {"9"})
+
+    assert revocations.is_revoked({"sub": "7", "ver": 2, "jti": "old-jti"})
+    assert revocations.is_revoked({"sub": "7", "ver": 1, "jti": "other"})
+    assert not revocations.is_revoked({"sub": "7", "ver": 2, "jti": "other"})
+    assert revocations.is_revoked({"sub": "9", "ver": 0, "jti": "x"})
+    assert not revocations.is_revoked({"sub": "8", "ver": 0, "jti": "x"})
+
+
+def test_reload_keeps_local_revocations_and_higher_versions():
+    revocations = RevocationList()
+    revocations.revoke("fresh", 4102444800.0)
+    revocations.revoke("expired", 1.0)
+    revocations.set_version(7, 3)
+
+    revocations.replace({}, {"7": 2, "8": 1}, set())
+
+    assert revocations.is_revoked({"sub": "1", "jti": "fresh"})
+    assert revocations.stats()["revoked_tokens"] == 1
+    assert revocations.version_of(7) == 3
+    assert revocations.version_of(8) == 1
+
+
+def test_refresh_loads_lists_from_the_database(monkeypatch):
+    results = {
+        token_revocation._REVOKED_QUERY: [{"Jti": "a", "ExpiresAt": 4102444800}],
+        token_revocation._VERSIONS_QUERY: [{"UserID": 7, "TokenVersion": 2}],
+        token_revocation._DISABLED_QUERY: [{"ID": 9}],
+    }
+    monkeypatch.setattr(
+        token_revocation, "run_raw_query", lambda query, params, **kwargs: results[query]
+    )
+    revocations = RevocationList()
+
+    assert revocations.refresh() == 3
+    assert revocations.is_revoked({"sub": "9"})
+    assert revocations.version_of("7") == 2
+    assert revocations.loaded_at is not None
+
+
+def test_bump_token_version_increments_per_user(tmp_path, monkeypatch):
+    path = str(tmp_path / "auth.sqlite3")
+
+    @contextmanager
+    def _db_connection(read_only=False):
+        conn = sqlite_backend.connect(path, seed_accounts=1)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    revocations = RevocationList()
+    monkeypatch.setattr(token_revocation, "db_connection", _db_connection)
+    monkeypatch.setattr(token_revocation, "revocations", revocations)
+
+    assert token_revocation.bump_token_version(7) == 1
+    assert token_revocation.bump_token_version(7) == 2
+    assert token_revocation.bump_token_version(8) == 1
+    assert revocations.version_of(7) == 2
+
+
+@pytest.mark.anyio
+async def test_refresher_starts_when_the_first_load_fails(monkeypatch):
+    revocations = RevocationList()
+    started: list[float] = []
+
+    def fail():
+        raise OSError("database unavailable")
+
+    monkeypatch.setattr(token_revocation.settings, "AUTH_SELF_CONTAINED_TOKENS", True)
+    monkeypatch.setattr(token_revocation, "revocations", revocations)
+    monkeypatch.setattr(revocations, "refresh", fail)
+    monkeypatch.setattr(revocations, "start", started.append)
+
+    with pytest.raises(OSError):
+        await token_revocation.start_revocation_refresh()
+
+    assert started and not revocations.loaded
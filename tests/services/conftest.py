@@ -1,6 +1,17 @@
 import pytest
 
+from core import db_helpers
+
 
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def table_columns(monkeypatch):
+    """`fields=` allow-lists come from this table -> columns dict, not INFORMATION_SCHEMA."""
+    tables: dict[str, set[str]] = {}
+    monkeypatch.setattr(db_helpers, "cached_table_columns", lambda table: None)
+    monkeypatch.setattr(db_helpers, "table_fields", lambda table: set(tables.get(table, ())))
+    return tables
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import date
 
 import pytest
@@ -6,13 +7,27 @@ from fastapi import HTTPException
 from services.sac import hcm_users_service as svc
 
 
+@pytest.fixture(autouse=True)
+def transactions(monkeypatch):
+    """Replace unit_of_work with a no-op that records how often it was entered."""
+    entered: list[bool] = []
+
+    @asynccontextmanager
+    async def fake_unit_of_work():
+        entered.append(True)
+        yield
+
+    monkeypatch.setattr(svc, "unit_of_work", fake_unit_of_work)
+    return entered
+
+
 @pytest.mark.anyio
 async def test_get_hcm_users_remaps_filters(monkeypatch):
     def fake_sanitize(params, allowed=None):
         assert params == {"CustNum": "C1"}
         return params
 
-    async def fake_fetch(table, filters):
+    async def fake_fetch(table, filters, columns=None):
         assert filters == {"CustNum": "C1"}
         return [{"CustNum": "C1", "UserID": "u1", "AccessDate": "2024-05-01"}]
 
@@ -119,3 +134,41 @@ async def test_upsert_hcm_users_validates_telephone(monkeypatch):
 
     assert exc.value.status_code == 422
     assert exc.value.detail["errors"][0]["field"] == "TelNum"
+
+
+@pytest.mark.anyio
+async def test_get_hcm_users_maps_projected_fields(monkeypatch):
+    async def fake_fetch(table, filters, columns=None):
+        assert columns == ["CustNum", "UserName"]
+        return [{"CustNum": "C1", "UserName": "u1"}]
+
+    monkeypatch.setattr(svc, "fetch_records_async", fake_fetch)
+
+    result = await svc.get_hcm_users({}, fields="CustomerNum,UserName")
+    assert result == [{"CustomerNum": "C1", "UserName": "u1"}]
+
+
+@pytest.mark.anyio
+async def test_get_hcm_users_rejects_invalid_fields():
+    with pytest.raises(HTTPException) as exc:
+        await svc.get_hcm_users({}, fields="UserName;DROP")
+
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_get_hcm_users_rejects_unknown_columns(monkeypatch, table_columns):
+    table_columns[svc.TABLE_NAME] = {"PK_Number", "CustNum", "UserName", "UserEmail"}
+
+    async def fake_fetch(table, filters, columns=None):
+        assert columns == ["CustNum", "UserEmail"]
+        return []
+
+    monkeypatch.setattr(svc, "fetch_records_async", fake_fetch)
+
+    assert await svc.get_hcm_users({}, fields="CustomerNum,UserEmail") == []
+    with pytest.raises(HTTPException) as exc:
+        await svc.get_hcm_users({}, fields="CustomerNum,UserEmial")
+
+    assert exc.value.status_code == 400
+    assert "UserEmial" in exc.value.detail["error"]
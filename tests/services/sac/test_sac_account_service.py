@@ -3,6 +3,7 @@ from datetime import date, datetime
 import pytest
 from fastapi import HTTPException
 
+from db import QueryTimeoutError
 from services.sac import sac_account_service as svc
 
 
@@ -14,7 +15,7 @@ async def test_get_sac_account_without_branch(monkeypatch):
         assert allowed == svc.ALLOWED_FILTERS
         return {"CustomerNum": "1"}
 
-    async def fake_fetch(table, filters):
+    async def fake_fetch(table, filters, columns=None):
         calls["filters"] = filters
         assert table == svc.TABLE_NAME
         return [
@@ -76,12 +77,54 @@ async def test_get_sac_account_with_branch(monkeypatch):
     assert captured["params"] == ["Active", "NY%", "LA%"]
 
 
+@pytest.mark.anyio
+async def test_get_sac_account_paginates_table_reads(monkeypatch):
+    captured = {}
+
+    async def fake_page(**kwargs):
+        captured.update(kwargs)
+        return {"items": [{"CustomerNum": "2", "OnBoardDate": "2024-01-05"}], "next": None}
+
+    monkeypatch.setattr(svc, "fetch_page_async", fake_page)
+
+    result = await svc.get_sac_account({"Stage": "Admin"}, limit=25, after="tok")
+    assert result == {"items": [{"CustomerNum": "2", "OnBoardDate": "05-01-2024"}], "next": None}
+    assert captured["filters"] == {"Stage": "Admin"}
+    assert captured["key_columns"] == ["CustomerNum"]
+    assert captured["limit"] == 25
+    assert captured["after"] == "tok"
+
+
+@pytest.mark.anyio
+async def test_get_sac_account_paginates_branch_query(monkeypatch):
+    captured = {}
+
+    def fake_sanitize(params, allowed):
+        return {"BranchName": "NY"}
+
+    async def fake_page(query, params, **kwargs):
+        captured["query"] = query
+        captured["params"] = params
+        captured.update(kwargs)
+        return {"items": [{"CustomerName": "Acme"}], "next": "tok"}
+
+    monkeypatch.setattr(svc, "sanitize_filters", fake_sanitize)
+    monkeypatch.setattr(svc, "run_raw_query_page_async", fake_page)
+
+    result = await svc.get_sac_account({}, fields="CustomerName", limit=10)
+    assert result == {"items": [{"CustomerName": "Acme"}], "next": "tok"}
+    assert captured["query"].startswith("SELECT CustomerName, CustomerNum FROM")
+    assert "ORDER BY" not in captured["query"]
+    assert captured["params"] == ["NY%"]
+    assert captured["hidden_columns"] == ["CustomerNum"]
+
+
 @pytest.mark.anyio
 async def test_get_sac_account_handles_null_onboard_date(monkeypatch):
     def fake_sanitize(params, allowed):
         return {}
 
-    async def fake_fetch(table, filters):
+    async def fake_fetch(table, filters, columns=None):
         return [{"CustomerNum": "1", "OnBoardDate": None}]
 
     monkeypatch.setattr(svc, "sanitize_filters", fake_sanitize)
@@ -96,7 +139,7 @@ async def test_get_sac_account_formats_additional_dates(monkeypatch):
     def fake_sanitize(params, allowed):
         return {}
 
-    async def fake_fetch(table, filters):
+    async def fake_fetch(table, filters, columns=None):
         return [
             {
                 "CustomerNum": "1",
@@ -133,6 +176,18 @@ async def test_get_sac_account_invalid_filter(monkeypatch):
     assert exc.value.status_code == 400
 
 
+@pytest.mark.anyio
+async def test_get_sac_account_lets_timeouts_through(monkeypatch):
+    async def fake_fetch(table, filters, columns=None):
+        raise QueryTimeoutError("Query exceeded its 30s time budget")
+
+    monkeypatch.setattr(svc, "fetch_records_async", fake_fetch)
+
+    # Not wrapped in a 500: the app-level handler turns it into a 504.
+    with pytest.raises(QueryTimeoutError):
+        await svc.get_sac_account({})
+
+
 @pytest.mark.anyio
 async def test_upsert_sac_account(monkeypatch):
     async def fake_merge(**kwargs):
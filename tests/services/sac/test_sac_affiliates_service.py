@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import date
 
 import pytest
@@ -5,9 +6,23 @@ import pytest
 from services.sac import sac_affiliates_service as svc
 
 
+@pytest.fixture(autouse=True)
+def transactions(monkeypatch):
+    """Replace unit_of_work with a no-op that records how often it was entered."""
+    entered: list[bool] = []
+
+    @asynccontextmanager
+    async def fake_unit_of_work():
+        entered.append(True)
+        yield
+
+    monkeypatch.setattr(svc, "unit_of_work", fake_unit_of_work)
+    return entered
+
+
 @pytest.mark.anyio
 async def test_get_affiliates(monkeypatch):
-    async def fake_fetch(table, filters):
+    async def fake_fetch(table, filters, columns=None):
         assert table == svc.TABLE_NAME
         assert filters == {"CustomerNum": "1"}
         return [{"AffiliateName": "Alpha", "StartDate": "2024-06-01"}]
@@ -23,7 +38,7 @@ async def test_get_affiliates(monkeypatch):
 
 
 @pytest.mark.anyio
-async def test_upsert_affiliates_splits_records(monkeypatch):
+async def test_upsert_affiliates_splits_records(monkeypatch, transactions):
     calls = {"merge": None, "insert": None}
 
     async def fake_merge(**kwargs):
@@ -48,3 +63,4 @@ async def test_upsert_affiliates_splits_records(monkeypatch):
     assert calls["insert"][0]["CustomerNum"] == "2"
     assert calls["merge"][0]["StartDate"] == date(2024, 6, 1)
     assert calls["insert"][0]["StartDate"] == date(2024, 6, 2)
+    assert transactions == [True]
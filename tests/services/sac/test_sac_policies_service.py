@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import date
 from typing import Any
 
@@ -7,6 +8,20 @@ from fastapi import HTTPException
 from services.sac import sac_policies_service as svc
 
 
+@pytest.fixture(autouse=True)
+def transactions(monkeypatch):
+    """Replace unit_of_work with a no-op that records how often it was entered."""
+    entered: list[bool] = []
+
+    @asynccontextmanager
+    async def fake_unit_of_work():
+        entered.append(True)
+        yield
+
+    monkeypatch.setattr(svc, "unit_of_work", fake_unit_of_work)
+    return entered
+
+
 @pytest.mark.anyio
 async def test_get_sac_policies(monkeypatch):
     def fake_sanitize(params, allowed):
@@ -43,7 +58,6 @@ async def test_upsert_sac_policies_updates_when_pk_present(monkeypatch):
     async def fake_fetch(**kwargs):
         return [{"PK_Number": 1, "PolMod": "00"}]
 
-    monkeypatch.setattr(svc, "_lookup_pk_number", lambda record: None)
     monkeypatch.setattr(svc, "merge_upsert_records_async", fake_merge)
     monkeypatch.setattr(svc, "insert_records_async", fake_insert)
     monkeypatch.setattr(svc, "fetch_records_async", fake_fetch)
@@ -77,11 +91,11 @@ async def test_upsert_sac_policies_inserts_when_pk_missing(monkeypatch):
 
     async def fake_insert(**kwargs):
         calls["insert"] = kwargs
+        return {"message": "Insertion successful", "count": 1, "identities": [99]}
 
     monkeypatch.setattr(svc, "merge_upsert_records_async", fake_merge)
     monkeypatch.setattr(svc, "insert_records_async", fake_insert)
     monkeypatch.setattr(svc, "fetch_records_async", lambda **kwargs: [])
-    monkeypatch.setattr(svc, "_lookup_pk_number", lambda record: 99)
 
     payload = {
         "CustomerNum": "1",
@@ -95,6 +109,7 @@ async def test_upsert_sac_policies_inserts_when_pk_missing(monkeypatch):
 
     assert result == {"message": "Transaction successful", "count": 1, "pk": 99}
     assert calls["merge_called"] is False
+    assert calls["insert"]["return_identity"] == svc.PRIMARY_KEY
     inserted_payload = calls["insert"]["records"][0]
     assert "PK_Number" not in inserted_payload
     assert inserted_payload["EffectiveDate"] == date(2024, 1, 1)
@@ -109,6 +124,7 @@ async def test_upsert_sac_policies_inserts_new_row_when_mod_changes(monkeypatch)
 
     async def fake_insert(**kwargs):
         calls["insert"] = kwargs
+        return {"message": "Insertion successful", "count": 1, "identities": [99]}
 
     async def fake_fetch(**kwargs):
         assert kwargs["filters"] == {svc.PRIMARY_KEY: 1}
@@ -117,7 +133,6 @@ async def test_upsert_sac_policies_inserts_new_row_when_mod_changes(monkeypatch)
     monkeypatch.setattr(svc, "merge_upsert_records_async", fake_merge)
     monkeypatch.setattr(svc, "insert_records_async", fake_insert)
     monkeypatch.setattr(svc, "fetch_records_async", fake_fetch)
-    monkeypatch.setattr(svc, "_lookup_pk_number", lambda record: 99)
 
     payload = {
         "PK_Number": 1,
@@ -184,11 +199,12 @@ async def test_update_field_for_all_policies_runs_query(monkeypatch):
     def fake_db_connection():
         return DummyConn()
 
-    async def fake_run_in_threadpool(fn):
+    async def fake_run_db(op, fn):
+        executed["op"] = op
         return fn()
 
     monkeypatch.setattr(svc, "db_connection", fake_db_connection)
-    monkeypatch.setattr(svc, "run_in_threadpool", fake_run_in_threadpool)
+    monkeypatch.setattr(svc, "run_db", fake_run_db)
 
     payload = {
         "fieldName": "EffectiveDate",
@@ -200,6 +216,7 @@ async def test_update_field_for_all_policies_runs_query(monkeypatch):
     assert result == {"message": "Update successful"}
     assert "UPDATE" in executed["query"]
     assert executed["params"] == (date(2024, 1, 1), "1")
+    assert executed["op"] == "bulk"
 
 
 @pytest.mark.anyio
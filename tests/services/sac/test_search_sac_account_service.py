@@ -1,21 +1,114 @@
+import json
+
 import pytest
 from fastapi import HTTPException
 
+from db import QueryTimeoutError
 from services.sac import search_sac_account_service as svc
 
 
+async def _body(response):
+    return "".join([chunk async for chunk in response.body_iterator])
+
+
 @pytest.mark.anyio
 async def test_search_valid_key(monkeypatch):
-    async def fake_run(query):
+    async def fake_stream(query):
         assert query.strip().startswith("SELECT")
-        return [{"Customer Name": "ACME", "On Board Date": "2024-01-01T00:00:00Z"}]
+        yield [{"Customer Name": "ACME", "On Board Date": "2024-01-01T00:00:00Z"}]
 
-    monkeypatch.setattr(svc, "run_raw_query_async", fake_run)
-    result = await svc.search_sac_account_records("AccountName")
-    assert result == [{"Customer Name": "ACME", "On Board Date": "01-01-2024"}]
+    monkeypatch.setattr(svc, "stream_raw_query_async", fake_stream)
+    response = await svc.search_sac_account_records("AccountName")
+    assert json.loads(await _body(response)) == [
+        {"Customer Name": "ACME", "On Board Date": "01-01-2024"}
+    ]
 
 
 @pytest.mark.anyio
 async def test_search_invalid_key():
     with pytest.raises(HTTPException):
         await svc.search_sac_account_records("Unknown")
+
+
+@pytest.mark.anyio
+async def test_search_streams_ndjson_ordered_by_sort_keys(monkeypatch):
+    captured = {}
+
+    async def fake_stream(query):
+        captured["query"] = query
+        yield [{"Policy Number": "P1"}, {"Policy Number": "P2"}]
+        yield [{"Policy Number": "P3"}]
+
+    monkeypatch.setattr(svc, "stream_raw_query_async", fake_stream)
+    response = await svc.search_sac_account_records("PolicyNum", ndjson=True)
+
+    assert response.media_type == "application/x-ndjson"
+    lines = (await _body(response)).splitlines()
+    assert [json.loads(line)["Policy Number"] for line in lines] == ["P1", "P2", "P3"]
+    assert captured["query"].endswith("ORDER BY [Policy Number], [Customer Number];")
+
+
+@pytest.mark.anyio
+async def test_search_stream_failure_before_first_batch(monkeypatch):
+    async def fake_stream(query):
+        raise RuntimeError("db down")
+        yield []
+
+    monkeypatch.setattr(svc, "stream_raw_query_async", fake_stream)
+    with pytest.raises(HTTPException) as exc:
+        await svc.search_sac_account_records("AccountName")
+    assert exc.value.status_code == 500
+
+
+@pytest.mark.anyio
+async def test_search_paginates_by_sort_keys(monkeypatch):
+    captured = {}
+
+    async def fake_page(query, **kwargs):
+        captured["query"] = query
+        captured.update(kwargs)
+        return {"items": [{"On Board Date": "2024-01-01T00:00:00Z"}], "next": "tok"}
+
+    monkeypatch.setattr(svc, "run_raw_query_page_async", fake_page)
+    result = await svc.search_sac_account_records("CustomerNum", limit=50, after="prev")
+
+    assert result == {"items": [{"On Board Date": "01-01-2024"}], "next": "tok"}
+    assert "ORDER BY" not in captured["query"]
+    assert captured["key_columns"] == ["[Customer Number]"]
+    assert captured["limit"] == 50
+    assert captured["after"] == "prev"
+
+
+@pytest.mark.anyio
+async def test_search_invalid_page_token(monkeypatch):
+    async def fake_page(query, **kwargs):
+        raise ValueError("Invalid page token")
+
+    monkeypatch.setattr(svc, "run_raw_query_page_async", fake_page)
+    with pytest.raises(HTTPException) as exc:
+        await svc.search_sac_account_records("CustomerNum", limit=10, after="junk")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_search_lets_timeouts_through(monkeypatch):
+    async def fake_stream(query):
+        raise QueryTimeoutError("Query exceeded its 60s time budget")
+        yield []
+
+    monkeypatch.setattr(svc, "stream_raw_query_async", fake_stream)
+    with pytest.raises(QueryTimeoutError):
+        await svc.search_sac_account_records("AccountName")
+
+
+@pytest.mark.anyio
+async def test_search_returns_503_when_streams_are_busy(monkeypatch):
+    async def busy_stream(query):
+        raise svc.StreamsBusyError("2 streamed reads already open; try again shortly")
+        yield []
+
+    monkeypatch.setattr(svc, "stream_raw_query_async", busy_stream)
+    with pytest.raises(HTTPException) as exc:
+        await svc.search_sac_account_records("AccountName")
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "1"}
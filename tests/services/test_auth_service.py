@@ -1,6 +1,11 @@
+import asyncio
+import time
+
 import pytest
 from fastapi import HTTPException, Request, Response
 
+from core.principal_cache import PrincipalCache
+from core.token_revocation import RevocationList
 from services import auth_service as svc
 
 
@@ -119,7 +124,7 @@ async def test_refresh_user_token(monkeypatch):
 
 def test_get_user_by_email(monkeypatch):
     monkeypatch.setattr(
-        svc, "run_raw_query", lambda query, params: [{"ID": 1, "Email": params[0]}]
+        svc, "run_raw_query", lambda query, params, **kwargs: [{"ID": 1, "Email": params[0]}]
     )
     result = svc.get_user_by_email("user@example.com")
     assert result["Email"] == "user@example.com"
@@ -141,3 +146,208 @@ def test_persist_hashed_password(monkeypatch):
 
     assert conn.cursor_obj.executed[0].startswith("UPDATE tblUsers")
     assert conn.committed is True
+
+
+@pytest.mark.anyio
+async def test_current_user_is_cached_per_token(monkeypatch):
+    user_record = {
+        "ID": 7,
+        "FirstName": "Test",
+        "LastName": "User",
+        "Email": "test@example.com",
+        "Role": "admin",
+        "BranchName": "NY",
+    }
+    lookups: list[int] = []
+
+    def fake_get_user_by_id(user_id):
+        lookups.append(user_id)
+        return user_record
+
+    monkeypatch.setattr(svc, "decode_access_token", lambda token: {"sub": "7"})
+    monkeypatch.setattr(svc, "get_user_by_id", fake_get_user_by_id)
+    monkeypatch.setattr(svc, "principal_cache", PrincipalCache(10, 60))
+
+    first = await svc.get_current_user_from_token(make_request("session=abc"))
+    second = await svc.get_current_user_from_token(make_request("session=abc"))
+    await svc.get_current_user_from_token(make_request("session=other"))
+
+    assert first["user"] == second["user"] == svc._user_profile(user_record)
+    assert lookups == ["7", "7"]
+
+    assert svc.invalidate_user_sessions(7) == 2
+    await svc.get_current_user_from_token(make_request("session=abc"))
+    assert len(lookups) == 3
+
+
+@pytest.mark.anyio
+async def test_concurrent_logins_do_not_stall_the_event_loop(monkeypatch):
+    # Latency benchmark: slow lookups and slow password checks run while a ticker measures
+    # how late the event loop wakes it up. Blocking calls on the loop would delay every tick
+    # by the full login time.
+    user_record = {
+        "ID": 1,
+        "FirstName": "Test",
+        "LastName": "User",
+        "Email": "test@example.com",
+        "Role": "admin",
+        "BranchName": "NY",
+        "Password": "hashed",
+    }
+
+    def slow_lookup(email):
+        time.sleep(0.1)
+        return user_record
+
+    def slow_verify(provided, stored):
+        time.sleep(0.2)
+        return True
+
+    monkeypatch.setattr(svc, "get_user_by_email", slow_lookup)
+    monkeypatch.setattr(svc, "verify_password", slow_verify)
+    monkeypatch.setattr(
+        svc, "create_access_token", lambda user_id, role=None, claims=None: "token123"
+    )
+
+    lags: list[float] = []
+
+    async def ticker():
+        for _ in range(20):
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    logins = [
+        svc.login_user({"email": "test@example.com", "password": "pw"}, Response())
+        for _ in range(4)
+    ]
+    results = await asyncio.gather(ticker(), *logins)
+
+    assert all(result["token"] == "token123" for result in results[1:])
+    assert max(lags) < 0.1
+
+
+@pytest.mark.anyio
+async def test_login_returns_503_when_password_workers_are_busy(monkeypatch):
+    async def busy(func, *args):
+        raise svc.PasswordHashingBusyError("queue full")
+
+    monkeypatch.setattr(svc, "get_user_by_email", lambda _: {"ID": 1, "Password": "hashed"})
+    monkeypatch.setattr(svc, "run_password_task", busy)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await svc.login_user({"email": "test@example.com", "password": "pw"}, Response())
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+
+
+@pytest.fixture
+def self_contained(monkeypatch):
+    revocations = RevocationList()
+    revocations.replace({}, {}, set())
+    monkeypatch.setattr(svc.settings, "AUTH_SELF_CONTAINED_TOKENS", True)
+    monkeypatch.setattr(svc, "revocations", revocations)
+    monkeypatch.setattr(svc, "principal_cache", PrincipalCache(10, 60))
+    return revocations
+
+
+@pytest.mark.anyio
+async def test_self_contained_token_skips_the_user_lookup(self_contained, monkeypatch):
+    user_record = {
+        "ID": 7,
+        "FirstName": "Test",
+        "LastName": "User",
+        "Email": "test@example.com",
+        "Role": "admin",
+        "BranchName": "NY",
+        "Password": "hashed",
+    }
+    monkeypatch.setattr(svc, "get_user_by_email", lambda _: user_record)
+    monkeypatch.setattr(svc, "verify_password", lambda provided, stored: True)
+    login = await svc.login_user({"email": "test@example.com", "password": "pw"}, Response())
+
+    def no_lookup(user_id):
+        raise AssertionError("self-contained tokens must not read tblUsers")
+
+    monkeypatch.setattr(svc, "get_user_by_id", no_lookup)
+    result = await svc.get_current_user_from_token(make_request(f"session={login['token']}"))
+
+    assert result["user"] == svc._user_profile(user_record)
+
+    self_contained.set_version(7, 1)
+    with pytest.raises(HTTPException) as excinfo:
+        await svc.get_current_user_from_token(make_request(f"session={login['token']}"))
+    assert excinfo.value.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_claims_are_not_trusted_before_the_revocation_list_loads(monkeypatch):
+    monkeypatch.setattr(svc.settings, "AUTH_SELF_CONTAINED_TOKENS", True)
+    monkeypatch.setattr(svc, "revocations", RevocationList())
+    monkeypatch.setattr(svc, "principal_cache", PrincipalCache(10, 60))
+    monkeypatch.setattr(svc, "get_user_by_id", lambda user_id: None)
+    token = svc.create_access_token(7, "admin", {"ver": 0, "jti": "abc", "email": "x"})
+
+    with pytest.raises(HTTPException) as excinfo:
+        await svc.get_current_user_from_token(make_request(f"session={token}"))
+    assert excinfo.value.status_code == 401
+
+    with pytest.raises(HTTPException) as excinfo:
+        await svc.refresh_user_token(make_request(), Response(), token=token)
+    assert excinfo.value.status_code == 503
+    assert svc._session_claims({"id": 7}) is None
+
+
+@pytest.mark.anyio
+async def test_logout_revokes_self_contained_token(self_contained, monkeypatch):
+    token = svc.create_access_token(7, "admin", {"ver": 0, "jti": "abc", "email": "x"})
+    revoked: list[dict] = []
+
+    def fake_revoke(claims):
+        revoked.append(claims)
+        self_contained.revoke(claims["jti"], claims["exp"])
+
+    monkeypatch.setattr(svc, "revoke_token", fake_revoke)
+
+    await svc.logout_user(Response(), make_request(f"session={token}"))
+
+    assert revoked[0]["jti"] == "abc"
+    with pytest.raises(HTTPException):
+        await svc.get_current_user_from_token(make_request(f"session={token}"))
+
+
+@pytest.mark.anyio
+async def test_refresh_signs_the_current_role(monkeypatch):
+    token = svc.create_access_token(7, "admin")
+    user_record = {
+        "ID": 7,
+        "FirstName": "Test",
+        "LastName": "User",
+        "Email": "test@example.com",
+        "Role": "viewer",
+        "BranchName": "NY",
+    }
+    monkeypatch.setattr(svc, "get_user_by_id", lambda user_id: user_record)
+
+    result = await svc.refresh_user_token(make_request(), Response(), token=token)
+
+    assert svc.decode_access_token(result["token"])["role"] == "viewer"
+
+
+@pytest.mark.anyio
+async def test_revoke_user_tokens_bumps_the_version(self_contained, monkeypatch):
+    monkeypatch.setattr(svc, "bump_token_version", lambda user_id: 3)
+
+    assert await svc.revoke_user_tokens(7) == 3
+
+
+@pytest.mark.anyio
+async def test_revoke_user_tokens_skips_the_version_table_when_off(monkeypatch):
+    def fail(user_id):
+        raise AssertionError("tblUserTokenVersions is only used with self-contained tokens")
+
+    monkeypatch.setattr(svc.settings, "AUTH_SELF_CONTAINED_TOKENS", False)
+    monkeypatch.setattr(svc, "bump_token_version", fail)
+
+    assert await svc.revoke_user_tokens(7) == 0
@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 
 import app as app_module
+from db import QueryTimeoutError
 
 
 def test_home_and_health_endpoints(monkeypatch):
@@ -15,3 +16,42 @@ def test_home_and_health_endpoints(monkeypatch):
     assert home.json() == "Welcome to SAC"
     assert health.status_code == 200
     assert health.json() == {"status": "ok"}
+
+
+def test_db_health_reports_pool_and_executor_gauges():
+    client = TestClient(app_module.app)
+
+    response = client.get("/health/db")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["pool"]) >= {"size", "idle", "in_use", "waiting", "max_size"}
+    assert set(body["executor"]) == {"read", "write", "bulk"}
+    assert set(body["executor"]["read"]) >= {"queued", "running", "wait_avg_ms", "wait_max_ms"}
+
+
+def test_readiness_is_503_until_warm(monkeypatch):
+    client = TestClient(app_module.app)
+    monkeypatch.setattr(app_module.readiness, "state", "starting")
+
+    assert client.get("/health/ready").status_code == 503
+
+    monkeypatch.setattr(app_module.readiness, "state", "ready")
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_query_timeouts_map_to_504():
+    @app_module.app.get("/_test/timeout")
+    async def timeout_route():
+        raise QueryTimeoutError("Query exceeded its 1s time budget")
+
+    try:
+        response = TestClient(app_module.app).get("/_test/timeout")
+    finally:
+        app_module.app.router.routes.pop()
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": {"error": "Query exceeded its 1s time budget"}}
@@ -1,36 +1,373 @@
-from contextlib import contextmanager
+import pytest
 
 import db
 
 
-def test_build_connection_string(monkeypatch):
-    class DummySettings:
-        DB_DRIVER = "ODBC Driver 18 for SQL Server"
-        DB_SERVER = "server"
-        DB_NAME = "database"
-        DB_AUTH = "ActiveDirectoryInteractive"
-        USE_KEY_VAULT = False
+class DummySettings:
+    DB_DRIVER = "ODBC Driver 18 for SQL Server"
+    DB_SERVER = "server"
+    DB_NAME = "database"
+    DB_AUTH = "ActiveDirectoryInteractive"
+    DB_ACCESS_TOKEN = False
+    USE_KEY_VAULT = False
+    DB_READ_SERVER = None
+    DB_READ_INTENT = False
+    DB_BACKEND = "mssql"
+    DB_POOL_MIN_SIZE = 0
+    DB_POOL_MAX_SIZE = 2
+    DB_POOL_TIMEOUT = 0
+    DB_POOL_RECYCLE_SECONDS = 1800
+    DB_POOL_PRE_PING = False
+    DB_POOL_PRE_PING_IDLE_SECONDS = 30
+    DB_MAX_OPEN_STREAMS = 0
+    DB_READ_ISOLATION = "read_committed"
+
+
+class DummyCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if self.conn.broken:
+            raise RuntimeError("connection is broken")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class DummyConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return DummyCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    created: list[DummyConnection] = []
+
+    def _factory():
+        conn = DummyConnection()
+        created.append(conn)
+        return conn
 
+    monkeypatch.setattr(db, "settings", DummySettings)
+    monkeypatch.setattr(db, "get_raw_connection", _factory)
+    monkeypatch.setattr(db, "_pool", None)
+    yield created
+    db.close_pool()
+
+
+def test_build_connection_string(monkeypatch):
     monkeypatch.setattr(db, "settings", DummySettings)
     conn_str = db._build_connection_string()
     assert "Driver=ODBC Driver 18 for SQL Server;" in conn_str
     assert "Database=database;" in conn_str
 
 
-def test_db_connection_context(monkeypatch):
-    created = {}
+def test_access_token_connection_skips_driver_sign_in(monkeypatch):
+    class TokenSettings(DummySettings):
+        DB_ACCESS_TOKEN = True
+
+    calls: list[tuple[str, dict]] = []
+    monkeypatch.setattr(db, "settings", TokenSettings)
+    monkeypatch.setattr(db, "access_token_attrs", lambda: {1256: b"token"})
+    monkeypatch.setattr(
+        db.pyodbc, "connect", lambda conn_str, **kwargs: calls.append((conn_str, kwargs))
+    )
+
+    db.get_raw_connection()
+
+    conn_str, kwargs = calls[0]
+    assert "Authentication=" not in conn_str
+    assert kwargs == {"attrs_before": {1256: b"token"}}
+
+
+def test_get_raw_connection_rejects_unknown_backend(monkeypatch):
+    class OtherSettings(DummySettings):
+        DB_BACKEND = "oracle"
+
+    monkeypatch.setattr(db, "settings", OtherSettings)
+    with pytest.raises(ValueError, match="Unknown DB_BACKEND: oracle"):
+        db.get_raw_connection()
+
+
+def test_read_connection_string_targets_read_server(monkeypatch):
+    class ReadSettings(DummySettings):
+        DB_READ_SERVER = "replica"
+
+    monkeypatch.setattr(db, "settings", ReadSettings)
+    conn_str = db._build_connection_string(read_only=True)
+    assert "Server=replica;" in conn_str
+    assert conn_str.endswith("ApplicationIntent=ReadOnly;")
+    assert "ApplicationIntent" not in db._build_connection_string()
 
-    class DummyConnection:
-        def __init__(self):
-            created["conn"] = self
-            self.closed = False
 
-        def close(self):
-            self.closed = True
+def test_reads_share_primary_pool_without_read_routing(fresh_pool):
+    assert db.read_routing_enabled() is False
+    assert db.get_pool(read_only=True) is db.get_pool()
 
-    monkeypatch.setattr(db, "get_raw_connection", lambda: DummyConnection())
 
+def test_read_routing_uses_separate_pool(monkeypatch, fresh_pool):
+    class ReadSettings(DummySettings):
+        DB_READ_INTENT = True
+
+    opened: list[bool] = []
+
+    def _factory(read_only=False):
+        opened.append(read_only)
+        return DummyConnection()
+
+    monkeypatch.setattr(db, "settings", ReadSettings)
+    monkeypatch.setattr(db, "get_raw_connection", _factory)
+    monkeypatch.setattr(db, "_read_pool", None)
+
+    with db.db_connection(read_only=True) as read_conn:
+        pass
+    with db.db_connection() as write_conn:
+        pass
+
+    assert read_conn is not write_conn
+    assert opened == [True, False]
+    assert db.get_pool(read_only=True) is not db.get_pool()
+
+
+def test_db_connection_context(fresh_pool):
     with db.db_connection() as conn:
-        assert conn is created["conn"]
+        assert conn is fresh_pool[0]
+
+    # Returned to the pool (rolled back, still open) and reused on the next checkout
+    assert fresh_pool[0].closed is False
+    assert fresh_pool[0].rollbacks == 1
+
+    with db.db_connection() as conn:
+        assert conn is fresh_pool[0]
+
+    assert len(fresh_pool) == 1
+    db.close_pool()
+    assert fresh_pool[0].closed is True
+
+
+def test_pool_fails_fast_when_exhausted(fresh_pool):
+    pool = db.get_pool()
+    first = pool.acquire()
+    second = pool.acquire()
+
+    with pytest.raises(db.PoolExhaustedError):
+        pool.acquire()
+
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    pool.release(second)
+    assert pool.stats() == {"size": 2, "idle": 2, "in_use": 0, "waiting": 0, "max_size": 2}
+
+
+def test_pool_recycles_expired_connections(fresh_pool):
+    pool = db.ConnectionPool(db.get_raw_connection, max_size=1, timeout=0, recycle_seconds=0.01)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    pool._idle[0].created_at -= 1
+
+    replacement = pool.acquire()
+
+    assert replacement is not conn
+    assert conn.closed is True
+    pool.release(replacement)
+    pool.close()
+
+
+def test_pool_replaces_connections_that_fail_validation(fresh_pool):
+    pool = db.ConnectionPool(db.get_raw_connection, max_size=1, timeout=0, pre_ping=True)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.broken = True
+
+    replacement = pool.acquire()
+
+    assert replacement is not conn
+    assert conn.closed is True
+    assert pool.stats()["size"] == 1
+    pool.release(replacement)
+    pool.close()
+
+
+def test_pool_pings_only_connections_idle_past_the_threshold(fresh_pool):
+    pool = db.ConnectionPool(
+        db.get_raw_connection, max_size=1, timeout=0, pre_ping=True, pre_ping_idle_seconds=30
+    )
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.broken = True
+
+    # Just released: handed out again without a SELECT 1.
+    assert pool.acquire() is conn
+    pool.release(conn)
+
+    pool._idle[0].idle_since -= 31
+    replacement = pool.acquire()
+
+    assert replacement is not conn
+    assert conn.closed is True
+    pool.release(replacement)
+    pool.close()
+
+
+def test_pool_discards_connection_after_failed_rollback(fresh_pool):
+    pool = db.ConnectionPool(db.get_raw_connection, max_size=1, timeout=0)
+    conn = pool.acquire()
+
+    def _fail():
+        raise RuntimeError("rollback failed")
+
+    conn.rollback = _fail
+    pool.release(conn)
+
+    assert conn.closed is True
+    assert pool.stats()["size"] == 0
+
+
+class ScopedCursor:
+    def __init__(self, error=None):
+        self.error = error
+        self.cancelled = False
+        self.closed = False
+
+    def execute(self, query):
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        self.cancelled = True
+
+    def close(self):
+        self.closed = True
+
+
+class ScopedConnection:
+    def __init__(self, cursor):
+        self.timeout = 0
+        self.cursor_obj = cursor
+
+    def cursor(self):
+        return self.cursor_obj
+
+
+def test_scoped_cursor_without_scope_has_no_timeout():
+    conn = ScopedConnection(ScopedCursor())
+    conn.timeout = 5
+
+    with db.scoped_cursor(conn) as cursor:
+        cursor.execute("SELECT 1")
+
+    assert conn.timeout == 0
+    assert cursor.closed is True
+
+
+def test_scoped_cursor_uses_remaining_budget_as_timeout():
+    conn = ScopedConnection(ScopedCursor())
+
+    with db.query_scope(2.5), db.scoped_cursor(conn):
+        assert conn.timeout == 3
+
+    assert db.current_query_scope() is None
+
+
+def test_scoped_cursor_maps_driver_timeout():
+    conn = ScopedConnection(ScopedCursor(db.pyodbc.Error("HYT00", "Query timeout expired")))
+
+    with pytest.raises(db.QueryTimeoutError, match="10s time budget"):
+        with db.query_scope(10), db.scoped_cursor(conn) as cursor:
+            cursor.execute("SELECT 1")
+
+    assert conn.cursor_obj.closed is True
+
+
+def test_scoped_cursor_rejects_spent_budget_before_executing():
+    conn = ScopedConnection(ScopedCursor())
+
+    with db.query_scope(10) as scope:
+        scope.deadline -= 20
+        with pytest.raises(db.QueryTimeoutError):
+            with db.scoped_cursor(conn):
+                raise AssertionError("cursor should not be opened")
+
+
+def test_query_scope_cancel_interrupts_running_cursor():
+    cursor = ScopedCursor(db.pyodbc.Error("HY008", "Operation canceled"))
+    conn = ScopedConnection(cursor)
+
+    with db.query_scope(None) as scope:
+        with pytest.raises(db.QueryCancelledError):
+            with db.scoped_cursor(conn) as active:
+                scope.cancel()
+                assert cursor.cancelled is True
+                active.execute("SELECT 1")
+
+        # Later statements in a cancelled scope fail without reaching the server.
+        with pytest.raises(db.QueryCancelledError):
+            with db.scoped_cursor(ScopedConnection(ScopedCursor())):
+                pass
+
+
+class IsolationCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        self.conn.log.append(query)
+
+    def close(self):
+        pass
+
+
+class IsolationConnection:
+    def __init__(self):
+        self.log: list[str] = []
+
+    def cursor(self):
+        return IsolationCursor(self)
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+def test_isolated_reads_is_a_no_op_under_read_committed(monkeypatch):
+    monkeypatch.setattr(db, "settings", DummySettings)
+    conn = IsolationConnection()
+
+    with db.isolated_reads(conn):
+        pass
+
+    assert db.current_read_isolation() == db.READ_COMMITTED
+    assert conn.log == []
+
+
+def test_isolated_reads_switches_to_snapshot_and_restores(monkeypatch):
+    monkeypatch.setattr(db, "settings", DummySettings)
+    conn = IsolationConnection()
+
+    with db.read_isolation(db.SNAPSHOT), db.isolated_reads(conn):
+        assert conn.log == ["SET TRANSACTION ISOLATION LEVEL SNAPSHOT"]
+
+    assert conn.log[1:] == ["ROLLBACK", "SET TRANSACTION ISOLATION LEVEL READ COMMITTED"]
+    assert db.current_read_isolation() == db.READ_COMMITTED
+
 
-    assert created["conn"].closed is True
+def test_read_isolation_rejects_unknown_level():
+    with pytest.raises(ValueError, match="Unknown read isolation level: dirty"):
+        with db.read_isolation("dirty"):
+            pass